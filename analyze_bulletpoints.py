@@ -3,12 +3,19 @@ from dotenv import load_dotenv
 import os
 import google.generativeai as genai
 import pandas as pd
-from sentence_transformers import SentenceTransformer, util
+from datetime import datetime
+from sentence_transformers import util
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from concurrency import map_concurrently
+from csv_store import AppendOnlyCSVWriter
+from persistence import background_writer
+from similarity_engine import get_sbert_model
+from instrumentation import instrumented
 
 load_dotenv()
 
+@instrumented("similarity.match_responsibility")
 def find_most_similar_responsibility(original_point, job_responsibilities):
     """Find the job responsibility that is most similar to the original point."""
     # Ensure original_point is a string
@@ -29,26 +36,40 @@ def find_most_similar_responsibility(original_point, job_responsibilities):
 
     # Find the index of the highest similarity score
     highest_similarity_index = similarities[0].argmax()
-    st.write(highest_similarity_index)
     most_similar_responsibility = job_responsibilities[highest_similarity_index]
-    st.write(most_similar_responsibility)
     return most_similar_responsibility
 
-# Load the SBERT mode
-sbert_model = SentenceTransformer('all-MiniLM-L6-v2')
+# Load the SBERT model (shared with the similarity pages)
+sbert_model = get_sbert_model()
 
 
 
 # Configure the Generative AI model
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-model = genai.GenerativeModel("gemini-pro")
-
-def save_data_entry(original_point, similar_responsibility, optimized_point, sbert_model):
-    """Save original point, similar responsibility, optimized point, and similarity scores as a data entry."""
-    
-    if "data_entries" not in st.session_state:
-        st.session_state.data_entries = []
-
+LLM_MODEL_NAME = "gemini-pro"
+model = genai.GenerativeModel(LLM_MODEL_NAME)
+
+# Bump whenever the optimization prompts change, so analytics can compare prompt versions
+PROMPT_VERSION = os.getenv("PROMPT_VERSION", "1")
+
+# Append-only writer for the similarity history; rows are flushed in small batches
+SIMILARITY_CSV_PATH = "similarity.csv"
+SIMILARITY_COLUMNS = [
+    "Original Point",
+    "Similar Responsibility",
+    "Optimized Point",
+    "Similarity: Original vs Similar",
+    "Similarity: Original vs Optimized",
+    "Similarity: Similar vs Optimized",
+    "Recorded At",
+    "Model",
+    "Prompt Version",
+]
+similarity_writer = AppendOnlyCSVWriter(SIMILARITY_CSV_PATH, SIMILARITY_COLUMNS)
+
+@instrumented("similarity.entry")
+def compute_similarity_entry(original_point, similar_responsibility, optimized_point, sbert_model):
+    """Return the data entry with SBERT similarity scores for an original/similar/optimized triple."""
     # Compute similarity scores
     original_vs_similar = util.cos_sim(
         sbert_model.encode(original_point, convert_to_tensor=True),
@@ -72,29 +93,32 @@ def save_data_entry(original_point, similar_responsibility, optimized_point, sbe
         "Optimized Point": optimized_point,
         "Similarity: Original vs Similar": round(original_vs_similar, 4),
         "Similarity: Original vs Optimized": round(original_vs_optimized, 4),
-        "Similarity: Similar vs Optimized": round(similar_vs_optimized, 4)
+        "Similarity: Similar vs Optimized": round(similar_vs_optimized, 4),
+        "Recorded At": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "Model": LLM_MODEL_NAME,
+        "Prompt Version": PROMPT_VERSION,
     }
+    return entry
 
-    # Append the entry to the session state list
-    st.session_state.data_entries.append(entry)
+def append_similarity_entry(entry):
+    """Persist a similarity data entry to similarity.csv (appended, never rewritten)."""
+    similarity_writer.append(entry)
 
-    # Define the file path for the CSV
-    file_path = "similarity.csv"
+def save_data_entry(original_point, similar_responsibility, optimized_point, sbert_model):
+    """Save original point, similar responsibility, optimized point, and similarity scores as a data entry."""
+    
+    if "data_entries" not in st.session_state:
+        st.session_state.data_entries = []
 
-    # Check if the CSV file already exists
-    if os.path.exists(file_path):
-        # If the file exists, read the existing data
-        df = pd.read_csv(file_path)
-        # Concatenate the new entry to the dataframe
-        new_entry_df = pd.DataFrame([entry])  # Convert entry to DataFrame
-        df = pd.concat([df, new_entry_df], ignore_index=True)  # Concatenate the new entry
-    else:
-        # If the file does not exist, create a new dataframe with the entry
-        df = pd.DataFrame([entry])
+    entry = compute_similarity_entry(original_point, similar_responsibility, optimized_point, sbert_model)
+
+    # Append the entry to the session state list
+    st.session_state.data_entries.append(entry)
 
-    # Save the combined data (existing + new entries) back to the CSV file
-    df.to_csv(file_path, index=False)
+    # Appended on the background writer thread
+    background_writer.submit(append_similarity_entry, dict(entry))
 
+@instrumented("llm.generate")
 def get_gemini_response(question, context):
     """Get a response from the Generative AI model."""
     full_question = f"{context}\n\nQuestion: {question}"
@@ -104,11 +128,12 @@ def get_gemini_response(question, context):
     except (ValueError, AttributeError):
         return "Not found"
 
-def extract_relevant_skills(job_description_point):
+def extract_relevant_skills(job_description_point, skills=None):
     """Extract relevant skills using only updated skills without modifying the original list."""
     
-    # Get skills from session state
-    skills = st.session_state.get("skills", []) + st.session_state.get("updated_skills", [])  # Combine saved skills with updated skills
+    # Get skills from session state unless the caller passed them in
+    if skills is None:
+        skills = st.session_state.get("skills", []) + st.session_state.get("updated_skills", [])  # Combine saved skills with updated skills
     relevant_skills_list = []
     
     context = f"""
@@ -175,6 +200,38 @@ def generate_optimized_point(original_point, similar_responsibilities, relevant_
     
     return optimized_point
 
+def clean_job_responsibilities(job_responsibilities):
+    """Remove bullet characters and symbols from job responsibilities."""
+    cleaned_job_responsibilities = []
+    for resp in job_responsibilities:
+        cleaned_resp = resp.lstrip("•- *")  # Remove common bullet point characters
+        cleaned_resp = ''.join(e for e in cleaned_resp if e.isalnum() or e.isspace())  # Remove unwanted symbols
+        cleaned_job_responsibilities.append(cleaned_resp.strip())
+    return cleaned_job_responsibilities
+
+def optimize_point(point, job_responsibilities, skills):
+    """Match one experience point to a job responsibility, pick relevant skills and rewrite it."""
+    # Find the most similar job responsibility for the current original point
+    most_similar_responsibility = find_most_similar_responsibility(point, job_responsibilities)
+
+    # Get current skills for this point
+    current_skills = extract_relevant_skills(point, skills)
+
+    # Generate optimized point using the original point, similar responsibility, and current skills
+    optimized_point = generate_optimized_point(point, most_similar_responsibility, current_skills)
+
+    return {
+        "original_point": point,
+        "similar_responsibility": most_similar_responsibility,
+        "relevant_skills": current_skills,
+        "optimized_point": optimized_point,
+    }
+
+def optimize_experience_points(original_points, job_responsibilities, skills, executor=None):
+    """Optimize every non-empty point, concurrently when an executor is given. Results keep the input order."""
+    points = [point for point in original_points if point.strip()]
+    return map_concurrently(lambda point: optimize_point(point, job_responsibilities, skills), points, executor)
+
 def batch_search_similar_job_responsibilities(points, job_responsibilities):
     """Match applicant's experience points with relevant job responsibilities."""
     similar_responsibilities_list = []
@@ -266,29 +323,26 @@ def show_analyze_bp():
 
         if original_points:
             # Clean the job responsibilities before using them
-            cleaned_job_responsibilities = []
-            for resp in job_responsibilities:
-                cleaned_resp = resp.lstrip("•- *")  # Remove common bullet point characters
-                cleaned_resp = ''.join(e for e in cleaned_resp if e.isalnum() or e.isspace())  # Remove unwanted symbols
-                cleaned_job_responsibilities.append(cleaned_resp.strip())
+            cleaned_job_responsibilities = clean_job_responsibilities(job_responsibilities)
 
             # Save cleaned job responsibilities back to session state
             st.session_state.job_responsibilities = cleaned_job_responsibilities
 
-            # Iterate over each original point to find similar responsibilities
-            for idx, point in enumerate(original_points):
-                if not point.strip():
-                    continue
-                st.write(f"**Original Point:** {point}")
+            # Optimize all points at once through the pipeline; the model calls for different points run concurrently
+            from pipeline import get_pipeline  # pipeline.py imports this module
+
+            with st.spinner("Optimizing experience points..."):
+                updated, results = get_pipeline().optimize_experience(
+                    [current_experience], cleaned_job_responsibilities, skills
+                )
 
-                # Find the most similar job responsibility for the current original point
-                most_similar_responsibility = find_most_similar_responsibility(point, cleaned_job_responsibilities)
-                
-                # Get current skills for this point
-                current_skills = extract_relevant_skills(point)  # Extract skills for the current point
-                
-                # Generate optimized point using the original point, similar responsibility, and current skills
-                optimized_point = generate_optimized_point(point, most_similar_responsibility, current_skills)
+            # Iterate over each optimized point to display and record it
+            for result in results:
+                point = result["original_point"]
+                most_similar_responsibility = result["similar_responsibility"]
+                current_skills = result["relevant_skills"]
+                optimized_point = result["optimized_point"]
+                st.write(f"**Original Point:** {point}")
 
                 # Add the optimized point to the list
                 optimized_points.append(optimized_point)
@@ -313,14 +367,11 @@ def show_analyze_bp():
                 st.write("**Optimized Experience Point:**")
                 st.write(optimized_point)
 
-            # Create updated experience entry with the optimized points
-            updated_experience = {
-                "company": current_experience["company"],
-                "position": current_experience["position"],
-                "duration": current_experience["duration"],
-                "original_descriptions": original_points,
-                "job_descriptions": optimized_points  # Store the optimized points
-            }
+            # Write this experience's similarity rows now rather than waiting for a full batch
+            background_writer.submit(similarity_writer.flush, key=("flush", SIMILARITY_CSV_PATH))
+
+            # Updated experience entry with the optimized points
+            updated_experience = updated[0]
             
             # Initialize updated_experience list in session state if it doesn't exist
             if "updated_experience" not in st.session_state:
@@ -2,10 +2,12 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 import google.generativeai as genai
-import PyPDF2
 import json
 from datetime import datetime
 from typing import Dict, List, Any
+from pdf_extraction import get_pdf_text, read_pdf_bytes
+from repository import get_repository
+from instrumentation import instrumented
 
 # Load environment variables
 load_dotenv()
@@ -56,6 +58,7 @@ class ApplicantDataManager:
             with open(filename, 'w', encoding='utf-8') as f:
                 print("Writing data to file...")  # Debugging line
                 json.dump(formatted_data, f, indent=4, ensure_ascii=False)
+            get_repository().save_applicant(formatted_data, source_file=filename)
             return filename
         except Exception as e:
             print(f"Error saving data: {str(e)}")  # Debugging line
@@ -67,6 +70,7 @@ genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 model = genai.GenerativeModel("gemini-pro")
 
 # Function to get a response from the model
+@instrumented("llm.generate")
 def get_gemini_response(question, context):
     full_question = f"{context}\n\nQuestion: {question}"
     response = model.generate_content(full_question)
@@ -75,13 +79,9 @@ def get_gemini_response(question, context):
     except (ValueError, AttributeError):
         return "Not found"
 
-# Function to extract text from PDF using PyPDF2
+# Function to extract text from PDF using PyPDF2 (shared, cached extractor)
 def extract_text_from_pdf(uploaded_file):
-    pdf_reader = PyPDF2.PdfReader(uploaded_file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() or ""
-    return text
+    return get_pdf_text(read_pdf_bytes(uploaded_file))
 
 # Functions to extract applicant information
 def extract_applicant_name(text):
@@ -2,9 +2,15 @@ import streamlit as st
 import os
 from dotenv import load_dotenv
 import google.generativeai as genai
-import PyPDF2
-import json
 from datetime import datetime
+from cache_utils import content_hash
+from concurrency import map_concurrently
+from pdf_extraction import get_pdf_text, read_pdf_bytes
+from repository import get_repository
+from dedup import dedup_summary
+from persistence import background_writer, snapshot
+from artifact_store import get_session_id, write_artifact
+from instrumentation import instrumented
 
 # Load environment variables
 load_dotenv()
@@ -74,6 +80,22 @@ def save_applicant_data_as_text():
 
 
 
+APPLICANTS_DIR = "applicants"
+
+def write_applicant_json(applicant_data, session_id, directory=APPLICANTS_DIR, filename=None, source_hash=None):
+    """Write an applicant data dictionary to <directory>/<session_id>/, record it in the repository and return the file path."""
+    # Define the file name with a timestamp unless the caller chose one
+    if filename is None:
+        filename = f"applicant_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+    # Written atomically, and skipped if the file already holds the same data
+    file_path, _ = write_artifact(directory, session_id, filename, applicant_data)
+
+    # Index the record so it can be found by resume hash, name or date
+    get_repository().save_applicant(applicant_data, content_hash=source_hash, source_file=file_path)
+
+    return file_path
+
 def save_applicant_data_to_json():
     """Save applicant data to a JSON file in the applicants directory."""
     # Collect data from session state
@@ -88,17 +110,21 @@ def save_applicant_data_to_json():
         "special_achievements": st.session_state.get("special_achievements", ["Not found"]),
     }
 
-    # Create the directory if it doesn't exist
-    directory = "applicants"
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-
-    # Define the file path with a timestamp
-    filename = f"{directory}/applicant_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-
-    # Write data to a JSON file
-    with open(filename, "w") as json_file:
-        json.dump(applicant_data, json_file, indent=4)
+    # Choose the file name now; the write itself happens on the background writer thread.
+    # Files live under the session's directory, so two sessions saving in the same second never share a path
+    # (which is also the coalescing key).
+    session_id = get_session_id(st.session_state)
+    filename = f"applicant_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    file_path = os.path.join(APPLICANTS_DIR, session_id, filename)
+    background_writer.submit(
+        write_applicant_json,
+        snapshot(applicant_data),
+        session_id,
+        filename=filename,
+        source_hash=st.session_state.get("pdf_text_hash"),
+        key=file_path,
+    )
+    filename = file_path
 
     # Save the filename in session state
     st.session_state.json_filename = filename  # Store the JSON filename
@@ -111,6 +137,7 @@ genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 model = genai.GenerativeModel("gemini-1.5-flash")
 
 # Function to get a response from the model
+@instrumented("llm.generate")
 def get_gemini_response(question, context):
     full_question = f"{context}\n\nQuestion: {question}"
     response = model.generate_content(full_question)
@@ -119,13 +146,9 @@ def get_gemini_response(question, context):
     except (ValueError, AttributeError):
         return "Not found"
 
-# Function to extract text from PDF using PyPDF2
+# Function to extract text from PDF using PyPDF2 (cached by content hash)
 def extract_text_from_pdf(uploaded_file):
-    pdf_reader = PyPDF2.PdfReader(uploaded_file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() or ""
-    return text
+    return get_pdf_text(read_pdf_bytes(uploaded_file))
 
 # Functions to extract applicant information
 def extract_applicant_name(text):
@@ -225,6 +248,60 @@ def extract_special_achievements(text):
     response = get_gemini_response(question, text)
     return [achievement.strip() for achievement in response.splitlines() if achievement.strip()] or ["Not found"]
 
+APPLICANT_EXTRACTORS = {
+    "name": extract_applicant_name,
+    "email": extract_applicant_email,
+    "mobile": extract_applicant_mobile,
+    "professional_summary": extract_applicant_prof_summary,
+    "experience": extract_applicant_experience,
+    "skills": extract_applicant_skills,
+    "education": extract_applicant_education,
+    "special_achievements": extract_special_achievements,
+}
+
+def extract_applicant_data(text, executor=None):
+    """Run every extractor over the resume text and return data in the save_applicant_data_to_json shape.
+
+    The extractors are independent model calls, so they run concurrently when an executor is given.
+    """
+    fields = list(APPLICANT_EXTRACTORS)
+    values = map_concurrently(lambda field: APPLICANT_EXTRACTORS[field](text), fields, executor)
+    return dict(zip(fields, values))
+
+def rehydrate_applicant_session(applicant_data, only_missing=False):
+    """Load extracted applicant data into session state so the detail pages skip extraction.
+
+    only_missing keeps fields the user has already edited.
+    """
+    values = {
+        "name": applicant_data.get("name", "Not found"),
+        "email": applicant_data.get("email", "Not found"),
+        "mobile": applicant_data.get("mobile", "Not found"),
+        "prof_summary": applicant_data.get("professional_summary", "Not found"),
+        "experience": applicant_data.get("experience", []),
+        "skills": applicant_data.get("skills", ["Not found"]),
+        "education": applicant_data.get("education", ["Not found"]),
+        "special_achievements": applicant_data.get("special_achievements", ["Not found"]),
+    }
+    for key, value in values.items():
+        if not only_missing or key not in st.session_state:
+            st.session_state[key] = value
+
+def get_app_pipeline():
+    """Return the pipeline shared by the pages (imported here because pipeline.py imports this module)."""
+    from pipeline import get_pipeline
+    return get_pipeline()
+
+def ensure_applicant_extracted(keys):
+    """Extract the applicant data through the pipeline if any of the given session keys is missing."""
+    if all(key in st.session_state for key in keys):
+        return
+    # The upload page has already looked for an earlier extraction of this resume text
+    applicant_data = get_app_pipeline().extract_applicant(
+        st.session_state.pdf_text, reuse="dedup_checked_pdf_hash" not in st.session_state
+    )
+    rehydrate_applicant_session(applicant_data, only_missing=True)
+
 def show_resume_upload_status():
     st.title("Upload Applicant Resume")
 
@@ -232,8 +309,32 @@ def show_resume_upload_status():
     uploaded_file = st.file_uploader("Upload a PDF file", type="pdf")
     
     if uploaded_file is not None:
-        # Extract text from the uploaded PDF
-        pdf_text = extract_text_from_pdf(uploaded_file)
+        # Extract text from the uploaded PDF, reusing the parsed text when the content is unchanged
+        pdf_bytes = read_pdf_bytes(uploaded_file)
+        pdf_hash = content_hash(pdf_bytes)
+        if st.session_state.get("pdf_hash") == pdf_hash and "pdf_text" in st.session_state:
+            pdf_text = st.session_state.pdf_text
+        else:
+            # Show each page as soon as it has been parsed instead of waiting for the whole document
+            preview = st.empty()
+            page_texts = []
+            page_timings = []
+            for page in get_app_pipeline().stream_resume(pdf_bytes, pdf_hash):
+                page_texts.append(page.text)
+                page_timings.append(page.seconds)
+                preview.text(f"Parsed page {page.index + 1}...\n\n" + page.text[:500])
+            preview.empty()
+            pdf_text = "".join(page_texts)
+            st.session_state.pdf_page_timings = page_timings
+
+        page_timings = st.session_state.get("pdf_page_timings", [])
+        if page_timings and sum(page_timings) > 0:
+            st.caption(
+                f"Parsed {len(page_timings)} pages in {sum(page_timings):.2f}s "
+                f"(slowest page {max(page_timings):.2f}s)"
+            )
+        elif page_timings:
+            st.caption(f"Loaded {len(page_timings)} pages from cache")
 
         if pdf_text.strip():
             st.success("Resume uploaded successfully!")
@@ -242,6 +343,20 @@ def show_resume_upload_status():
 
             # Store the extracted text in session state
             st.session_state.pdf_text = pdf_text
+            st.session_state.pdf_hash = pdf_hash
+
+            # Reuse details extracted from the same resume text before, instead of calling the model again
+            if st.session_state.get("dedup_checked_pdf_hash") != pdf_hash:
+                pdf_text_hash, record = get_app_pipeline().find_applicant(pdf_text)
+                st.session_state.pdf_text_hash = pdf_text_hash
+                st.session_state.dedup_checked_pdf_hash = pdf_hash
+                st.session_state.applicant_dedup_hit = record is not None
+                if record is not None:
+                    rehydrate_applicant_session(record["data"])
+
+            if st.session_state.get("applicant_dedup_hit"):
+                st.info("This resume was processed before. Its extracted details were loaded without calling the model.")
+            st.caption(dedup_summary())
 
             # Navigate to the next page after a successful upload
             if st.button("Proceed to Extract details"):
@@ -254,13 +369,8 @@ def show_applicant_personal_details():
     """Display and edit the applicant's personal details."""
     st.title("Applicant Personal Details")
 
-    # Check if personal details are already in session state
-    if "name" not in st.session_state or "email" not in st.session_state or "mobile" not in st.session_state:
-        # Extract applicant data from the session state
-        pdf_text = st.session_state.pdf_text  # Assuming you stored the extracted PDF text in session state
-        st.session_state.name = extract_applicant_name(pdf_text)
-        st.session_state.email = extract_applicant_email(pdf_text)
-        st.session_state.mobile = extract_applicant_mobile(pdf_text)
+    # Extract the applicant data (all fields, concurrently) unless it is already in session state
+    ensure_applicant_extracted(["name", "email", "mobile"])
 
     # Start the form context
     with st.form(key="personal_details_form"):
@@ -291,12 +401,8 @@ def show_applicant_professional_summary_and_experience():
     """Display and edit the applicant's professional summary and work experience."""
     st.title("Professional Summary and Work Experience")
 
-    # Check if professional summary and experiences are already in session state
-    if "prof_summary" not in st.session_state or "experience" not in st.session_state:
-        # Extract applicant data from the session state
-        pdf_text = st.session_state.pdf_text  # Assuming you stored the extracted PDF text in session state
-        st.session_state.prof_summary = extract_applicant_prof_summary(pdf_text)
-        st.session_state.experience = extract_applicant_experience(pdf_text)
+    # Extract the applicant data unless the professional summary and experiences are already in session state
+    ensure_applicant_extracted(["prof_summary", "experience"])
 
     # Use the values from session state
     prof_summary = st.session_state.prof_summary
@@ -365,13 +471,8 @@ def show_applicant_skills_education_achievements():
     """Display the applicant's skills, education, and special achievements."""
     st.title("Qualifications and Skills")
 
-    # Check if skills, education, and achievements are already in session state
-    if "skills" not in st.session_state or "education" not in st.session_state or "special_achievements" not in st.session_state:
-        # Extract applicant data from the session state
-        pdf_text = st.session_state.pdf_text  # Assuming you stored the extracted PDF text in session state
-        st.session_state.skills = extract_applicant_skills(pdf_text)
-        st.session_state.education = extract_applicant_education(pdf_text)
-        st.session_state.special_achievements = extract_special_achievements(pdf_text)
+    # Extract the applicant data unless skills, education, and achievements are already in session state
+    ensure_applicant_extracted(["skills", "education", "special_achievements"])
 
     # Retrieve data from session state
     skills = st.session_state.skills
@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+import uuid
+
+from cache_utils import BoundedCache, content_hash
+
+# Content hash of the last version written to each path by this process
+_written_hashes = BoundedCache(max_entries=4096)
+_stats = {"writes": 0, "skipped_writes": 0, "bytes_written": 0, "bytes_saved": 0}
+_lock = threading.Lock()
+
+
+def get_session_id(session_state):
+    """Return a stable id for the Streamlit session, creating one on first use."""
+    if "session_id" not in session_state:
+        session_state.session_id = uuid.uuid4().hex
+    return session_state.session_id
+
+
+def _serialize(content):
+    if isinstance(content, bytes):
+        return content
+    if isinstance(content, str):
+        return content.encode("utf-8")
+    return json.dumps(content, indent=4, ensure_ascii=False).encode("utf-8")
+
+
+def _file_hash(path):
+    try:
+        with open(path, "rb") as existing_file:
+            return content_hash(existing_file.read())
+    except OSError:
+        return None
+
+
+def write_artifact(directory, session_id, name, content):
+    """Atomically write content to <directory>/<session_id>/<name> unless it is already there.
+
+    content may be bytes, text or a JSON-serializable object. Returns (path, written).
+    written is False if the file already held identical content.
+    """
+    session_directory = os.path.join(directory, session_id)
+    path = os.path.join(session_directory, name)
+    data = _serialize(content)
+    data_hash = content_hash(data)
+
+    previous_hash = _written_hashes.get(path)
+    if previous_hash is None and os.path.exists(path):
+        previous_hash = _file_hash(path)
+
+    if previous_hash == data_hash:
+        _written_hashes.put(path, data_hash)
+        with _lock:
+            _stats["skipped_writes"] += 1
+            _stats["bytes_saved"] += len(data)
+        return path, False
+
+    os.makedirs(session_directory, exist_ok=True)
+    # Write to a temp file in the same directory, then rename over the target
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "wb") as artifact_file:
+        artifact_file.write(data)
+    os.replace(tmp_path, path)
+
+    _written_hashes.put(path, data_hash)
+    with _lock:
+        _stats["writes"] += 1
+        _stats["bytes_written"] += len(data)
+    return path, True
+
+
+def artifact_stats():
+    """Return counts of writes performed and skipped, and the bytes each accounted for."""
+    with _lock:
+        return dict(_stats)
+
+
+def artifact_summary():
+    """Return the write statistics as a short human-readable line."""
+    stats = artifact_stats()
+    return (
+        f"Artifact writes: {stats['writes']} written ({stats['bytes_written']:,} bytes), "
+        f"{stats['skipped_writes']} unchanged and skipped ({stats['bytes_saved']:,} bytes saved)"
+    )
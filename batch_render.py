@@ -0,0 +1,172 @@
+"""Render a folder of tailored resume JSON files to PDFs in one ZIP archive.
+
+Usage:
+    python batch_render.py updated_applicant/ --output resumes.zip --workers 4
+
+Documents are rendered on a process pool and written to the archive in sorted
+input order as soon as they are ready, so only a small window of PDFs is ever
+held in memory. A manifest.csv with per-document render times is added last.
+With --compact the standard layout is rendered too (not archived), so the
+manifest and summary report the size and page count of both.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from create_pdf import pdf_page_count, render_pdf
+from stage_timing import StageTimer
+
+# Fields create_pdf reads that saved resume JSON may not carry
+DEFAULT_FIELDS = {
+    "name": "",
+    "position": "",
+    "email": "",
+    "mobile": "",
+    "generated_prof_summary": "",
+    "experience": [],
+    "education": [],
+    "achievements": [],
+}
+
+
+def find_resume_files(input_dir):
+    """Return every JSON file under input_dir, sorted so the archive order is deterministic."""
+    json_paths = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if name.lower().endswith(".json"):
+                json_paths.append(os.path.join(root, name))
+    return sorted(json_paths)
+
+
+def render_document(json_path, compact=False):
+    """Load one resume JSON file and render it. Returns (pdf_bytes, render_seconds, standard_pdf_bytes).
+
+    standard_pdf_bytes is the standard render (pdf_bytes itself unless compact), for the size comparison.
+    """
+    with open(json_path, "r", encoding="utf-8") as json_file:
+        applicant_data = dict(DEFAULT_FIELDS, **json.load(json_file))
+    pdf, seconds, _ = render_pdf(applicant_data, compact)
+    standard_pdf = render_pdf(applicant_data)[0] if compact else pdf
+    return pdf, seconds, standard_pdf
+
+
+def archive_name(json_path, input_dir):
+    return os.path.splitext(os.path.relpath(json_path, input_dir))[0].replace(os.sep, "/") + ".pdf"
+
+
+def run_batch_render(input_dir, output_path, workers=4, compression=zipfile.ZIP_DEFLATED, compact=False):
+    """Render every resume under input_dir into output_path and return a summary dict."""
+    json_paths = find_resume_files(input_dir)
+    print(f"Found {len(json_paths)} resume files in {input_dir}")
+
+    timer = StageTimer()
+    manifest = []
+    total_bytes = 0
+    standard_bytes = 0
+    pages = 0
+    standard_pages = 0
+    failed = 0
+    started = time.perf_counter()
+
+    # Futures are consumed in submission order; the window bounds how many PDFs sit in memory
+    max_in_flight = workers * 2
+    queue = iter(json_paths)
+    in_flight = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, zipfile.ZipFile(output_path, "w", compression) as archive:
+        while True:
+            while len(in_flight) < max_in_flight:
+                json_path = next(queue, None)
+                if json_path is None:
+                    break
+                in_flight.append((json_path, executor.submit(render_document, json_path, compact)))
+            if not in_flight:
+                break
+
+            json_path, future = in_flight.popleft()
+            name = archive_name(json_path, input_dir)
+            try:
+                pdf, seconds, standard_pdf = future.result()
+            except Exception as e:
+                failed += 1
+                manifest.append({
+                    "file": name, "source": json_path, "status": "failed", "bytes": 0, "pages": 0,
+                    "standard_bytes": 0, "standard_pages": 0, "seconds": 0.0, "error": str(e),
+                })
+                print(f"Failed to render {json_path}: {str(e)}")
+                continue
+
+            write_started = time.perf_counter()
+            archive.writestr(name, pdf)
+            timer.record("render", seconds)
+            timer.record("write", time.perf_counter() - write_started)
+            total_bytes += len(pdf)
+            standard_bytes += len(standard_pdf)
+            pages += pdf_page_count(pdf)
+            standard_pages += pdf_page_count(standard_pdf)
+            manifest.append({
+                "file": name, "source": json_path, "status": "done", "bytes": len(pdf), "pages": pdf_page_count(pdf),
+                "standard_bytes": len(standard_pdf), "standard_pages": pdf_page_count(standard_pdf),
+                "seconds": round(seconds, 4), "error": "",
+            })
+
+            processed = len(manifest)
+            elapsed = time.perf_counter() - started
+            print(f"[{processed}/{len(json_paths)}] {name} {len(pdf) / 1024:.1f} KB in {seconds:.2f}s ({processed / elapsed:.2f} docs/s)")
+
+        manifest_text = io.StringIO()
+        writer = csv.DictWriter(manifest_text, fieldnames=["file", "source", "status", "bytes", "pages", "standard_bytes", "standard_pages", "seconds", "error"])
+        writer.writeheader()
+        writer.writerows(manifest)
+        archive.writestr("manifest.csv", manifest_text.getvalue())
+
+    elapsed = time.perf_counter() - started
+    rendered = len(manifest) - failed
+    return {
+        "rendered": rendered,
+        "failed": failed,
+        "pdf_bytes": total_bytes,
+        "pages": pages,
+        "standard_pdf_bytes": standard_bytes,
+        "standard_pages": standard_pages,
+        "archive_bytes": os.path.getsize(output_path),
+        "seconds": elapsed,
+        "throughput": rendered / elapsed if elapsed else 0.0,
+        "report": timer.report(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a folder of resume JSON files into a ZIP of PDFs.")
+    parser.add_argument("input_dir", help="Folder containing resume JSON files (searched recursively)")
+    parser.add_argument("--output", default="resumes.zip", help="ZIP archive to write")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of render processes")
+    parser.add_argument("--store", action="store_true", help="Store PDFs uncompressed in the archive")
+    parser.add_argument("--compact", action="store_true", help="Render compact PDFs (smaller type and spacing) and compare them with the standard layout")
+    args = parser.parse_args()
+
+    compression = zipfile.ZIP_STORED if args.store else zipfile.ZIP_DEFLATED
+    summary = run_batch_render(args.input_dir, args.output, args.workers, compression, args.compact)
+
+    print("\n### Batch Render Summary ###")
+    print(f"Rendered: {summary['rendered']} (failed {summary['failed']})")
+    print(f"PDF bytes: {summary['pdf_bytes']:,}, archive: {summary['archive_bytes']:,} bytes")
+    if args.compact and summary["standard_pdf_bytes"]:
+        saved = 1 - summary["pdf_bytes"] / summary["standard_pdf_bytes"]
+        print(f"Standard layout: {summary['standard_pdf_bytes']:,} bytes, {summary['standard_pages']} pages; "
+              f"compact: {summary['pdf_bytes']:,} bytes, {summary['pages']} pages ({saved:.0%} smaller)")
+    print(f"Elapsed: {summary['seconds']:.1f}s, throughput: {summary['throughput']:.2f} docs/s")
+    print("\n### Per-document Latency ###")
+    for line in summary["report"]:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
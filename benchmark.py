@@ -0,0 +1,319 @@
+"""Benchmark every pipeline stage against fixture resumes and job descriptions.
+
+Usage:
+    python benchmark.py                          # run and compare with benchmarks/baseline.json
+    python benchmark.py --save-baseline          # run and store the results as the new baseline
+    python benchmark.py --stage extract --rounds 20
+    python benchmark.py --record                 # call the real models and record their answers
+
+The model is replaced by mock_llm.ReplayLLM, which answers from
+benchmarks/fixtures/llm_responses.json, so the numbers measure this code and
+not the API (--llm-latency adds a fixed delay per call). Every stage gets
+warmup rounds, timed rounds and one extra round under tracemalloc for its
+peak memory. Caches the stage would hit (PDF text, scores, rendered PDFs)
+are cleared before each round. Side effects (PDF cache, similarity.csv) go
+to a temporary directory.
+
+The run exits with status 1 if any stage is slower or uses more memory than
+the baseline by more than --tolerance.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+
+import streamlit as st
+
+import analyze_bulletpoints
+import mock_llm
+import pdf_extraction
+import similarity_engine
+from analyze_bulletpoints import SIMILARITY_COLUMNS, find_most_similar_responsibility, save_data_entry, sbert_model
+from applicant_resume_upload import APPLICANT_EXTRACTORS, extract_text_from_pdf
+from create_pdf import build_pdf, create_pdf, render_cache
+from csv_store import AppendOnlyCSVWriter
+from job_description import JOB_EXTRACTORS
+from persistence import background_writer
+from professional_experience import generate_professional_summary
+from stage_timing import StageTimer
+
+BENCHMARK_DIR = "benchmarks"
+FIXTURES_DIR = os.path.join(BENCHMARK_DIR, "fixtures")
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Differences below these floors are noise, whatever the relative change
+MIN_REGRESSION_SECONDS = 0.002
+MIN_REGRESSION_KB = 64
+
+# run() does one round of work on `items` inputs; setup/teardown run outside the timing
+Stage = namedtuple("Stage", ["name", "run", "items", "setup", "teardown"], defaults=[1, None, None])
+
+
+def load_fixtures(fixtures_dir):
+    """Return (resume PDFs, job descriptions, tailored resume) from the fixtures directory.
+
+    If the directory has no PDFs, the tailored resume (resume.json) is rendered as the fixture resume.
+    """
+    with open(os.path.join(fixtures_dir, "resume.json"), "r", encoding="utf-8") as resume_file:
+        resume = json.load(resume_file)
+    pdfs = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.pdf"))):
+        with open(path, "rb") as pdf_file:
+            pdfs.append(pdf_file.read())
+    if not pdfs:
+        pdfs.append(build_pdf(resume))
+    job_descriptions = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as job_file:
+            job_descriptions.append(job_file.read())
+    return pdfs, job_descriptions, resume
+
+
+def isolate(workdir):
+    """Send the stages' side effects to workdir instead of the app's real files."""
+    pdf_extraction.PDF_CACHE_DIR = os.path.join(workdir, "pdf_cache")
+    analyze_bulletpoints.similarity_writer = AppendOnlyCSVWriter(
+        os.path.join(workdir, "similarity.csv"), SIMILARITY_COLUMNS
+    )
+
+
+def clear_pdf_caches():
+    pdf_extraction._pdf_pages_cache.clear()
+    shutil.rmtree(pdf_extraction.PDF_CACHE_DIR, ignore_errors=True)
+
+
+def build_stages(pdfs, job_descriptions, resume):
+    """Return the list of stages, in pipeline order."""
+    stages = [
+        Stage("extract_text_from_pdf", lambda: [extract_text_from_pdf(pdf) for pdf in pdfs], len(pdfs), clear_pdf_caches),
+    ]
+
+    clear_pdf_caches()
+    texts = [extract_text_from_pdf(pdf) for pdf in pdfs]
+    for field, extractor in APPLICANT_EXTRACTORS.items():
+        stages.append(Stage(f"extract_applicant.{field}", lambda extractor=extractor: [extractor(text) for text in texts], len(texts)))
+    for field, extractor in JOB_EXTRACTORS.items():
+        stages.append(Stage(
+            f"extract_job.{field}", lambda extractor=extractor: [extractor(job) for job in job_descriptions], len(job_descriptions)
+        ))
+
+    responsibilities = [
+        JOB_EXTRACTORS["job_responsibilities"](job) for job in job_descriptions
+    ]
+    triples = [
+        (original, optimized)
+        for exp in resume["experience"]
+        for original, optimized in zip(exp["original_descriptions"], exp["job_descriptions"])
+    ]
+    stages.append(Stage(
+        "find_most_similar_responsibility",
+        lambda: [find_most_similar_responsibility(original, job) for job in responsibilities for original, _ in triples],
+        len(responsibilities) * len(triples),
+    ))
+
+    similar = [find_most_similar_responsibility(original, responsibilities[0]) for original, _ in triples]
+    stages.append(Stage(
+        "save_data_entry",
+        lambda: [save_data_entry(original, match, optimized, sbert_model) for (original, optimized), match in zip(triples, similar)],
+        len(triples),
+        setup=lambda: st.session_state.update(data_entries=[]),
+        teardown=lambda: background_writer.flush(timeout=30),
+    ))
+
+    sessions = [
+        {
+            "skills": resume["skills"],
+            "experience": [{"job_descriptions": exp["original_descriptions"]} for exp in resume["experience"]],
+            "Professional Summary": "",
+            "updated_skills": resume["skills"],
+            "updated_experience": resume["experience"],
+            "generated_prof_summary": resume["generated_prof_summary"],
+            "job_responsibilities": job_responsibilities,
+            "special_skills": JOB_EXTRACTORS["special_skills"](job),
+            "requirements": JOB_EXTRACTORS["required_qualifications"](job),
+        }
+        for job, job_responsibilities in zip(job_descriptions, responsibilities)
+    ]
+    # The similarity and word similarity pages score with and without the job requirements
+    stages.append(Stage(
+        "similarity_pages",
+        lambda: [similarity_engine.score_session(session, include) for session in sessions for include in (True, False)],
+        len(sessions) * 2,
+        setup=similarity_engine.score_cache.clear,
+    ))
+
+    def summary_setup():
+        st.session_state.update(final_skills=resume["skills"], updated_experience=resume["experience"])
+
+    stages.append(Stage(
+        "generate_professional_summary",
+        lambda: [generate_professional_summary(resume, job) for job in job_descriptions],
+        len(job_descriptions),
+        setup=summary_setup,
+    ))
+    stages.append(Stage("create_pdf", lambda: create_pdf(resume), setup=render_cache.clear))
+    stages.append(Stage("create_pdf.compact", lambda: create_pdf(resume, compact=True), setup=render_cache.clear))
+    return stages
+
+
+def timed_round(stage):
+    if stage.setup:
+        stage.setup()
+    started = time.perf_counter()
+    stage.run()
+    seconds = time.perf_counter() - started
+    if stage.teardown:
+        stage.teardown()
+    return seconds
+
+
+def peak_memory_kb(stage):
+    """Run one round under tracemalloc and return its peak allocation in KB."""
+    if stage.setup:
+        stage.setup()
+    tracemalloc.start()
+    try:
+        stage.run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    if stage.teardown:
+        stage.teardown()
+    return peak / 1024
+
+
+def run_benchmarks(stages, rounds=5, warmup=1):
+    """Return {stage: {count, mean, p50, p95, max, items_per_second, peak_kb}}."""
+    timer = StageTimer()
+    peaks = {}
+    for stage in stages:
+        for _ in range(warmup):
+            timed_round(stage)
+        for _ in range(rounds):
+            timer.record(stage.name, timed_round(stage))
+        # Measured separately so tracing overhead stays out of the timings
+        peaks[stage.name] = peak_memory_kb(stage)
+        print(f"  {stage.name}")
+
+    items = {stage.name: stage.items for stage in stages}
+    results = {}
+    for name, stats in timer.summary().items():
+        stats["items_per_second"] = items[name] / stats["mean"] if stats["mean"] else 0.0
+        stats["peak_kb"] = peaks[name]
+        results[name] = stats
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages for stages slower or larger than baseline * (1 + tolerance)."""
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric, floor, unit in [("mean", MIN_REGRESSION_SECONDS, "s"), ("peak_kb", MIN_REGRESSION_KB, " KB")]:
+            limit = previous[metric] * (1 + tolerance)
+            if stats[metric] > limit and stats[metric] - previous[metric] > floor:
+                regressions.append(
+                    f"{name}: {metric} {stats[metric]:.3f}{unit} vs baseline {previous[metric]:.3f}{unit} "
+                    f"(+{stats[metric] / previous[metric] - 1:.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage with fixture inputs and a replayed model.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory with resume PDFs/resume.json, job description .txt files and llm_responses.json")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per stage")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed rounds per stage (model loads, imports)")
+    parser.add_argument("--stage", action="append", default=[], help="Only run stages whose name contains this text")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds the mock model waits per call")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown / memory growth per stage")
+    parser.add_argument("--json", help="Optionally write the results to this JSON file")
+    parser.add_argument("--record", action="store_true", help="Use the real models and record their answers into llm_responses.json")
+    args = parser.parse_args()
+
+    responses_path = os.path.join(args.fixtures, "llm_responses.json")
+    responses = mock_llm.load_responses(responses_path)
+    if args.record:
+        import importlib
+
+        recorders = []
+        for name in mock_llm.LLM_MODULES:
+            module = importlib.import_module(name)
+            module.model = mock_llm.RecordingLLM(module.model, responses)
+            recorders.append(module.model)
+        llm = None
+    else:
+        llm = mock_llm.ReplayLLM(responses, latency=args.llm_latency)
+        mock_llm.install(llm)
+
+    workdir = tempfile.mkdtemp(prefix="benchmark-")
+    try:
+        isolate(workdir)
+        pdfs, job_descriptions, resume = load_fixtures(args.fixtures)
+        stages = build_stages(pdfs, job_descriptions, resume)
+        if args.stage:
+            stages = [stage for stage in stages if any(text in stage.name for text in args.stage)]
+        print(f"Running {len(stages)} stages ({args.warmup} warmup + {args.rounds} rounds each)")
+        results = run_benchmarks(stages, args.rounds, args.warmup)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.record:
+        recorders[0].save(responses_path)
+        print(f"Recorded {len(responses['recorded'])} responses to {responses_path}")
+
+    print("\n### Benchmark Results ###")
+    for name, stats in results.items():
+        print(
+            f"{name:<42} mean={stats['mean'] * 1000:9.2f}ms p95={stats['p95'] * 1000:9.2f}ms "
+            f"{stats['items_per_second']:10.1f} items/s peak={stats['peak_kb']:10.1f} KB"
+        )
+    if llm is not None:
+        model_stats = llm.stats()
+        print(f"Model calls: {model_stats['calls']} ({model_stats['replayed']} replayed, {model_stats['defaulted']} default answers)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=4)
+
+    if args.save_baseline:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+                baseline = json.load(baseline_file)
+        except (OSError, ValueError):
+            baseline = {}
+        # Stages not run this time (--stage) keep their stored baseline
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(baseline, baseline_file, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+    except (OSError, ValueError):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) past {args.tolerance:.0%}:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print(f"\nNo regressions past {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Headless bulk ingestion of a folder of resume PDFs.
+
+Usage:
+    python bulk_ingest.py resumes/ --workers 4 --output-dir applicants
+
+Each PDF goes through the same extractors as the Streamlit upload flow and is
+written as JSON in the save_applicant_data_to_json shape, under
+<output-dir>/bulk_ingest/. Progress is
+checkpointed so an interrupted run picks up where it left off.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from applicant_resume_upload import extract_applicant_data, write_applicant_json, APPLICANTS_DIR
+from cache_utils import content_hash
+from dedup import dedup_summary, lookup_applicant
+from pdf_extraction import get_pdf_text
+from stage_timing import StageTimer
+
+DEFAULT_CHECKPOINT = "bulk_ingest_checkpoint.jsonl"
+# Applicant files are written per session like the upload flow's; a bulk run is one "session"
+BULK_SESSION_ID = "bulk_ingest"
+
+
+def find_pdfs(input_dir):
+    """Return every PDF under input_dir, sorted for a stable processing order."""
+    pdf_paths = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if name.lower().endswith(".pdf"):
+                pdf_paths.append(os.path.join(root, name))
+    return sorted(pdf_paths)
+
+
+def load_checkpoint(checkpoint_path):
+    """Return the set of source paths that were already ingested successfully."""
+    done = set()
+    if not os.path.exists(checkpoint_path):
+        return done
+    with open(checkpoint_path, "r", encoding="utf-8") as checkpoint_file:
+        for line in checkpoint_file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Ignore a line cut short by an interrupted run
+            if record.get("status") == "done":
+                done.add(record["source"])
+    return done
+
+
+def ingest_resume(pdf_path, output_dir):
+    """Parse, extract and save one resume. Returns a checkpoint record with per-stage timings."""
+    timings = {}
+
+    started = time.perf_counter()
+    with open(pdf_path, "rb") as pdf_file:
+        pdf_bytes = pdf_file.read()
+    pdf_hash = content_hash(pdf_bytes)
+    pdf_text = get_pdf_text(pdf_bytes, pdf_hash)
+    timings["parse"] = time.perf_counter() - started
+
+    if not pdf_text.strip():
+        raise ValueError("no text could be extracted from the PDF")
+
+    # Skip the model entirely when the same resume text was extracted before
+    started = time.perf_counter()
+    text_hash, record = lookup_applicant(pdf_text)
+    timings["dedup"] = time.perf_counter() - started
+    if record is not None:
+        return {"source": pdf_path, "sha256": pdf_hash, "output": record["source_file"], "status": "done",
+                "dedup_hit": True, "timings": timings}
+
+    started = time.perf_counter()
+    applicant_data = extract_applicant_data(pdf_text)
+    timings["extract"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    safe_stem = ''.join(e for e in stem if e.isalnum() or e in "-_")
+    output_path = write_applicant_json(
+        applicant_data, BULK_SESSION_ID, output_dir, f"{safe_stem}_{pdf_hash[:8]}.json", source_hash=text_hash
+    )
+    timings["write"] = time.perf_counter() - started
+
+    return {"source": pdf_path, "sha256": pdf_hash, "output": output_path, "status": "done", "timings": timings}
+
+
+def run_bulk_ingest(input_dir, output_dir=APPLICANTS_DIR, workers=4, checkpoint_path=DEFAULT_CHECKPOINT):
+    """Ingest every PDF under input_dir on a bounded worker pool and return a summary dict."""
+    pdf_paths = find_pdfs(input_dir)
+    done = load_checkpoint(checkpoint_path)
+    pending = [path for path in pdf_paths if path not in done]
+    print(f"Found {len(pdf_paths)} PDFs, {len(done)} already ingested, {len(pending)} to process")
+
+    timer = StageTimer()
+    succeeded = 0
+    failed = 0
+    started = time.perf_counter()
+
+    # Keep only a couple of tasks per worker in flight so memory stays bounded for huge folders
+    max_in_flight = workers * 2
+    queue = iter(pending)
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor, open(checkpoint_path, "a", encoding="utf-8") as checkpoint_file:
+        while True:
+            while len(in_flight) < max_in_flight:
+                pdf_path = next(queue, None)
+                if pdf_path is None:
+                    break
+                in_flight[executor.submit(ingest_resume, pdf_path, output_dir)] = pdf_path
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                pdf_path = in_flight.pop(future)
+                try:
+                    record = future.result()
+                    timer.merge(record.pop("timings"))
+                    succeeded += 1
+                except Exception as e:
+                    record = {"source": pdf_path, "status": "failed", "error": str(e)}
+                    failed += 1
+                    print(f"Failed to ingest {pdf_path}: {str(e)}")
+
+                # Record progress immediately so an interrupted run can resume
+                checkpoint_file.write(json.dumps(record) + "\n")
+                checkpoint_file.flush()
+                os.fsync(checkpoint_file.fileno())
+
+                processed = succeeded + failed
+                elapsed = time.perf_counter() - started
+                print(f"[{processed}/{len(pending)}] {pdf_path} ({processed / elapsed:.2f} resumes/s)")
+
+    elapsed = time.perf_counter() - started
+    return {
+        "processed": succeeded + failed,
+        "succeeded": succeeded,
+        "failed": failed,
+        "skipped": len(done),
+        "seconds": elapsed,
+        "throughput": (succeeded + failed) / elapsed if elapsed else 0.0,
+        "stages": timer.summary(),
+        "report": timer.report(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingest a folder of resume PDFs.")
+    parser.add_argument("input_dir", help="Folder containing resume PDFs (searched recursively)")
+    parser.add_argument("--output-dir", default=APPLICANTS_DIR, help="Where to write the applicant JSON files")
+    parser.add_argument("--workers", type=int, default=4, help="Number of resumes processed concurrently")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Checkpoint file used to resume interrupted runs")
+    args = parser.parse_args()
+
+    summary = run_bulk_ingest(args.input_dir, args.output_dir, args.workers, args.checkpoint)
+
+    print("\n### Bulk Ingest Summary ###")
+    print(f"Processed: {summary['processed']} (succeeded {summary['succeeded']}, failed {summary['failed']}, skipped {summary['skipped']})")
+    print(f"Elapsed: {summary['seconds']:.1f}s, throughput: {summary['throughput']:.2f} resumes/s")
+    print("\n### Per-stage Latency ###")
+    for line in summary["report"]:
+        print(line)
+    print(dedup_summary())
+
+
+if __name__ == "__main__":
+    main()
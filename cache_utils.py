@@ -0,0 +1,81 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def content_hash(data):
+    """Return the SHA-256 hex digest of bytes or text content."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class BoundedCache:
+    """Thread-safe LRU cache bounded by entry count and (optionally) total size."""
+
+    def __init__(self, max_entries=32, max_bytes=None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for key and mark it as recently used."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries when over budget."""
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._sizes.pop(key)
+                del self._entries[key]
+            # Never keep a single value that is bigger than the whole budget
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._total_bytes > self.max_bytes
+            ):
+                old_key, _ = self._entries.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(old_key)
+
+    def clear(self):
+        """Drop every entry (hit/miss counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """Return hit/miss counters and current usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,30 @@
+import contextvars
+import os
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+# Model calls spend nearly all their time waiting on the network, so a thread
+# pool is enough to run several of them at once.
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+
+llm_executor = ThreadPoolExecutor(max_workers=LLM_CONCURRENCY, thread_name_prefix="llm")
+
+
+class SerialExecutor(Executor):
+    """Executor that runs every task immediately in the calling thread."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def map_concurrently(fn, items, executor=None):
+    """Apply fn to every item, on the executor if one is given, and return the results in order."""
+    if executor is None:
+        return [fn(item) for item in items]
+    # Each task runs in a copy of the caller's context, so the session's instrumentation follows it onto the pool
+    tasks = [(contextvars.copy_context(), item) for item in items]
+    return list(executor.map(lambda task: task[0].run(fn, task[1]), tasks))
@@ -4,120 +4,209 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
 from reportlab.lib import colors
 import io
+import json
+import os
+import re
+import time
 import streamlit as st
+from cache_utils import BoundedCache, content_hash
+from instrumentation import instrumented
 
-def create_pdf(applicant_data):
+# Styles are built once per process and shared by every render
+styles = getSampleStyleSheet()
+title_style = ParagraphStyle(
+    'CustomTitle',
+    parent=styles['Heading1'],
+    fontName="Helvetica-Bold",
+    fontSize=18,
+    textColor=colors.HexColor("#333333"),  # Dark gray
+    spaceAfter=10,
+    alignment=TA_CENTER  # Center alignment for title
+)
+position_style = ParagraphStyle(
+    'CustomPosition',
+    parent=styles['Normal'],
+    fontName="Helvetica",
+    fontSize=14,
+    textColor=colors.HexColor("#555555"),  # Medium gray
+    spaceAfter=20,
+    alignment=TA_CENTER  # Center alignment for position
+)
+contact_style = ParagraphStyle(
+    'ContactStyle',
+    parent=styles['Normal'],
+    fontName="Helvetica",
+    fontSize=12,
+    textColor=colors.HexColor("#444444"),  # Dark gray
+    spaceAfter=10,
+    alignment=TA_CENTER  # Center alignment for email and mobile
+)
+subtitle_style = ParagraphStyle(
+    'CustomSubtitle',
+    parent=styles['Heading2'],
+    fontName="Helvetica-Bold",
+    fontSize=14,
+    textColor=colors.HexColor("#444444"),  # Slightly lighter gray
+    spaceAfter=10,
+    alignment=TA_LEFT
+)
+normal_style = ParagraphStyle(
+    'CustomNormal',
+    parent=styles['Normal'],
+    fontName="Helvetica",
+    fontSize=11,
+    leading=14,
+    textColor=colors.black,
+    alignment=TA_JUSTIFY  # Justify text for summary
+)
+bullet_style = ParagraphStyle(
+    'BulletStyle',
+    parent=normal_style,
+    bulletIndent=10,
+)
+
+# Layout of the standard and compact renders. Compact uses smaller type, tighter leading and
+# spacing and narrower margins, so a long resume needs fewer pages (and fewer bytes).
+STANDARD_LAYOUT = {
+    "title": title_style,
+    "position": position_style,
+    "contact": contact_style,
+    "subtitle": subtitle_style,
+    "normal": normal_style,
+    "bullet": bullet_style,
+    "margin": 40,
+    "header_gap": 20,
+    "section_gap": 12,
+    "footer_gap": 30,
+}
+COMPACT_LAYOUT = {
+    "title": ParagraphStyle('CompactTitle', parent=title_style, fontSize=16, leading=19, spaceAfter=4),
+    "position": ParagraphStyle('CompactPosition', parent=position_style, fontSize=12, leading=14, spaceAfter=4),
+    "contact": ParagraphStyle('CompactContact', parent=contact_style, fontSize=10, leading=12, spaceAfter=4),
+    "subtitle": ParagraphStyle('CompactSubtitle', parent=subtitle_style, fontSize=12, leading=14, spaceBefore=4, spaceAfter=4),
+    "normal": ParagraphStyle('CompactNormal', parent=normal_style, fontSize=10, leading=12),
+    "bullet": ParagraphStyle('CompactBullet', parent=bullet_style, fontSize=10, leading=12),
+    "margin": 30,
+    "header_gap": 6,
+    "section_gap": 6,
+    "footer_gap": 0,
+}
+
+# Rendered PDFs keyed by a hash of the applicant data, shared across reruns and sessions
+RENDER_CACHE_ENTRIES = int(os.getenv("RENDER_CACHE_ENTRIES", "128"))
+RENDER_CACHE_BYTES = int(os.getenv("RENDER_CACHE_BYTES", str(64 * 1024 * 1024)))
+render_cache = BoundedCache(max_entries=RENDER_CACHE_ENTRIES, max_bytes=RENDER_CACHE_BYTES)
+
+
+def render_key(applicant_data, compact=False):
+    """Return the cache key for a render of this applicant data."""
+    return content_hash(json.dumps({"data": applicant_data, "compact": compact}, sort_keys=True, default=str))
+
+
+def render_pdf(applicant_data, compact=False):
+    """Return (pdf_bytes, render_seconds, cache_hit), re-serving cached bytes for identical data."""
+    key = render_key(applicant_data, compact)
+    pdf = render_cache.get(key)
+    if pdf is not None:
+        return pdf, 0.0, True
+
+    start = time.perf_counter()
+    pdf = build_pdf(applicant_data, compact)
+    seconds = time.perf_counter() - start
+    render_cache.put(key, pdf)
+    return pdf, seconds, False
+
+
+def create_pdf(applicant_data, compact=False):
     """Generate a professional PDF resume with the requested changes."""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=40, leftMargin=40, topMargin=40, bottomMargin=40)
-
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontName="Helvetica-Bold",
-        fontSize=18,
-        textColor=colors.HexColor("#333333"),  # Dark gray
-        spaceAfter=10,
-        alignment=TA_CENTER  # Center alignment for title
-    )
-    position_style = ParagraphStyle(
-        'CustomPosition',
-        parent=styles['Normal'],
-        fontName="Helvetica",
-        fontSize=14,
-        textColor=colors.HexColor("#555555"),  # Medium gray
-        spaceAfter=20,
-        alignment=TA_CENTER  # Center alignment for position
-    )
-    contact_style = ParagraphStyle(
-        'ContactStyle',
-        parent=styles['Normal'],
-        fontName="Helvetica",
-        fontSize=12,
-        textColor=colors.HexColor("#444444"),  # Dark gray
-        spaceAfter=10,
-        alignment=TA_CENTER  # Center alignment for email and mobile
-    )
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Heading2'],
-        fontName="Helvetica-Bold",
-        fontSize=14,
-        textColor=colors.HexColor("#444444"),  # Slightly lighter gray
-        spaceAfter=10,
-        alignment=TA_LEFT
-    )
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontName="Helvetica",
-        fontSize=11,
-        leading=14,
-        textColor=colors.black,
-        alignment=TA_JUSTIFY  # Justify text for summary
-    )
-    bullet_style = ParagraphStyle(
-        'BulletStyle',
-        parent=normal_style,
-        bulletIndent=10,
+    return render_pdf(applicant_data, compact)[0]
+
+
+def pdf_page_count(pdf):
+    """Return the number of pages in a PDF written by ReportLab (one "/Type /Page" object per page)."""
+    return len(re.findall(rb"/Type /Page\b(?!s)", pdf))
+
+
+def size_comparison(standard_pdf, compact_pdf):
+    """Return a one-line standard-vs-compact comparison of size and page count."""
+    saved = 1 - len(compact_pdf) / len(standard_pdf) if standard_pdf else 0.0
+    return (
+        f"Standard PDF: {len(standard_pdf) / 1024:.1f} KB, {pdf_page_count(standard_pdf)} page(s); "
+        f"compact: {len(compact_pdf) / 1024:.1f} KB, {pdf_page_count(compact_pdf)} page(s) ({saved:.0%} smaller)"
     )
 
+
+@instrumented("pdf.render")
+def build_pdf(applicant_data, compact=False):
+    """Build the PDF resume bytes (no caching).
+
+    compact uses COMPACT_LAYOUT (smaller type, tighter leading, spacing and
+    margins) and leaves out empty flowables: the blank paragraph after each
+    experience header, blank list items (the create resume form leaves one
+    per trailing newline) and sections with nothing in them. Page streams are
+    compressed either way (ReportLab's default), and the resume only uses the
+    built-in Helvetica fonts, which are never embedded.
+    """
+    layout = COMPACT_LAYOUT if compact else STANDARD_LAYOUT
+    margin = layout["margin"]
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=margin, leftMargin=margin, topMargin=margin, bottomMargin=margin)
+
+    def items(values):
+        return [value for value in values if value.strip()] if compact else list(values)
+
+    def bullet_list(values, style):
+        return ListFlowable(
+            [ListItem(Paragraph(value, style)) for value in values],
+            bulletType="bullet",
+            bulletFontName="Helvetica-Bold",
+            bulletFontSize=10
+        )
+
     story = []
 
     # Header section
-    story.append(Paragraph(applicant_data["name"], title_style))
-    story.append(Paragraph(applicant_data["position"], position_style))
-    story.append(Paragraph(f"Email: {applicant_data['email']} | Mobile: {applicant_data['mobile']}", contact_style))
-    story.append(Spacer(1, 20))
+    story.append(Paragraph(applicant_data["name"], layout["title"]))
+    story.append(Paragraph(applicant_data["position"], layout["position"]))
+    story.append(Paragraph(f"Email: {applicant_data['email']} | Mobile: {applicant_data['mobile']}", layout["contact"]))
+    story.append(Spacer(1, layout["header_gap"]))
 
     # Professional Summary
-    story.append(Paragraph("Professional Summary", subtitle_style))
-    story.append(Paragraph(applicant_data["generated_prof_summary"], normal_style))
-    story.append(Spacer(1, 12))
+    if not compact or applicant_data["generated_prof_summary"].strip():
+        story.append(Paragraph("Professional Summary", layout["subtitle"]))
+        story.append(Paragraph(applicant_data["generated_prof_summary"], layout["normal"]))
+        story.append(Spacer(1, layout["section_gap"]))
 
     # Experience
-    story.append(Paragraph("Experience", subtitle_style))
+    story.append(Paragraph("Experience", layout["subtitle"]))
     for exp in applicant_data["experience"]:
-        story.append(Paragraph(f"{exp.get('company', 'Not found')}", normal_style))
-        story.append(Paragraph(f"{exp.get('position', 'Not found')}", normal_style))
-        story.append(Paragraph(f"{exp.get('duration', 'Not found')}", normal_style))
-        story.append(Paragraph("", normal_style))
-        job_list = ListFlowable(
-            [ListItem(Paragraph(desc, bullet_style)) for desc in exp.get("job_descriptions", ["Not found"])],
-            bulletType="bullet",
-            bulletFontName="Helvetica-Bold",
-            bulletFontSize=10
-        )
-        story.append(job_list)
-        story.append(Spacer(1, 12))
+        story.append(Paragraph(f"{exp.get('company', 'Not found')}", layout["normal"]))
+        story.append(Paragraph(f"{exp.get('position', 'Not found')}", layout["normal"]))
+        story.append(Paragraph(f"{exp.get('duration', 'Not found')}", layout["normal"]))
+        if not compact:
+            story.append(Paragraph("", normal_style))
+        job_descriptions = items(exp.get("job_descriptions", ["Not found"]))
+        if job_descriptions or not compact:
+            story.append(bullet_list(job_descriptions, layout["bullet"]))
+        story.append(Spacer(1, layout["section_gap"]))
 
     # Education
-    story.append(Paragraph("Education", subtitle_style))
-    education_list = ListFlowable(
-        [ListItem(Paragraph(edu, normal_style)) for edu in applicant_data["education"]],
-        bulletType="bullet",
-        bulletFontName="Helvetica-Bold",
-        bulletFontSize=10
-    )
-    story.append(education_list)
-    story.append(Spacer(1, 12))
+    education = items(applicant_data["education"])
+    if education or not compact:
+        story.append(Paragraph("Education", layout["subtitle"]))
+        story.append(bullet_list(education, layout["normal"]))
+        story.append(Spacer(1, layout["section_gap"]))
 
     # Achievements
-    if "achievements" in applicant_data and applicant_data["achievements"] != ["Not found"]:
-        story.append(Paragraph("Achievements", subtitle_style))
-        achievements_list = ListFlowable(
-            [ListItem(Paragraph(achievement, normal_style)) for achievement in applicant_data["achievements"]],
-            bulletType="bullet",
-            bulletFontName="Helvetica-Bold",
-            bulletFontSize=10
-        )
-        story.append(achievements_list)
-        story.append(Spacer(1, 12))
+    achievements = items(applicant_data.get("achievements", []))
+    if "achievements" in applicant_data and applicant_data["achievements"] != ["Not found"] and (achievements or not compact):
+        story.append(Paragraph("Achievements", layout["subtitle"]))
+        story.append(bullet_list(achievements, layout["normal"]))
+        story.append(Spacer(1, layout["section_gap"]))
 
     # Add footer or final space
-    story.append(Spacer(1, 30))
+    if layout["footer_gap"]:
+        story.append(Spacer(1, layout["footer_gap"]))
 
     # Build PDF
     doc.build(story)
@@ -182,12 +271,19 @@ def create_resume():
         st.subheader("Achievements")
         applicant_data["achievements"] = st.text_area("Achievements (one per line)", value="\n".join(applicant_data["achievements"])).split("\n")
 
+        compact = st.checkbox("Compact PDF (smaller type and spacing, no empty lines)", value=False)
+
         # Submit button for the form
         submitted = st.form_submit_button("Generate PDF")
 
     if submitted:
-            # Create PDF
-        pdf = create_pdf(applicant_data)
+            # Create PDF (identical data is served from the render cache)
+        pdf, render_seconds, cache_hit = render_pdf(applicant_data, compact)
+        source = "render cache" if cache_hit else f"rendered in {render_seconds:.2f}s"
+        st.caption(f"PDF size: {len(pdf) / 1024:.1f} KB, {pdf_page_count(pdf)} page(s) ({source})")
+        if compact:
+            # The standard render comes from the render cache after the first comparison
+            st.caption(size_comparison(create_pdf(applicant_data), pdf))
 
             # Provide download link
         st.download_button(
@@ -0,0 +1,105 @@
+import atexit
+import csv
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads in this process are serialized
+    fcntl = None
+
+
+class AppendOnlyCSVWriter:
+    """Append rows to a CSV file without re-reading it.
+
+    Rows are buffered and written in batches under an exclusive file lock, so
+    the cost of saving a row does not depend on how large the file already is,
+    and concurrent sessions (threads or processes) never overwrite each other.
+    If the existing header lacks some of fieldnames, the file is migrated once:
+    the missing columns are added to the header and left empty in old rows.
+    """
+
+    def __init__(self, path, fieldnames, batch_size=16, flush_interval=5.0):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def append(self, row):
+        """Buffer a row (dict keyed by column name), flushing when the batch is full or stale."""
+        with self._lock:
+            self._buffer.append(row)
+            due = (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered row to disk."""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            if not rows:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a+b") as csv_file:
+                if fcntl is not None:
+                    fcntl.flock(csv_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    self._write_rows(csv_file, rows)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(csv_file.fileno(), fcntl.LOCK_UN)
+
+    def _write_rows(self, csv_file, rows):
+        csv_file.seek(0, os.SEEK_END)
+        if csv_file.tell() == 0:
+            header = self.fieldnames
+            prefix = ""
+        else:
+            # Follow the column order of the existing header; only its first line is read
+            csv_file.seek(0)
+            header = next(csv.reader([csv_file.readline().decode("utf-8")]))
+            missing = [name for name in self.fieldnames if name not in header]
+            if missing:
+                header = self._migrate_header(csv_file, header, missing)
+            csv_file.seek(-1, os.SEEK_END)
+            prefix = "" if csv_file.read(1) == b"\n" else "\r\n"
+            csv_file.seek(0, os.SEEK_END)
+
+        lines = io.StringIO()
+        writer = csv.DictWriter(lines, fieldnames=header, extrasaction="ignore")
+        if csv_file.tell() == 0:
+            writer.writeheader()
+        writer.writerows(rows)
+        csv_file.write((prefix + lines.getvalue()).encode("utf-8"))
+        csv_file.flush()
+
+    def _migrate_header(self, csv_file, header, missing):
+        """Append the missing columns to the header line in place (same file, still locked); returns the new header."""
+        print(f"Migrating {self.path} header to add columns: {', '.join(missing)}")
+        header = header + missing
+        with tempfile.TemporaryFile() as rest:
+            # The file position is just past the old header line
+            shutil.copyfileobj(csv_file, rest)
+            rest.seek(0)
+            csv_file.seek(0)
+            csv_file.truncate()
+            header_line = io.StringIO()
+            csv.writer(header_line).writerow(header)
+            csv_file.write(header_line.getvalue().encode("utf-8"))
+            shutil.copyfileobj(rest, csv_file)
+        csv_file.flush()
+        return header
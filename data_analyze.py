@@ -1,37 +1,226 @@
+"""Streaming statistics over the similarity history and the session metrics.
+
+Usage:
+    python data_analyze.py --similarity similarity.csv --output-dir analysis
+
+similarity.csv is read in chunks, so it can be far larger than memory. Each
+score column gets a running mean/variance (Welford, merged chunk by chunk), a
+fixed-size random sample for quantiles and a fixed-bin histogram. Statistics
+are grouped by date, model and prompt version; rows written before those
+columns existed are grouped as "unknown". Session metrics from the metrics
+store are summarized by date, and their LSA coordinates by LSA version, since
+coordinates from different models (or per-session fits) are not comparable.
+
+Writes to the output directory:
+    similarity_summary.csv   per group and score column: count, mean, std, min, p25, p50, p75, max
+    similarity_density.csv   histogram (counts and density) of every score column
+    session_summary.csv      per date and session metric, same statistics as above
+    lsa_summary.csv          per LSA version and coordinate, same statistics as above
+"""
+import argparse
+import os
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
 
-def load_clean_and_show_statistics():
-    """Load similarity data from similarity.csv, clean it, and show statistics for specific columns."""
-    # Load the similarity data
-    file_path = "similarity.csv"
-    
-    try:
-        df = pd.read_csv(file_path)
-        print("### Similarity Data Loaded Successfully ###")
-        
-        # Show the first few rows of the DataFrame before cleaning
-        print("\n### Head of the Similarity Data Before Cleaning ###")
-        print(df.head())  # Display the first 5 rows
+SIMILARITY_SCORE_COLUMNS = [
+    "Similarity: Original vs Similar",
+    "Similarity: Original vs Optimized",
+    "Similarity: Similar vs Optimized",
+]
+GROUP_COLUMNS = ["Date", "Model", "Prompt Version"]
+QUANTILES = [0.25, 0.5, 0.75]
+# Cosine similarities lie in [-1, 1]
+HISTOGRAM_BINS = np.linspace(-1.0, 1.0, 81)
+QUANTILE_SAMPLE_SIZE = 10000
+
+
+class StreamingStats:
+    """Running count/mean/variance/min/max plus a bounded random sample for quantiles.
+
+    Chunks are merged with the parallel form of Welford's algorithm. The sample
+    keeps the values with the smallest random keys seen so far, which is a
+    uniform sample of everything that was added, in O(sample_size) memory.
+    """
+
+    def __init__(self, sample_size=QUANTILE_SAMPLE_SIZE, seed=0):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sample_size = sample_size
+        self._rng = np.random.default_rng(seed)
+        self._sample = np.empty(0)
+        self._keys = np.empty(0)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        n = values.size
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        self._sample = np.concatenate([self._sample, values])
+        self._keys = np.concatenate([self._keys, self._rng.random(n)])
+        if self._sample.size > self.sample_size:
+            keep = np.argpartition(self._keys, self.sample_size)[:self.sample_size]
+            self._sample = self._sample[keep]
+            self._keys = self._keys[keep]
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.0
+
+    def summary(self):
+        quantiles = np.quantile(self._sample, QUANTILES) if self.count else [np.nan] * len(QUANTILES)
+        return {
+            "count": self.count,
+            "mean": self.mean if self.count else np.nan,
+            "std": self.std,
+            "min": self.min if self.count else np.nan,
+            "p25": quantiles[0],
+            "p50": quantiles[1],
+            "p75": quantiles[2],
+            "max": self.max if self.count else np.nan,
+        }
+
+
+def _group_frame(chunk):
+    """Return the chunk's (date, model, prompt version) group columns, filling legacy rows with "unknown"."""
+    groups = pd.DataFrame(index=chunk.index)
+    recorded_at = chunk["Recorded At"] if "Recorded At" in chunk else pd.Series(np.nan, index=chunk.index)
+    groups["Date"] = pd.to_datetime(recorded_at, errors="coerce").dt.strftime("%Y-%m-%d").fillna("unknown")
+    for column in GROUP_COLUMNS[1:]:
+        values = chunk[column] if column in chunk else pd.Series(np.nan, index=chunk.index)
+        groups[column] = values.astype("string").fillna("unknown")
+    return groups
+
 
-        # Remove any empty rows
-        df.dropna(how='all', inplace=True)  # Drop rows where all elements are NaN
-        df.dropna(how='any', inplace=True)  # Drop rows where any element is NaN
+def analyze_similarity(csv_path, chunk_size=50000):
+    """Stream similarity.csv and return (summary DataFrame, density DataFrame, rows read, rows used)."""
+    stats = defaultdict(StreamingStats)
+    histograms = {column: np.zeros(len(HISTOGRAM_BINS) - 1, dtype=np.int64) for column in SIMILARITY_SCORE_COLUMNS}
+    rows_read = 0
+    rows_used = 0
 
-        # Optionally, you can reset the index after dropping rows
-        df.reset_index(drop=True, inplace=True)
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype={"Model": str, "Prompt Version": str}):
+        rows_read += len(chunk)
+        # Same cleaning as before: only rows with every score present are counted
+        chunk = chunk.dropna(subset=SIMILARITY_SCORE_COLUMNS)
+        if chunk.empty:
+            continue
+        rows_used += len(chunk)
+        scores = chunk[SIMILARITY_SCORE_COLUMNS].apply(pd.to_numeric, errors="coerce")
+        groups = _group_frame(chunk)
+        for key, index in groups.groupby(GROUP_COLUMNS).groups.items():
+            for column in SIMILARITY_SCORE_COLUMNS:
+                stats[(*key, column)].update(scores.loc[index, column].to_numpy())
+        for column in SIMILARITY_SCORE_COLUMNS:
+            values = scores[column].dropna().to_numpy()
+            histograms[column] += np.histogram(np.clip(values, -1.0, 1.0), bins=HISTOGRAM_BINS)[0]
 
-        # Show the first few rows of the DataFrame after cleaning
-        print("\n### Head of the Similarity Data After Cleaning ###")
-        print(df.head())  # Display the first 5 rows after cleaning
+    summary = pd.DataFrame(
+        [dict(zip(GROUP_COLUMNS + ["Column"], key), **value.summary()) for key, value in sorted(stats.items())]
+    )
+    width = HISTOGRAM_BINS[1] - HISTOGRAM_BINS[0]
+    density = pd.DataFrame({"Bin Start": HISTOGRAM_BINS[:-1], "Bin End": HISTOGRAM_BINS[1:]})
+    for column, counts in histograms.items():
+        density[f"{column} Count"] = counts
+        density[f"{column} Density"] = counts / (counts.sum() * width) if counts.sum() else 0.0
+    return summary, density, rows_read, rows_used
 
-        # Show statistics for columns 3, 4, and 5 (assuming 0-based indexing)
-        print("\n### Statistics for Columns 3, 4, and 5 ###")
-        print(df.iloc[:, 2:5].describe())  # Display statistics for columns 3, 4, and 5
 
+def analyze_sessions(store=None):
+    """Summarize the session metrics store by date, one part file at a time."""
+    from metrics_store import CSV_COLUMNS, MetricsStore
+
+    store = store or MetricsStore()
+    stats = defaultdict(StreamingStats)
+    scalar_columns = [name for name in CSV_COLUMNS if not name.startswith("lsa_")]
+    for part in store.parts():
+        dates = np.array([datetime.fromtimestamp(ts).strftime("%Y-%m-%d") for ts in part["recorded_at"]])
+        for date in np.unique(dates):
+            mask = dates == date
+            for name in scalar_columns:
+                stats[(date, name)].update(part[name][mask])
+    return pd.DataFrame(
+        [dict(Date=date, Column=name, **value.summary()) for (date, name), value in sorted(stats.items())]
+    )
+
+
+def lsa_version_label(version):
+    from metrics_store import UNKNOWN_LSA_VERSION
+
+    if version == UNKNOWN_LSA_VERSION:
+        return "unknown"
+    return "per-session" if version == 0 else f"v{version}"
+
+
+def analyze_lsa(store=None):
+    """Summarize every LSA coordinate per LSA version, one part file at a time."""
+    from metrics_store import LSA_DIMENSIONS, LSA_VECTOR_FIELDS, MetricsStore
+
+    store = store or MetricsStore()
+    stats = defaultdict(StreamingStats)
+    for part in store.parts():
+        for version in np.unique(part["lsa_version"]):
+            mask = part["lsa_version"] == version
+            for name in LSA_VECTOR_FIELDS:
+                for dim in range(LSA_DIMENSIONS):
+                    stats[(int(version), f"{name}_{dim + 1}")].update(part[name][mask, dim])
+    return pd.DataFrame(
+        [{"LSA Version": lsa_version_label(version), "Column": name, **value.summary()}
+         for (version, name), value in sorted(stats.items())]
+    )
+
+
+def load_clean_and_show_statistics(file_path="similarity.csv", output_dir="analysis", chunk_size=50000):
+    """Compute streaming statistics for similarity.csv and the session metrics, print them and save the tables."""
+    try:
+        summary, density, rows_read, rows_used = analyze_similarity(file_path, chunk_size)
     except FileNotFoundError:
-        print("Error: similarity.csv file not found.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
+        print(f"Error: {file_path} file not found.")
+        return
+    print(f"### Similarity Data: {rows_read} rows read, {rows_used} with all scores ###")
+    print(summary.to_string(index=False))
+
+    sessions = analyze_sessions()
+    print("\n### Session Metrics by Date ###")
+    print(sessions.to_string(index=False) if not sessions.empty else "No session metrics recorded yet.")
+
+    lsa = analyze_lsa()
+    print("\n### LSA Coordinates by LSA Version ###")
+    print(lsa.to_string(index=False) if not lsa.empty else "No session metrics recorded yet.")
+
+    os.makedirs(output_dir, exist_ok=True)
+    summary.to_csv(os.path.join(output_dir, "similarity_summary.csv"), index=False)
+    density.to_csv(os.path.join(output_dir, "similarity_density.csv"), index=False)
+    sessions.to_csv(os.path.join(output_dir, "session_summary.csv"), index=False)
+    lsa.to_csv(os.path.join(output_dir, "lsa_summary.csv"), index=False)
+    print(f"\nSummary tables written to {output_dir}/")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming statistics for the similarity history and session metrics.")
+    parser.add_argument("--similarity", default="similarity.csv", help="Path to similarity.csv")
+    parser.add_argument("--output-dir", default="analysis", help="Where the summary tables are written")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows read per chunk")
+    args = parser.parse_args()
+    load_clean_and_show_statistics(args.similarity, args.output_dir, args.chunk_size)
+
 
-# Call the function to load, clean, and show statistics
-load_clean_and_show_statistics()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
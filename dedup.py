@@ -0,0 +1,63 @@
+import re
+import threading
+import unicodedata
+
+from cache_utils import content_hash
+from repository import get_repository
+
+# In-process lookup counters, reported as the dedup hit rate
+_stats = {"applicant": {"lookups": 0, "hits": 0}, "job": {"lookups": 0, "hits": 0}}
+_stats_lock = threading.Lock()
+
+
+def normalize_text(text):
+    """Normalize text so trivially different copies (case, spacing, unicode forms) hash the same."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def normalized_hash(text):
+    """Return the content hash of the normalized text."""
+    return content_hash(normalize_text(text))
+
+
+def _record_lookup(kind, hit):
+    with _stats_lock:
+        _stats[kind]["lookups"] += 1
+        if hit:
+            _stats[kind]["hits"] += 1
+
+
+def lookup_applicant(pdf_text):
+    """Return (text_hash, record) for previously extracted applicant data with the same resume text, or (text_hash, None)."""
+    text_hash = normalized_hash(pdf_text)
+    record = get_repository().find_applicant_by_hash(text_hash)
+    _record_lookup("applicant", record is not None)
+    return text_hash, record
+
+
+def lookup_job(job_description):
+    """Return (text_hash, record) for a previously extracted job description with the same text, or (text_hash, None)."""
+    text_hash = normalized_hash(job_description)
+    record = get_repository().find_job_by_hash(text_hash)
+    _record_lookup("job", record is not None)
+    return text_hash, record
+
+
+def dedup_stats():
+    """Return lookups, hits and hit rate for resumes and job descriptions."""
+    with _stats_lock:
+        return {
+            kind: dict(counts, hit_rate=counts["hits"] / counts["lookups"] if counts["lookups"] else 0.0)
+            for kind, counts in _stats.items()
+        }
+
+
+def dedup_summary():
+    """Return the dedup hit rate as a short human-readable line."""
+    stats = dedup_stats()
+    applicant, job = stats["applicant"], stats["job"]
+    return (
+        f"Dedup hit rate: resumes {applicant['hits']}/{applicant['lookups']} ({applicant['hit_rate']:.0%}), "
+        f"job descriptions {job['hits']}/{job['lookups']} ({job['hit_rate']:.0%})"
+    )
@@ -1,49 +1,36 @@
-import pandas as pd
 import streamlit as st
-import os
+from csv_store import AppendOnlyCSVWriter
+from metrics_store import CSV_COLUMNS, FIELD_DEFAULTS, MetricsStore
+from persistence import background_writer
 
-def save_session_data_to_csv():
-    """Load session data and save it to a CSV file, appending new data."""
+# Typed metrics store (source of truth for analytics) plus the legacy CSV used by the notebooks
+SESSION_CSV_PATH = "session_data.csv"
+metrics_store = MetricsStore()
+session_csv_writer = AppendOnlyCSVWriter(SESSION_CSV_PATH, list(CSV_COLUMNS.values()), batch_size=1)
+
+def write_session_metrics(metrics):
+    """Append one session's metrics to the metrics store and the CSV file."""
+    # Typed columns, with LSA vectors kept as real arrays
+    metrics_store.append(metrics)
+
+    # Legacy CSV row (LSA vectors as their string representation, as before, plus the LSA model version)
+    session_csv_writer.append({column: metrics[name] for name, column in CSV_COLUMNS.items()})
+
+def save_session_data_to_csv(scores=None):
+    """Queue the session data to be appended to the metrics store and CSV file.
+
+    scores (as returned by similarity_engine) take precedence over the values in session state.
+    """
     try:
         # Prepare the data to be saved
-        data = {
-            "Cosine Applicant vs Job": [st.session_state.get("cosine_applicant_vs_job", 0)],
-            "Cosine Optimized vs Job": [st.session_state.get("cosine_optimized_vs_job", 0)],
-            "Cosine Applicant vs Optimized": [st.session_state.get("cosine_applicant_vs_optimized", 0)],
-            "Jaccard Applicant vs Job": [st.session_state.get("jaccard_applicant_vs_job", 0)],
-            "Jaccard Optimized vs Job": [st.session_state.get("jaccard_optimized_vs_job", 0)],
-            "Jaccard Applicant vs Optimized": [st.session_state.get("jaccard_applicant_vs_optimized", 0)],
-            "SBERT Applicant vs Job": [st.session_state.get("sbert_applicant_vs_job", 0)],
-            "SBERT Optimized vs Job": [st.session_state.get("sbert_optimized_vs_job", 0)],
-            "SBERT Applicant vs Optimized": [st.session_state.get("sbert_applicant_vs_optimized", 0)],
-            "Count Applicant vs Job": [st.session_state.get("count_applicant_vs_job", 0)],
-            "Count Optimized vs Job": [st.session_state.get("count_optimized_vs_job", 0)],
-            "Count Applicant vs Optimized": [st.session_state.get("count_applicant_vs_optimized", 0)],
-            "LSA Applicant": [st.session_state.get("lsa_applicant", 0)],
-            "LSA Optimized": [st.session_state.get("lsa_optimized", 0)],
-            "LSA Job": [st.session_state.get("lsa_job", 0)],
-        }
-
-        # Create a DataFrame from the session data
-        new_data_df = pd.DataFrame(data)
-
-        # Define the CSV file path
-        csv_file_path = "session_data.csv"
-
-        # Check if the CSV file already exists
-        if os.path.exists(csv_file_path):
-            # Load existing data
-            existing_data_df = pd.read_csv(csv_file_path)
-            # Append new data
-            updated_data_df = pd.concat([existing_data_df, new_data_df], ignore_index=True)
-        else:
-            # If the file does not exist, use the new data as the DataFrame
-            updated_data_df = new_data_df
-
-        # Save the updated DataFrame to the CSV file
-        updated_data_df.to_csv(csv_file_path, index=False)
-
-        st.success(f"Session data saved to {csv_file_path}")
+        metrics = {name: st.session_state.get(name, FIELD_DEFAULTS.get(name, 0)) for name in CSV_COLUMNS}
+        metrics.update({name: value for name, value in (scores or {}).items() if name in CSV_COLUMNS})
+
+        # Written on the background writer thread so the page doesn't wait on disk
+        background_writer.submit(write_session_metrics, metrics)
+
+        st.success(f"Session data queued for {SESSION_CSV_PATH} and {metrics_store.directory} "
+                   f"(write queue depth: {background_writer.depth()})")
 
     except Exception as e:
         st.error(f"Error saving session data to CSV: {str(e)}")
@@ -0,0 +1,196 @@
+"""Build the similarity report figures headlessly.
+
+Usage:
+    python generate_reports.py --output-dir reports --workers 4
+    python generate_reports.py --output-dir .          # refresh the PNGs committed in the repo
+
+Session figures are built from the metrics store and the density plot from
+the streamed similarity.csv histogram (see data_analyze.py). Each figure is
+rendered with the non-interactive Agg backend in a worker process and is only
+redrawn when the hash of its input data changed since the last run.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from cache_utils import content_hash
+
+# Bump when a plotting function changes so every figure is redrawn once
+FIGURE_VERSION = "1"
+CACHE_FILE = ".figure_cache.json"
+
+SCORE_COLUMNS = [
+    "cosine_applicant_vs_job", "cosine_optimized_vs_job", "cosine_applicant_vs_optimized",
+    "jaccard_applicant_vs_job", "jaccard_optimized_vs_job", "jaccard_applicant_vs_optimized",
+    "sbert_applicant_vs_job", "sbert_optimized_vs_job", "sbert_applicant_vs_optimized",
+]
+COUNT_COLUMNS = ["count_applicant_vs_job", "count_optimized_vs_job", "count_applicant_vs_optimized"]
+
+
+def _heatmap(ax, data, fmt, cmap):
+    image = ax.imshow(data.to_numpy(dtype=float), cmap=cmap, aspect="auto")
+    ax.set_xticks(range(data.shape[1]), data.columns, rotation=45, ha="right")
+    ax.set_yticks(range(data.shape[0]), data.index)
+    for (row, column), value in np.ndenumerate(data.to_numpy(dtype=float)):
+        ax.text(column, row, format(value, fmt), ha="center", va="center", fontsize=7)
+    ax.figure.colorbar(image, ax=ax)
+
+
+def plot_summary_heatmap(data, path, title):
+    fig, ax = plt.subplots(figsize=(14, 6))
+    _heatmap(ax, data.describe(), ".2f", "coolwarm")
+    ax.set_title(title, fontsize=16)
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+
+
+def plot_count_heatmap(data, path):
+    fig, ax = plt.subplots(figsize=(10, max(6, len(data) * 0.25)))
+    _heatmap(ax, data, ".0f", "YlGnBu")
+    ax.set_title("Heatmap of Word Count Similarities", fontsize=16)
+    ax.set_ylabel("Index", fontsize=12)
+    ax.set_xlabel("Comparison", fontsize=12)
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+
+
+def plot_lsa_comparison(data, path):
+    fig, ax = plt.subplots(figsize=(10, 8))
+    for name, color, marker in [("applicant", "blue", "o"), ("optimized", "green", "^"), ("job", "red", "s")]:
+        x, y = data[f"lsa_{name}_1"], data[f"lsa_{name}_2"]
+        ax.scatter(x, y, color=color, marker=marker, label=f"LSA {name.title()}")
+        ax.axvline(x.mean(), color=color, linestyle="--", label=f"{name.title()} Mean Dimension 1: {x.mean():.2f}")
+        ax.axhline(y.mean(), color=color, linestyle=":", label=f"{name.title()} Mean Dimension 2: {y.mean():.2f}")
+    ax.set_title("LSA Comparison", fontsize=16)
+    ax.set_xlabel("Dimension 1")
+    ax.set_ylabel("Dimension 2")
+    ax.legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+
+
+def plot_similarity_density(density, path):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    centers = (density["Bin Start"] + density["Bin End"]) / 2
+    for column in [name[:-len(" Density")] for name in density.columns if name.endswith(" Density")]:
+        values = density[f"{column} Density"]
+        ax.plot(centers, values, label=column.replace("Similarity: ", ""))
+        ax.fill_between(centers, values, alpha=0.3)
+    ax.set_title("Density Plot of Similarity Scores", fontsize=16)
+    ax.set_xlabel("Similarity Score")
+    ax.set_ylabel("Density")
+    ax.legend()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def render_figure(plot_name, data, path, kwargs):
+    """Render one figure in a worker process and return how long it took."""
+    started = time.perf_counter()
+    PLOTS[plot_name](data, path, **kwargs)
+    return time.perf_counter() - started
+
+
+PLOTS = {
+    "summary_heatmap": plot_summary_heatmap,
+    "count_heatmap": plot_count_heatmap,
+    "lsa_comparison": plot_lsa_comparison,
+    "similarity_density": plot_similarity_density,
+}
+
+
+def figure_specs(similarity_csv):
+    """Return [(file name, plot name, input DataFrame, kwargs)] for every figure."""
+    from data_analyze import analyze_similarity
+    from metrics_store import MetricsStore
+
+    sessions = MetricsStore().to_dataframe()
+    specs = []
+    if not sessions.empty:
+        specs += [
+            ("heatmap_summary_statistics.png", "summary_heatmap", sessions[SCORE_COLUMNS + COUNT_COLUMNS],
+             {"title": "Summary Statistics of Similarity Metrics"}),
+            ("summary_statistics_heatmap_no_count.png", "summary_heatmap", sessions[SCORE_COLUMNS],
+             {"title": "Summary Statistics of Similarity Metrics (without counts)"}),
+            ("heatmap_word_count_similarities.png", "count_heatmap", sessions[COUNT_COLUMNS], {}),
+            # Coordinates from different LSA models (or per-session fits) are not comparable; plot the newest
+            ("lsa_comparison_plot.png", "lsa_comparison",
+             sessions.loc[sessions["lsa_version"] == sessions["lsa_version"].max(),
+                          [column for column in sessions.columns if column.startswith("lsa_")]], {}),
+        ]
+    if os.path.exists(similarity_csv):
+        _, density, _, _ = analyze_similarity(similarity_csv)
+        specs.append(("similarity_density_plot.png", "similarity_density", density, {}))
+    return specs
+
+
+def input_hash(plot_name, data, kwargs):
+    return content_hash(FIGURE_VERSION + plot_name + json.dumps(kwargs, sort_keys=True) + data.to_csv(index=False))
+
+
+def generate_reports(output_dir="reports", similarity_csv="similarity.csv", workers=4, force=False):
+    """Render every figure whose input changed and return {file name: seconds or "cached"}."""
+    os.makedirs(output_dir, exist_ok=True)
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        cache = {}
+
+    started = time.perf_counter()
+    specs = figure_specs(similarity_csv)
+    timings = {"load_inputs": round(time.perf_counter() - started, 3)}
+
+    futures = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for file_name, plot_name, data, kwargs in specs:
+            path = os.path.join(output_dir, file_name)
+            data_hash = input_hash(plot_name, data, kwargs)
+            if not force and cache.get(file_name) == data_hash and os.path.exists(path):
+                timings[file_name] = "cached"
+                continue
+            futures[file_name] = (executor.submit(render_figure, plot_name, data, path, kwargs), data_hash)
+
+        for file_name, (future, data_hash) in futures.items():
+            try:
+                timings[file_name] = round(future.result(), 3)
+                cache[file_name] = data_hash
+            except Exception as e:
+                timings[file_name] = f"failed: {e}"
+
+    timings["total"] = round(time.perf_counter() - started, 3)
+    with open(cache_path, "w", encoding="utf-8") as cache_file:
+        json.dump(cache, cache_file, indent=4)
+    with open(os.path.join(output_dir, "timings.json"), "w", encoding="utf-8") as timings_file:
+        json.dump(timings, timings_file, indent=4)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the similarity report figures.")
+    parser.add_argument("--output-dir", default="reports", help="Where the PNG files are written")
+    parser.add_argument("--similarity", default="similarity.csv", help="Path to similarity.csv")
+    parser.add_argument("--workers", type=int, default=4, help="Number of rendering processes")
+    parser.add_argument("--force", action="store_true", help="Redraw every figure even if its input is unchanged")
+    args = parser.parse_args()
+
+    timings = generate_reports(args.output_dir, args.similarity, args.workers, args.force)
+
+    print("### Report Timings ###")
+    for name, value in timings.items():
+        print(f"{name:<42} {value if isinstance(value, str) else f'{value:.3f}s'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""Lightweight timing spans with Prometheus-text export and per-session timelines.
+
+Wrap work in span("stage") or decorate a function with @instrumented("stage").
+Every span adds its duration to a per-stage histogram (and an error counter
+when it raises). Spans that run inside session_timeline(session_id) are also
+appended to timelines/<session_id>.jsonl, one line per span, so a slow
+session can be broken down into PDF parsing, model loads, LLM waits,
+embedding and rendering afterwards.
+
+start_metrics_server() serves the histograms and counters in the Prometheus
+text format on http://METRICS_HOST:METRICS_PORT/metrics (set METRICS_PORT=0
+to disable it).
+
+Usage:
+    python instrumentation.py show <session_id>   # print a session's timeline
+"""
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+TIMELINE_DIR = os.getenv("TIMELINE_DIR", "timelines")
+# Spans kept per page run; anything beyond is only counted in the histograms
+TIMELINE_MAX_SPANS = int(os.getenv("TIMELINE_MAX_SPANS", "1000"))
+
+# Upper bounds in seconds; spans range from cache hits to multi-second model calls
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRIC_PREFIX = "resume"
+
+# Streamlit stops a script run with these on st.rerun()/st.stop(); they are not failures
+CONTROL_FLOW_EXCEPTIONS = ("RerunException", "StopException")
+
+
+class Histogram:
+    """Bucketed counts plus sum and count of observed values."""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        # Index of the first bucket whose upper bound is >= value (the last slot is +Inf)
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(labels):
+    escaped = {
+        name: str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        for name, value in labels.items()
+    }
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped.items()) + "}" if labels else ""
+
+
+class MetricsRegistry:
+    """Per-stage duration histograms and named counters (thread-safe)."""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self._histograms = defaultdict(lambda: Histogram(self.buckets))
+        self._counters = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            self._histograms[stage].observe(seconds)
+
+    def increment(self, name, amount=1, **labels):
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += amount
+
+    def snapshot(self):
+        """Return {stage: {"count", "sum", "buckets"}} and {(name, labels): value} copies."""
+        with self._lock:
+            histograms = {
+                stage: {"count": h.count, "sum": h.sum, "buckets": list(h.counts)}
+                for stage, h in self._histograms.items()
+            }
+            return histograms, dict(self._counters)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        histograms, counters = self.snapshot()
+        name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Wall-clock duration of instrumented stages.",
+            f"# TYPE {name} histogram",
+        ]
+        for stage, h in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ["+Inf"], h["buckets"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels({'stage': stage, 'le': bound})} {cumulative}")
+            lines.append(f"{name}_sum{_labels({'stage': stage})} {h['sum']}")
+            lines.append(f"{name}_count{_labels({'stage': stage})} {h['count']}")
+
+        by_name = defaultdict(list)
+        for (counter, labels), value in counters.items():
+            by_name[counter].append((dict(labels), value))
+        for counter, series in sorted(by_name.items()):
+            full_name = f"{METRIC_PREFIX}_{counter}_total"
+            lines.append(f"# TYPE {full_name} counter")
+            for labels, value in sorted(series, key=lambda item: sorted(item[0].items())):
+                lines.append(f"{full_name}{_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class Timeline:
+    """Spans recorded during one script run of a session."""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.run_started = time.time()
+        self.spans = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, entry):
+        with self._lock:
+            if len(self.spans) < TIMELINE_MAX_SPANS:
+                self.spans.append(entry)
+            else:
+                self.dropped += 1
+
+
+_timeline = contextvars.ContextVar("timeline", default=None)
+_span_stack = contextvars.ContextVar("span_stack", default=())
+
+
+def _add_to_timeline(stage, started, seconds, status):
+    timeline = _timeline.get()
+    if timeline is None:
+        return
+    stack = _span_stack.get()
+    timeline.add({
+        "stage": stage,
+        "parent": stack[-1] if stack else None,
+        "depth": len(stack),
+        "offset": round(started - timeline.run_started, 6),
+        "seconds": round(seconds, 6),
+        "status": status,
+        "thread": threading.current_thread().name,
+    })
+
+
+def record(stage, seconds, status="ok"):
+    """Add an already measured duration (e.g. from a worker process) as a span that ended now."""
+    registry.observe(stage, seconds)
+    if status == "error":
+        registry.increment("stage_errors", stage=stage)
+    _add_to_timeline(stage, time.time() - seconds, seconds, status)
+
+
+@contextmanager
+def span(stage):
+    """Time the body of a with-block under the given stage name."""
+    started_wall = time.time()
+    started = time.perf_counter()
+    token = _span_stack.set(_span_stack.get() + (stage,))
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = "rerun" if type(e).__name__ in CONTROL_FLOW_EXCEPTIONS else "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        _span_stack.reset(token)
+        registry.observe(stage, seconds)
+        if status == "error":
+            registry.increment("stage_errors", stage=stage)
+        _add_to_timeline(stage, started_wall, seconds, status)
+
+
+def instrumented(stage=None):
+    """Decorator that runs the function inside span(stage); stage defaults to module.function."""
+
+    def decorator(fn):
+        name = stage or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timeline_path(session_id, directory=TIMELINE_DIR):
+    return os.path.join(directory, f"{session_id}.jsonl")
+
+
+def append_timeline(path, lines):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as timeline_file:
+        timeline_file.writelines(lines)
+
+
+@contextmanager
+def session_timeline(session_id, directory=TIMELINE_DIR):
+    """Collect the spans of one script run and append them to the session's timeline file afterwards."""
+    timeline = Timeline(session_id)
+    token = _timeline.set(timeline)
+    try:
+        yield timeline
+    finally:
+        _timeline.reset(token)
+        run = {"run_started": timeline.run_started}
+        lines = [json.dumps(dict(run, **entry)) + "\n" for entry in timeline.spans]
+        if timeline.dropped:
+            lines.append(json.dumps(dict(run, stage="dropped_spans", count=timeline.dropped)) + "\n")
+        if lines:
+            # Appended on the background writer thread, off the script run
+            from persistence import background_writer
+
+            background_writer.submit(append_timeline, timeline_path(session_id, directory), lines)
+
+
+def render_prometheus():
+    return registry.render()
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_started = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(host=METRICS_HOST, port=METRICS_PORT):
+    """Serve /metrics on a daemon thread, once per process. Safe to call on every Streamlit rerun."""
+    global _server, _server_started
+    with _server_lock:
+        if _server_started or not port:
+            return _server
+        _server_started = True
+        try:
+            _server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        except OSError as e:
+            # Another process (e.g. a second app instance) already owns the port
+            print(f"Metrics endpoint not started on {host}:{port}: {str(e)}")
+            return None
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
+
+
+def load_timeline(session_id, directory=TIMELINE_DIR):
+    with open(timeline_path(session_id, directory), "r", encoding="utf-8") as timeline_file:
+        return [json.loads(line) for line in timeline_file if line.strip()]
+
+
+def format_timeline(entries, width=40):
+    """Return printable lines: one block per script run, one bar per span, indented by nesting depth."""
+    lines = []
+    runs = defaultdict(list)
+    for entry in entries:
+        runs[entry["run_started"]].append(entry)
+    for run_started, spans in sorted(runs.items()):
+        spans = [entry for entry in spans if "seconds" in entry]
+        total = max((entry["offset"] + entry["seconds"] for entry in spans), default=0.0) or 1.0
+        lines.append(f"--- run at {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run_started))} ({total:.3f}s) ---")
+        for entry in sorted(spans, key=lambda entry: entry["offset"]):
+            start = int(entry["offset"] / total * width)
+            length = max(1, int(entry["seconds"] / total * width))
+            bar = " " * start + "#" * min(length, width - start)
+            label = "  " * entry["depth"] + entry["stage"]
+            status = "" if entry["status"] == "ok" else f" [{entry['status']}]"
+            lines.append(f"{label:<48} |{bar:<{width}}| {entry['seconds']:.3f}s{status}")
+    return lines
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != "show":
+        print(__doc__)
+        return
+    for line in format_timeline(load_timeline(sys.argv[2])):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
 import streamlit as st
 from dotenv import load_dotenv
 import os
-import json
 from datetime import datetime
 import google.generativeai as genai
 from keybert import KeyBERT
 from rake_nltk import Rake
+from concurrency import map_concurrently
+from dedup import dedup_summary, normalized_hash
+from repository import get_repository
+from artifact_store import get_session_id, write_artifact
+from persistence import background_writer, snapshot
+from instrumentation import instrumented
 
 
 load_dotenv()
@@ -18,6 +23,7 @@ def extract_key_words_rake(job_description):
     keywords = rake.get_ranked_phrases()
     return(keywords)
 
+@instrumented("keywords.keybert")
 def extract_key_words_keybert(job_description):
     model = KeyBERT('all-MiniLM-L6-v2')
 
@@ -69,6 +75,7 @@ model = genai.GenerativeModel("gemini-pro")
 JOB_DATA_DIR = "job_descriptions"
 os.makedirs(JOB_DATA_DIR, exist_ok=True)
 
+@instrumented("llm.generate")
 def get_gemini_response(question, context):
     full_question = f"{context}\n\nQuestion: {question}"
     response = model.generate_content(full_question)
@@ -79,11 +86,20 @@ def get_gemini_response(question, context):
 
 
 
+def extract_company_name(job_description):
+    return get_gemini_response("What is the company name from the job description?", job_description)
+
+def extract_position(job_description):
+    return get_gemini_response("What is the position title from the job description?", job_description)
+
+def extract_location(job_description):
+    return get_gemini_response("What is the job location from the job description?", job_description)
+
 def extract_job_details(job_description):
     """Extract company name, position, and location from job description"""
-    company_name = get_gemini_response("What is the company name from the job description?", job_description)
-    position = get_gemini_response("What is the position title from the job description?", job_description)
-    location = get_gemini_response("What is the job location from the job description?", job_description)
+    company_name = extract_company_name(job_description)
+    position = extract_position(job_description)
+    location = extract_location(job_description)
     return company_name, position, location
 
 def extract_required_qualifications(job_description):
@@ -134,16 +150,70 @@ def extract_job_responsibilities(job_description):
     
     return responsibilities if responsibilities else ["Not found"]
 
-def save_job_data(job_data):
+JOB_EXTRACTORS = {
+    "company_name": extract_company_name,
+    "position": extract_position,
+    "location": extract_location,
+    "required_qualifications": extract_required_qualifications,
+    "special_skills": extract_special_skills,
+    "job_responsibilities": extract_job_responsibilities,
+}
+
+def extract_job_data(job_description, executor=None):
+    """Run every job description extractor and return the job data dictionary.
+
+    The extractors are independent model calls, so they run concurrently when an executor is given.
+    """
+    fields = list(JOB_EXTRACTORS)
+    values = map_concurrently(lambda field: JOB_EXTRACTORS[field](job_description), fields, executor)
+    job_data = {"job_description": job_description}
+    job_data.update(zip(fields, values))
+    return job_data
+
+def format_selected_job_data(job_data):
+    """Return the qualifications, skills and responsibilities as the plain text used in prompts."""
+    selected_job_data = {
+        "Required Qualifications": job_data["required_qualifications"],
+        "Special Skills": job_data["special_skills"],
+        "Job Responsibilities": job_data["job_responsibilities"],
+    }
+
+    job_data_lines = []
+    for key, value in selected_job_data.items():
+        if isinstance(value, list):
+            value = ", ".join(value) if value else "None"
+            job_data_lines.append(f"{key}: {value}")
+
+    # Combine all lines into a single text string
+    return "\n".join(job_data_lines)
+
+def write_job_data(job_data, session_id, name, selected_text=None, keywords=None):
+    """Write job data to <JOB_DATA_DIR>/<session_id>/<name> and index it in the repository."""
+    # Written atomically, and skipped if the file already holds the same data
+    filename, _ = write_artifact(JOB_DATA_DIR, session_id, name, job_data)
+
+    # Index the job description by content hash, company/position and date
+    get_repository().save_job_description(
+        dict(job_data, **(keywords or {})),
+        content_hash=normalized_hash(job_data["job_description"]),
+        selected_text=selected_text,
+        source_file=filename,
+    )
+
+def save_job_data(job_data, selected_text=None, keywords=None):
     """
-    Save job data to a JSON file and store the filename in the session state.
+    Queue job data to be saved to a JSON file and the repository, and store the filename in the session state.
     """
     try:
         # Generate a safe filename using the company name and position
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_company = ''.join(e for e in job_data['company_name'] if e.isalnum())
         safe_position = ''.join(e for e in job_data['position'] if e.isalnum())
-        filename = f"{JOB_DATA_DIR}/{safe_company}_{safe_position}_{timestamp}.json"
+        # Files live under the session's directory, so two sessions saving in the same second never share a path
+        # (which is also the coalescing key)
+        session_id = get_session_id(st.session_state)
+        name = f"{safe_company}_{safe_position}_{timestamp}.json"
+        filename = os.path.join(JOB_DATA_DIR, session_id, name)
         
         # Add submission date to job data
         job_data['submission_date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -152,8 +222,10 @@ def save_job_data(job_data):
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(job_data, f, indent=4, ensure_ascii=False)"""
         
-        with open(filename, "w") as json_file:
-            json.dump(job_data, json_file, indent=4)
+        # Written on the background writer thread so the page doesn't wait on disk
+        background_writer.submit(
+            write_job_data, snapshot(job_data), session_id, name, selected_text, snapshot(keywords), key=filename
+        )
         
         # Store the filename in the session state
         st.session_state.job_description_filename = filename
@@ -191,58 +263,43 @@ def show_job_description_input():
             submit_button = st.form_submit_button("Extract Details")
 
             if submit_button and job_description:
-                # Extract all job details
-                company_name, position, location = extract_job_details(job_description)
-                required_qualifications = extract_required_qualifications(job_description)
-                special_skills = extract_special_skills(job_description)
-                job_responsibilities = extract_job_responsibilities(job_description)
-
-                # Extract keywords using Rake and KeyBERT
-                st.session_state.rake_keywords = extract_key_words_rake(job_description)
-                st.session_state.keybert_keywords = extract_key_words_keybert(job_description)
-
-                # Prepare job data
-                job_data = {
-                    "job_description": job_description,
-                    "company_name": company_name,
-                    "position": position,
-                    "location": location,
-                    "required_qualifications": required_qualifications,
-                    "special_skills": special_skills,
-                    "job_responsibilities": job_responsibilities,
-                }
+                from pipeline import get_pipeline  # pipeline.py imports this module
+
+                # Reuse an earlier extraction of the same job description instead of calling the model again
+                _, record = get_pipeline().find_job(job_description)
+                if record is not None:
+                    job_data = {key: record["data"][key] for key in JOB_EXTRACTORS if key in record["data"]}
+                    job_data["job_description"] = job_description
+                    st.session_state.rake_keywords = record["data"].get("rake_keywords", [])
+                    st.session_state.keybert_keywords = record["data"].get("keybert_keywords", [])
+                    st.info("This job description was processed before. Its details were loaded without calling the model.")
+                else:
+                    # Extract all job details through the pipeline (model calls run concurrently)
+                    job_data = get_pipeline().extract_job(job_description, reuse=False)
+
+                    # Extract keywords using Rake and KeyBERT
+                    st.session_state.rake_keywords = extract_key_words_rake(job_description)
+                    st.session_state.keybert_keywords = extract_key_words_keybert(job_description)
+                st.caption(dedup_summary())
 
                 # Create a plain text representation of the job data
-                selected_job_data = {
-                    "Required Qualifications": required_qualifications,
-                    "Special Skills": special_skills,
-                    "Job Responsibilities": job_responsibilities,
-                }
-
-                job_data_lines = []
-                for key, value in selected_job_data.items():
-                    if isinstance(value, list):
-                        value = ", ".join(value) if value else "None"
-                        job_data_lines.append(f"{key}: {value}")
-
-                # Combine all lines into a single text string
-                job_data_text = "\n".join(job_data_lines)
+                job_data_text = format_selected_job_data(job_data)
 
                 # Save the text representation in session state
                 st.session_state.selected_job_data_string = job_data_text
 
-                # Ensure the 'job_descriptions' directory exists
-                directory = "job_descriptions"
-                os.makedirs(directory, exist_ok=True)
-
-                # Save the text file in the directory
-                file_path = os.path.join(directory, "job_description.txt")
-                with open(file_path, "w") as file:
-                    file.write(job_data_text)
-
-                saved_file = save_job_data(job_data)
-                if saved_file:
-                    st.success(f"Job data saved successfully to {saved_file}")
+                # Save the text file in this session's directory (atomic, skipped when unchanged)
+                write_artifact(JOB_DATA_DIR, get_session_id(st.session_state), "job_description.txt", job_data_text)
+
+                if record is None:
+                    saved_file = save_job_data(job_data, selected_text=job_data_text, keywords={
+                        "rake_keywords": st.session_state.rake_keywords,
+                        "keybert_keywords": st.session_state.keybert_keywords,
+                    })
+                    if saved_file:
+                        st.success(f"Job data saved successfully to {saved_file}")
+                else:
+                    st.session_state.job_description_filename = record["source_file"]
 
                 # Save to session state
                 st.session_state.update(job_data)
@@ -0,0 +1,354 @@
+"""Concurrent-session load test that drives the Streamlit page flow headlessly.
+
+Usage:
+    python load_test.py --levels 1,2,4,8 --rounds 2 --llm-latency 0.8
+    python load_test.py --levels 1,4,16 --json load_test.json --keep-files
+
+Every simulated user is a streamlit.testing AppTest of main.py. AppTest is
+not thread-safe (it swaps in a global Runtime and patches the config while a
+script runs), so each concurrent session runs in its own worker process of a
+ProcessPoolExecutor; a worker runs one session at a time. The workers share
+the files in the working directory like the processes of one server, but
+each loads its own models.
+
+A session uploads the fixture resume through the upload page's
+st.file_uploader, then walks the pages up to create resume, clicking the
+same buttons a user would. The resume is rendered from resume.json with one
+extra line per session, and the job description gets the same marker, so the
+dedup lookups do not turn every session after the first into cache hits.
+The model is mock_llm.ReplayLLM with --llm-latency seconds per call.
+
+For each concurrency level, rounds * level sessions are run on a fresh pool
+of level workers (each warmed up first, so model loads are not timed). The
+script reports sessions/s, session latency percentiles, per-step p95, the
+workers' total peak RSS and the mean RSS growth of a worker during one
+session. Sessions run in a temporary working directory so the real data
+files are untouched.
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from stage_timing import StageTimer, percentile
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_SCRIPT = os.path.join(APP_DIR, "main.py")
+FIXTURES_DIR = os.path.join(APP_DIR, "benchmarks", "fixtures")
+
+# (step, page, button clicked once the page has rendered)
+FLOW = [
+    ("upload", "Applicant Resume Upload", "Proceed to Extract details"),
+    ("personal_details", "Applicant Personal Details", "Save and proceed"),
+    ("experience", "Professional Summary and Work Experience", "Save and Proceed"),
+    ("qualifications", "Qualifications and Skills", "Proceed to Job Descriptions"),
+    ("job_description", "Job Description", "Extract Details"),
+    ("skills_management", "Skills Management", "Next"),
+    ("analyze_jd", "Analyze JD", None),
+    ("professional_experience", "Professional Experience", None),
+    ("preview", "Preview Resume", None),
+    ("similarity", "similarity", None),
+    ("word_similarity", "word similarity", "Compare Texts"),
+    ("create_resume", "create resume", None),
+]
+
+# Seconds a level waits for all of its workers to start and warm up
+WORKER_START_TIMEOUT = 600
+
+# Per-process state of a pool worker, set up by init_worker
+_worker = {}
+
+
+def read_rss_mb():
+    """Return the current resident set size of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MemorySampler:
+    """Samples RSS on a background thread and keeps the peak, for use as a with-block."""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, read_rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = read_rss_mb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, read_rss_mb())
+
+
+def click(at, label):
+    """Click the first button (or form submit button) with this label; False if the page has none."""
+    for button in at.button:
+        if button.label == label:
+            button.click()
+            return True
+    return False
+
+
+def session_resume_pdf(resume, marker):
+    """Render the fixture resume with a marker line, so each session uploads a distinct PDF."""
+    from create_pdf import build_pdf
+
+    return build_pdf(dict(resume, achievements=list(resume.get("achievements", [])) + [marker]))
+
+
+def run_session(session_name, resume, job_description, timeout=120):
+    """Walk one session through FLOW and return (seconds per step, error messages)."""
+    from streamlit.testing.v1 import AppTest
+
+    marker = f"Reference: load test session {session_name}"
+    resume_pdf = session_resume_pdf(resume, marker)
+    at = AppTest.from_file(MAIN_SCRIPT, default_timeout=timeout)
+    timings = {}
+    errors = []
+
+    def run(step):
+        started = time.perf_counter()
+        try:
+            at.run()
+        except RuntimeError as e:
+            # AppTest raises RuntimeError when a script run times out
+            errors.append(f"{step}: {str(e)}")
+        timings[step] = timings.get(step, 0.0) + time.perf_counter() - started
+        errors.extend(f"{step}: {exception.message}" for exception in at.exception)
+
+    for step, page, button in FLOW:
+        at.session_state["page"] = page
+        if page == "Analyze JD":
+            experiences = at.session_state["experience"] if "experience" in at.session_state else []
+            # One run per experience, like pressing "Next Experience"
+            for index in range(max(1, len(experiences))):
+                at.session_state["current_experience_index"] = index
+                run(step)
+            continue
+        run(step)
+        if page == "Applicant Resume Upload" and at.file_uploader:
+            at.file_uploader[0].set_value(("resume.pdf", resume_pdf, "application/pdf"))
+            run(step)
+        if page == "Job Description" and at.text_area:
+            at.text_area(key="job_desc_input").input(f"{job_description}\n{marker}")
+        if button and click(at, button):
+            run(step)
+    return timings, errors
+
+
+def init_worker(workdir, fixtures, llm_latency, warmup, timeout):
+    """Set up a pool worker: move into the working directory, install the mock model and run warmup sessions."""
+    # Every worker would try to bind the same metrics port
+    os.environ["METRICS_PORT"] = "0"
+    # The app modules use paths relative to the working directory, so import them only after moving there
+    os.chdir(workdir)
+    sys.path.insert(0, APP_DIR)
+    import mock_llm
+    from benchmark import load_fixtures
+
+    llm = mock_llm.ReplayLLM(mock_llm.load_responses(os.path.join(fixtures, "llm_responses.json")), latency=llm_latency)
+    mock_llm.install(llm)
+    _, job_descriptions, resume = load_fixtures(fixtures)
+    _worker.update(llm=llm, resume=resume, job_description=job_descriptions[0], timeout=timeout)
+    for number in range(warmup):
+        run_session(f"warmup-{os.getpid()}-{number}", resume, job_descriptions[0], timeout)
+
+
+def wait_for_workers(barrier):
+    """Block until every worker of the pool has started, so no session is timed while a worker warms up."""
+    barrier.wait(WORKER_START_TIMEOUT)
+
+
+def timed_session(number):
+    """Run one session in this worker and return its timings, errors, memory and the worker's metrics."""
+    from instrumentation import registry
+    from persistence import background_writer
+
+    gc.collect()
+    rss_start = read_rss_mb()
+    started = time.perf_counter()
+    with MemorySampler() as sampler:
+        timings, errors = run_session(number, _worker["resume"], _worker["job_description"], _worker["timeout"])
+    seconds = time.perf_counter() - started
+    # Finish this session's queued writes before the next one starts
+    background_writer.flush(timeout=60)
+    histograms, _ = registry.snapshot()
+    return {
+        "pid": os.getpid(),
+        "seconds": seconds,
+        "timings": timings,
+        "errors": errors,
+        "rss_start_mb": rss_start,
+        "rss_peak_mb": sampler.peak,
+        "histograms": histograms,
+        "llm": _worker["llm"].stats(),
+    }
+
+
+def run_level(concurrency, sessions, worker_args, first_session=0):
+    """Run sessions sessions on concurrency worker processes and return (level report, {pid: last session result})."""
+    timer = StageTimer()
+    session_seconds = []
+    session_growth = []
+    worker_peaks = {}
+    last_results = {}
+    failed = 0
+    errors = []
+
+    # Fresh interpreters, so no AppTest runtime or model state is inherited from this process
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager, ProcessPoolExecutor(
+        max_workers=concurrency, mp_context=context, initializer=init_worker, initargs=worker_args
+    ) as executor:
+        barrier = manager.Barrier(concurrency)
+        for future in [executor.submit(wait_for_workers, barrier) for _ in range(concurrency)]:
+            future.result()
+
+        started = time.perf_counter()
+        futures = [executor.submit(timed_session, first_session + i) for i in range(sessions)]
+        for future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                errors.append(f"session: {str(e)}")
+                continue
+            session_seconds.append(result["seconds"])
+            session_growth.append(result["rss_peak_mb"] - result["rss_start_mb"])
+            worker_peaks[result["pid"]] = max(worker_peaks.get(result["pid"], 0.0), result["rss_peak_mb"])
+            last_results[result["pid"]] = result
+            timer.merge(result["timings"])
+            if result["errors"]:
+                failed += 1
+                errors.extend(result["errors"])
+        elapsed = time.perf_counter() - started
+
+    report = {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "failed_sessions": failed,
+        "seconds": elapsed,
+        "sessions_per_second": sessions / elapsed if elapsed else 0.0,
+        "session_p50": percentile(session_seconds, 50),
+        "session_p95": percentile(session_seconds, 95),
+        "session_p99": percentile(session_seconds, 99),
+        "session_max": max(session_seconds, default=0.0),
+        "workers": len(worker_peaks),
+        "worker_rss_peak_mb": max(worker_peaks.values(), default=0.0),
+        "rss_total_mb": sum(worker_peaks.values()),
+        "mb_per_session": sum(session_growth) / len(session_growth) if session_growth else 0.0,
+        "steps": timer.summary(),
+        "errors": sorted(set(errors))[:20],
+    }
+    return report, last_results
+
+
+def merge_worker_results(results):
+    """Add up the instrumented-stage histograms and model call counts of every worker's last session."""
+    histograms = {}
+    model_stats = {"calls": 0, "replayed": 0, "defaulted": 0}
+    for result in results:
+        for stage, h in result["histograms"].items():
+            total = histograms.setdefault(stage, {"count": 0, "sum": 0.0})
+            total["count"] += h["count"]
+            total["sum"] += h["sum"]
+        for name in model_stats:
+            model_stats[name] += result["llm"][name]
+    return histograms, model_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramp concurrent headless sessions of the Streamlit app against a mock model.")
+    parser.add_argument("--levels", default="1,2,4,8", help="Comma-separated numbers of concurrent sessions")
+    parser.add_argument("--rounds", type=int, default=2, help="Sessions per level = rounds * concurrency")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds the mock model waits per call")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed for one script run")
+    parser.add_argument("--warmup", type=int, default=1, help="Sessions each worker runs before it is timed (model loads)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Fixtures directory (see benchmark.py)")
+    parser.add_argument("--workdir", help="Working directory for the sessions' files (default: a temporary directory)")
+    parser.add_argument("--keep-files", action="store_true", help="Keep the working directory after the run")
+    parser.add_argument("--json", help="Optionally write the report to this JSON file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="load-test-")
+    os.makedirs(workdir, exist_ok=True)
+    worker_args = (workdir, os.path.abspath(args.fixtures), args.llm_latency, args.warmup, args.timeout)
+
+    reports = []
+    worker_results = []
+    try:
+        first_session = 0
+        for concurrency in levels:
+            sessions = concurrency * args.rounds
+            print(f"Running {sessions} sessions at concurrency {concurrency}...")
+            report, last_results = run_level(concurrency, sessions, worker_args, first_session)
+            reports.append(report)
+            worker_results.extend(last_results.values())
+            first_session += sessions
+    finally:
+        if not args.keep_files:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n### Load Test Summary ###")
+    print(f"{'conc':>5} {'sessions':>8} {'failed':>6} {'sess/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'total RSS':>10} {'MB/session':>10}")
+    for report in reports:
+        print(
+            f"{report['concurrency']:>5} {report['sessions']:>8} {report['failed_sessions']:>6} "
+            f"{report['sessions_per_second']:>8.3f} {report['session_p50']:>7.2f}s {report['session_p95']:>7.2f}s "
+            f"{report['session_p99']:>7.2f}s {report['rss_total_mb']:>8.1f}MB {report['mb_per_session']:>10.1f}"
+        )
+
+    # Throughput that stops growing with concurrency means a shared resource is the bottleneck
+    for previous, report in zip(reports, reports[1:]):
+        if report["sessions_per_second"] < previous["sessions_per_second"] * 1.1:
+            print(f"Throughput stops scaling at concurrency {report['concurrency']} "
+                  f"({previous['sessions_per_second']:.3f} -> {report['sessions_per_second']:.3f} sessions/s)")
+            break
+
+    if reports:
+        last = reports[-1]
+        print(f"\nSlowest steps at concurrency {last['concurrency']} (p95):")
+        for step, stats in sorted(last["steps"].items(), key=lambda item: -item[1]["p95"]):
+            print(f"  {step:<26} p95={stats['p95']:.2f}s mean={stats['mean']:.2f}s")
+        for report in reports:
+            for error in report["errors"]:
+                print(f"  error at concurrency {report['concurrency']}: {error}")
+
+    histograms, model_stats = merge_worker_results(worker_results)
+    print("\nTime by instrumented stage (all workers, including warmup):")
+    for stage, h in sorted(histograms.items(), key=lambda item: -item[1]["sum"])[:12]:
+        print(f"  {stage:<44} total={h['sum']:.2f}s count={h['count']}")
+    print(f"Model calls: {model_stats['calls']} ({model_stats['defaulted']} default answers)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump({"llm_latency": args.llm_latency, "levels": reports}, json_file, indent=4)
+
+
+if __name__ == "__main__":
+    # AppTest replaces __main__ with main.py inside the workers, so the pool's functions must come from load_test
+    import load_test
+
+    load_test.main()
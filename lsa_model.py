@@ -0,0 +1,192 @@
+"""Corpus-level LSA (TF-IDF + truncated SVD) model shared by every session.
+
+The model is fitted offline on every job description, applicant and tailored
+resume in the repository, saved as a numbered version, and loaded once per
+process. Sessions only call transform, so LSA coordinates are comparable
+across sessions for as long as a version is in use.
+
+Refreshing is not incremental: once the corpus has grown by LSA_REFIT_GROWTH
+since the current version was fitted, a new version is fitted from scratch on
+the whole corpus. Until then new documents are only projected with the
+current model, so words outside its vocabulary are ignored.
+
+Before the first fit, the JSON files the app wrote before the repository
+existed (applicants/, job_descriptions/, updated_applicant/) are imported
+into the repository, so the first model is not trained on a near-empty corpus.
+
+Usage:
+    python lsa_model.py import    # import the existing JSON files into the repository
+    python lsa_model.py fit       # fit a new version on the current corpus
+    python lsa_model.py refresh   # full refit only if the corpus grew past the threshold
+    python lsa_model.py show
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+import joblib
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import make_pipeline
+
+from instrumentation import span
+from metrics_store import LSA_DIMENSIONS
+from repository import get_repository
+
+LSA_MODEL_DIR = os.getenv("LSA_MODEL_DIR", "lsa_model")
+LSA_COMPONENTS = int(os.getenv("LSA_COMPONENTS", "2"))
+# Refit once the corpus is this much larger than the one the current version saw
+LSA_REFIT_GROWTH = float(os.getenv("LSA_REFIT_GROWTH", "0.2"))
+# Below this many documents a corpus model is not meaningful; callers fall back to per-session LSA
+LSA_MIN_DOCUMENTS = int(os.getenv("LSA_MIN_DOCUMENTS", "20"))
+
+MANIFEST_NAME = "manifest.json"
+# lsa_version reported for coordinates fitted on one session's texts (fitted model versions start at 1)
+PER_SESSION_LSA_VERSION = 0
+
+
+def record_text(data):
+    """Flatten a stored JSON record (nested dicts/lists) into one text."""
+    if isinstance(data, dict):
+        return " ".join(record_text(value) for value in data.values())
+    if isinstance(data, list):
+        return " ".join(record_text(value) for value in data)
+    return str(data) if data is not None else ""
+
+
+def corpus_texts():
+    """Return the text of every job description, applicant and tailored resume in the repository."""
+    return [record_text(data) for _, data in get_repository().corpus_records()]
+
+
+def import_existing_artifacts():
+    """Import JSON files not yet in the repository and return {table: files imported}."""
+    return get_repository().import_artifacts()
+
+
+def read_manifest(directory=LSA_MODEL_DIR):
+    """Return the manifest of the current model version, or None if no model was fitted yet."""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+
+
+def fit_model(texts=None, directory=LSA_MODEL_DIR, n_components=LSA_COMPONENTS):
+    """Fit a new model version on the corpus, save it and return its manifest."""
+    if n_components > LSA_DIMENSIONS:
+        # The metrics store keeps fixed-width LSA vectors and would silently drop the extra components
+        raise ValueError(
+            f"LSA_COMPONENTS ({n_components}) is larger than the metrics store's LSA_DIMENSIONS ({LSA_DIMENSIONS})"
+        )
+    if texts is None:
+        if read_manifest(directory) is None:
+            # First version: include the history written before the repository existed
+            import_existing_artifacts()
+        texts = corpus_texts()
+    if len(texts) < LSA_MIN_DOCUMENTS:
+        raise ValueError(f"need at least {LSA_MIN_DOCUMENTS} documents to fit the LSA model, found {len(texts)}")
+
+    started = time.perf_counter()
+    model = make_pipeline(
+        TfidfVectorizer(stop_words="english", sublinear_tf=True),
+        TruncatedSVD(n_components=n_components, random_state=42),
+    )
+    model.fit(texts)
+
+    previous = read_manifest(directory)
+    version = previous["version"] + 1 if previous else 1
+    os.makedirs(directory, exist_ok=True)
+    model_file = f"lsa-v{version}.joblib"
+    joblib.dump(model, os.path.join(directory, model_file))
+
+    manifest = {
+        "version": version,
+        "model_file": model_file,
+        "n_components": n_components,
+        "corpus_size": len(texts),
+        "vocabulary_size": len(model[0].vocabulary_),
+        "explained_variance": float(model[1].explained_variance_ratio_.sum()),
+        "fitted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "fit_seconds": round(time.perf_counter() - started, 3),
+    }
+    # Point the manifest at the new version only once its file is fully written
+    tmp_path = os.path.join(directory, f".{MANIFEST_NAME}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=4)
+    os.replace(tmp_path, os.path.join(directory, MANIFEST_NAME))
+    return manifest
+
+
+def refresh_model(directory=LSA_MODEL_DIR, growth=LSA_REFIT_GROWTH):
+    """Fully refit if the corpus grew by more than growth since the last fit; returns the manifest in use."""
+    manifest = read_manifest(directory)
+    if manifest is None:
+        # No model yet: count the history written before the repository existed too
+        import_existing_artifacts()
+    corpus_size = get_repository().corpus_size()
+    if manifest is None and corpus_size >= LSA_MIN_DOCUMENTS:
+        return fit_model(corpus_texts(), directory=directory)
+    if manifest is not None and corpus_size >= manifest["corpus_size"] * (1 + growth):
+        return fit_model(directory=directory, n_components=manifest["n_components"])
+    return manifest
+
+
+_model = None
+_model_version = None
+_manifest_mtime = None
+_model_lock = threading.Lock()
+
+
+def get_lsa_model(directory=LSA_MODEL_DIR):
+    """Return (model, version) for the current fitted model.
+
+    The model is loaded once and reloaded only when the manifest changes (e.g.
+    after `python lsa_model.py refresh`), so a running app picks up new
+    versions without a restart. Returns (None, None) if no model has been
+    fitted yet.
+    """
+    global _model, _model_version, _manifest_mtime
+    with _model_lock:
+        try:
+            mtime = os.stat(os.path.join(directory, MANIFEST_NAME)).st_mtime_ns
+        except OSError:
+            return _model, _model_version
+        if mtime == _manifest_mtime:
+            return _model, _model_version
+
+        manifest = read_manifest(directory)
+        if manifest is None:
+            return _model, _model_version
+        _manifest_mtime = mtime
+        if manifest["version"] != _model_version:
+            if manifest["n_components"] > LSA_DIMENSIONS:
+                print(f"LSA model v{manifest['version']} has {manifest['n_components']} components; "
+                      f"the metrics store keeps only {LSA_DIMENSIONS}")
+            with span("model.lsa_load"):
+                _model = joblib.load(os.path.join(directory, manifest["model_file"]))
+            _model_version = manifest["version"]
+        return _model, _model_version
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "show"
+    if command == "import":
+        imported = import_existing_artifacts()
+        print("Imported " + ", ".join(f"{count} {table}" for table, count in imported.items()) + " into the repository")
+    elif command == "fit":
+        manifest = fit_model()
+        print(f"Fitted LSA model v{manifest['version']} on {manifest['corpus_size']} documents in {manifest['fit_seconds']}s")
+    elif command == "refresh":
+        manifest = refresh_model()
+        print(f"LSA model in use: {manifest}" if manifest else "Corpus too small to fit an LSA model yet")
+    else:
+        print(read_manifest() or "No LSA model has been fitted yet")
+        print(f"Current corpus size: {get_repository().corpus_size()}")
+
+
+if __name__ == "__main__":
+    main()
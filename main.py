@@ -8,37 +8,37 @@ import preview_resume
 import compare_results
 import create_pdf
 import word_similarity
+from artifact_store import get_session_id
+from instrumentation import session_timeline, span, start_metrics_server
 
 
 # Initialize session state for page navigation
 if "page" not in st.session_state:
     st.session_state.page = "Applicant Resume Upload"  # Set the initial page
 
-# Show the appropriate page based on the current state
-if st.session_state.page == "Applicant Resume Upload":
-    applicant_resume_upload.show_resume_upload_status()
-elif st.session_state.page == "Applicant Personal Details":
-    applicant_resume_upload.show_applicant_personal_details()
-elif st.session_state.page == "Professional Summary and Work Experience":
-    applicant_resume_upload.show_applicant_professional_summary_and_experience()
-elif st.session_state.page == "Qualifications and Skills":
-    applicant_resume_upload.show_applicant_skills_education_achievements()
-elif st.session_state.page == "Job Description":
-    job_description.show_job_description()
-elif st.session_state.page == "Skills Management":
-    resume_preparation.show_skills_management()
-elif st.session_state.page == "Analyze JD":
-    analyze_bulletpoints.show_analyze_bp()
-elif st.session_state.page == "Professional Experience":
-    professional_experience.Show_professional_experience()
-elif st.session_state.page == "Preview Resume":
-    preview_resume.show_preview_resume()
-elif st.session_state.page == "similarity":
-    compare_results.show_similarity()
-elif st.session_state.page == "word similarity":
-    word_similarity.show_similar_words()
-elif st.session_state.page == "create resume":
-    create_pdf.create_resume()
+# Page name -> function that renders it
+PAGES = {
+    "Applicant Resume Upload": applicant_resume_upload.show_resume_upload_status,
+    "Applicant Personal Details": applicant_resume_upload.show_applicant_personal_details,
+    "Professional Summary and Work Experience": applicant_resume_upload.show_applicant_professional_summary_and_experience,
+    "Qualifications and Skills": applicant_resume_upload.show_applicant_skills_education_achievements,
+    "Job Description": job_description.show_job_description,
+    "Skills Management": resume_preparation.show_skills_management,
+    "Analyze JD": analyze_bulletpoints.show_analyze_bp,
+    "Professional Experience": professional_experience.Show_professional_experience,
+    "Preview Resume": preview_resume.show_preview_resume,
+    "similarity": compare_results.show_similarity,
+    "word similarity": word_similarity.show_similar_words,
+    "create resume": create_pdf.create_resume,
+}
+
+# Prometheus metrics on METRICS_PORT (started once per process)
+start_metrics_server()
+
+# Show the appropriate page based on the current state, timing the run for the session's timeline
+show_page = PAGES.get(st.session_state.page)
+if show_page is not None:
+    with session_timeline(get_session_id(st.session_state)), span(f"page.{st.session_state.page}"):
+        show_page()
 else:    
     st.error("Page not found. Please check the navigation.")
-
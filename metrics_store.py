@@ -0,0 +1,239 @@
+"""Typed, append-only store for per-session similarity metrics.
+
+Every flush writes one .npy part file holding a numpy structured array with
+float/int columns and fixed-width LSA vector columns. Reading memory-maps the
+parts, so analytics over thousands of sessions never parse strings.
+
+Usage:
+    python metrics_store.py import session_data.csv   # convert the legacy CSV
+    python metrics_store.py compact                   # merge part files
+    python metrics_store.py show
+"""
+import atexit
+import glob
+import os
+import sys
+import threading
+import time
+import uuid
+
+import numpy as np
+
+METRICS_DIR = os.getenv("METRICS_DIR", "session_metrics")
+LSA_DIMENSIONS = 2
+LSA_VECTOR_FIELDS = ("lsa_applicant", "lsa_optimized", "lsa_job")
+# lsa_version of records written before the field existed. 0 is a per-session fit, 1+ a corpus model version.
+UNKNOWN_LSA_VERSION = -1
+
+SESSION_METRICS_DTYPE = np.dtype([
+    ("recorded_at", "f8"),
+    ("cosine_applicant_vs_job", "f8"),
+    ("cosine_optimized_vs_job", "f8"),
+    ("cosine_applicant_vs_optimized", "f8"),
+    ("jaccard_applicant_vs_job", "f8"),
+    ("jaccard_optimized_vs_job", "f8"),
+    ("jaccard_applicant_vs_optimized", "f8"),
+    ("sbert_applicant_vs_job", "f8"),
+    ("sbert_optimized_vs_job", "f8"),
+    ("sbert_applicant_vs_optimized", "f8"),
+    ("count_applicant_vs_job", "i4"),
+    ("count_optimized_vs_job", "i4"),
+    ("count_applicant_vs_optimized", "i4"),
+    ("lsa_applicant", "f8", (LSA_DIMENSIONS,)),
+    ("lsa_optimized", "f8", (LSA_DIMENSIONS,)),
+    ("lsa_job", "f8", (LSA_DIMENSIONS,)),
+    ("lsa_version", "i4"),
+])
+
+# Value of a field that is missing from the metrics (every other field defaults to zero)
+FIELD_DEFAULTS = {"lsa_version": UNKNOWN_LSA_VERSION}
+
+# Column names used in session_data.csv for each typed field
+CSV_COLUMNS = {
+    "cosine_applicant_vs_job": "Cosine Applicant vs Job",
+    "cosine_optimized_vs_job": "Cosine Optimized vs Job",
+    "cosine_applicant_vs_optimized": "Cosine Applicant vs Optimized",
+    "jaccard_applicant_vs_job": "Jaccard Applicant vs Job",
+    "jaccard_optimized_vs_job": "Jaccard Optimized vs Job",
+    "jaccard_applicant_vs_optimized": "Jaccard Applicant vs Optimized",
+    "sbert_applicant_vs_job": "SBERT Applicant vs Job",
+    "sbert_optimized_vs_job": "SBERT Optimized vs Job",
+    "sbert_applicant_vs_optimized": "SBERT Applicant vs Optimized",
+    "count_applicant_vs_job": "Count Applicant vs Job",
+    "count_optimized_vs_job": "Count Optimized vs Job",
+    "count_applicant_vs_optimized": "Count Applicant vs Optimized",
+    "lsa_applicant": "LSA Applicant",
+    "lsa_optimized": "LSA Optimized",
+    "lsa_job": "LSA Job",
+    "lsa_version": "LSA Version",
+}
+
+
+def parse_vector(value):
+    """Parse a numpy repr such as "[0.55 0.54]" (as stored in session_data.csv) into a fixed-width vector."""
+    vector = np.zeros(LSA_DIMENSIONS)
+    if isinstance(value, str):
+        parts = [float(part) for part in value.strip("[]").split()]
+    else:
+        parts = np.ravel(value).tolist() if value is not None else []
+    parts = parts[:LSA_DIMENSIONS]
+    vector[:len(parts)] = parts
+    return vector
+
+
+def to_record(metrics):
+    """Build a single structured record from a {field: value} mapping; missing fields are zero."""
+    record = np.zeros((), dtype=SESSION_METRICS_DTYPE)
+    record["recorded_at"] = metrics.get("recorded_at", time.time())
+    for name in CSV_COLUMNS:
+        value = metrics.get(name, FIELD_DEFAULTS.get(name, 0))
+        if name in LSA_VECTOR_FIELDS:
+            record[name] = parse_vector(value)
+        else:
+            record[name] = value
+    return record
+
+
+def upgrade_part(part):
+    """Return part unchanged if it has the current dtype, else a copy with the current dtype."""
+    if part.dtype == SESSION_METRICS_DTYPE:
+        return part
+    upgraded = np.zeros(part.shape, dtype=SESSION_METRICS_DTYPE)
+    for name, default in FIELD_DEFAULTS.items():
+        upgraded[name] = default
+    for name in part.dtype.names:
+        if name in SESSION_METRICS_DTYPE.names:
+            upgraded[name] = part[name]
+    return upgraded
+
+
+class MetricsStore:
+    """Append-only columnar store made of memory-mappable .npy part files."""
+
+    def __init__(self, directory=METRICS_DIR, batch_size=32, flush_interval=10.0):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._timer = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def append(self, metrics):
+        """Buffer one session's metrics, flushing when the batch is full or flush_interval seconds later."""
+        with self._lock:
+            self._buffer.append(to_record(metrics))
+            full = len(self._buffer) >= self.batch_size
+            if not full and self._timer is None:
+                # A partial batch is written on a timer, even if no further session arrives
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records as a new part file."""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if records:
+            self._write_part(np.array(records, dtype=SESSION_METRICS_DTYPE))
+
+    def _write_part(self, array):
+        os.makedirs(self.directory, exist_ok=True)
+        # Part names sort by creation time; the random suffix keeps concurrent writers apart
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.npy"
+        tmp_path = os.path.join(self.directory, f".{name}.tmp")
+        with open(tmp_path, "wb") as part_file:
+            np.save(part_file, array)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+
+    def part_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, "part-*.npy")))
+
+    def parts(self):
+        """Return every part as a read-only memory-mapped structured array (no copy).
+
+        Parts written with an older dtype are upgraded in memory; fields they lack get FIELD_DEFAULTS or zero.
+        """
+        return [upgrade_part(np.load(path, mmap_mode="r")) for path in self.part_paths()]
+
+    def load(self):
+        """Return all stored records as one structured array."""
+        parts = self.parts()
+        if not parts:
+            return np.zeros(0, dtype=SESSION_METRICS_DTYPE)
+        return np.concatenate(parts)
+
+    def column(self, name):
+        """Return one column across all parts; vector columns come back as an (n, LSA_DIMENSIONS) array."""
+        parts = self.parts()
+        if not parts:
+            shape = (0, LSA_DIMENSIONS) if name in LSA_VECTOR_FIELDS else (0,)
+            return np.zeros(shape, dtype=SESSION_METRICS_DTYPE[name].base)
+        return np.concatenate([part[name] for part in parts])
+
+    def to_dataframe(self):
+        """Return the records as a pandas DataFrame, with one column per LSA dimension."""
+        import pandas as pd
+
+        records = self.load()
+        columns = {}
+        for name in SESSION_METRICS_DTYPE.names:
+            if name in LSA_VECTOR_FIELDS:
+                for dim in range(LSA_DIMENSIONS):
+                    columns[f"{name}_{dim + 1}"] = records[name][:, dim]
+            else:
+                columns[name] = records[name]
+        return pd.DataFrame(columns)
+
+    def compact(self):
+        """Merge all part files into one, so reads open a single file."""
+        paths = self.part_paths()
+        if len(paths) < 2:
+            return
+        self._write_part(self.load())
+        for path in paths:
+            os.remove(path)
+
+    def import_csv(self, csv_path):
+        """Convert a legacy session_data.csv into typed records and return how many were imported."""
+        import pandas as pd
+
+        df = pd.read_csv(csv_path)
+        records = []
+        for row in df.to_dict("records"):
+            metrics = {}
+            for name, column in CSV_COLUMNS.items():
+                value = row.get(column, FIELD_DEFAULTS.get(name, 0))
+                if not isinstance(value, str) and pd.isna(value):
+                    value = FIELD_DEFAULTS.get(name, 0)
+                metrics[name] = value
+            # Legacy rows carry no timestamp; use the CSV's modification time
+            metrics["recorded_at"] = os.path.getmtime(csv_path)
+            records.append(to_record(metrics))
+        if records:
+            self._write_part(np.array(records, dtype=SESSION_METRICS_DTYPE))
+        return len(records)
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "show"
+    store = MetricsStore()
+    if command == "import":
+        csv_path = sys.argv[2] if len(sys.argv) > 2 else "session_data.csv"
+        print(f"Imported {store.import_csv(csv_path)} rows from {csv_path} into {store.directory}")
+    elif command == "compact":
+        store.compact()
+        print(f"Compacted {store.directory} into {len(store.part_paths())} part file(s)")
+    else:
+        df = store.to_dataframe()
+        print(f"{len(df)} sessions in {len(store.part_paths())} part file(s)")
+        print(df.describe())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Offline stand-in for the Gemini models, for benchmarks and load tests.
+
+ReplayLLM answers generate_content() from a responses file instead of the
+API. A response is looked up by the hash of the full prompt first (exact
+replay of a recorded session), then by the first rule whose text appears in
+the question, then falls back to the default answer. RecordingLLM wraps a
+real model and saves every answer in the same file format.
+
+Responses file:
+    {
+        "recorded": {"<sha256 of prompt>": "answer", ...},
+        "rules": [["text in the question", "answer"], ...],
+        "default": "answer"
+    }
+"""
+import json
+import threading
+import time
+from collections import namedtuple
+
+from cache_utils import content_hash
+
+LLMResponse = namedtuple("LLMResponse", ["text"])
+
+# Every module that talks to the model keeps it in a module-level `model` attribute
+LLM_MODULES = [
+    "applicant_resume_upload",
+    "applicant_details",
+    "job_description",
+    "analyze_bulletpoints",
+    "professional_experience",
+]
+
+
+def load_responses(path):
+    with open(path, "r", encoding="utf-8") as responses_file:
+        responses = json.load(responses_file)
+    responses.setdefault("recorded", {})
+    responses.setdefault("rules", [])
+    responses.setdefault("default", "Not found")
+    return responses
+
+
+def question_of(prompt):
+    """Return the question part of a get_gemini_response prompt ("<context>\\n\\nQuestion: <question>")."""
+    return prompt.rsplit("\n\nQuestion: ", 1)[-1]
+
+
+class ReplayLLM:
+    """Answers prompts from a responses file, optionally sleeping latency seconds per call like a remote model."""
+
+    def __init__(self, responses, latency=0.0):
+        self.responses = responses
+        self.latency = latency
+        self.calls = 0
+        self.replayed = 0
+        self.defaulted = 0
+        self._lock = threading.Lock()
+
+    def answer(self, prompt):
+        """Return (answer, source) where source is "recorded", "rule" or "default"."""
+        recorded = self.responses["recorded"].get(content_hash(prompt))
+        if recorded is not None:
+            return recorded, "recorded"
+        question = question_of(prompt)
+        for text, response in self.responses["rules"]:
+            if text in question:
+                return response, "rule"
+        return self.responses["default"], "default"
+
+    def generate_content(self, prompt):
+        if self.latency:
+            time.sleep(self.latency)
+        text, source = self.answer(prompt)
+        with self._lock:
+            self.calls += 1
+            self.replayed += source == "recorded"
+            self.defaulted += source == "default"
+        return LLMResponse(text)
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "replayed": self.replayed, "defaulted": self.defaulted}
+
+
+class RecordingLLM:
+    """Passes prompts to a real model and records each answer under the prompt hash."""
+
+    def __init__(self, model, responses):
+        self.model = model
+        self.responses = responses
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        response = self.model.generate_content(prompt)
+        try:
+            text = response.text
+        except (ValueError, AttributeError):
+            text = ""
+        with self._lock:
+            self.responses["recorded"][content_hash(prompt)] = text
+        return response
+
+    def save(self, path):
+        with self._lock:
+            with open(path, "w", encoding="utf-8") as responses_file:
+                json.dump(self.responses, responses_file, indent=4, ensure_ascii=False)
+
+
+def install(llm, modules=LLM_MODULES):
+    """Point every module's `model` at llm and return {module name: previous model} for restore()."""
+    import importlib
+
+    previous = {}
+    for name in modules:
+        module = importlib.import_module(name)
+        previous[name] = module.model
+        module.model = llm
+    return previous
+
+
+def restore(previous):
+    import importlib
+
+    for name, model in previous.items():
+        importlib.import_module(name).model = model
@@ -0,0 +1,217 @@
+import io
+import json
+import os
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+
+from cache_utils import BoundedCache, content_hash
+from instrumentation import instrumented, record
+
+# Shared on-disk cache of parsed PDFs. Point PDF_CACHE_DIR at a shared volume so
+# every instance of the app can reuse text that another instance already parsed.
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "pdf_cache")
+
+# In-process cache, bounded by number of documents and total characters of text
+MAX_CACHED_PDFS = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "64"))
+MAX_CACHED_CHARS = int(os.getenv("PDF_CACHE_MAX_CHARS", str(16 * 1024 * 1024)))
+
+_pdf_pages_cache = BoundedCache(
+    max_entries=MAX_CACHED_PDFS,
+    max_bytes=MAX_CACHED_CHARS,
+    sizeof=lambda pages: sum(len(page) for page in pages),
+)
+
+# Limits for a single document: pages beyond the cap and text beyond the byte budget are dropped
+MAX_PDF_PAGES = int(os.getenv("PDF_MAX_PAGES", "60"))
+MAX_PDF_TEXT_BYTES = int(os.getenv("PDF_MAX_TEXT_BYTES", str(2 * 1024 * 1024)))
+
+# Page-parallel extraction settings. Short resumes are parsed in-process, since
+# starting work on the pool costs more than parsing a couple of pages.
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "8"))
+PAGES_PER_TASK = 2
+
+PageResult = namedtuple("PageResult", ["index", "text", "seconds"])
+
+_page_executor = None
+
+
+def read_pdf_bytes(source):
+    """Return the raw bytes of a PDF given bytes, a path or a file-like object (e.g. st.file_uploader)."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, str):
+        with open(source, "rb") as pdf_file:
+            return pdf_file.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    source.seek(0)
+    return source.read()
+
+
+def _get_page_executor():
+    """Create the shared process pool on first use."""
+    global _page_executor
+    if _page_executor is None:
+        _page_executor = ProcessPoolExecutor(max_workers=PDF_EXTRACTION_WORKERS)
+    return _page_executor
+
+
+def _extract_page_range(source, start, stop):
+    """Worker task: extract pages [start, stop) of a PDF given as bytes or a file path, timing each one."""
+    pdf_reader = PyPDF2.PdfReader(source if isinstance(source, str) else io.BytesIO(source))
+    results = []
+    for index in range(start, stop):
+        started = time.perf_counter()
+        text = pdf_reader.pages[index].extract_text() or ""
+        results.append(PageResult(index, text, time.perf_counter() - started))
+    return results
+
+
+def _spool_pdf(pdf_bytes):
+    """Write the PDF to a uniquely named file in the cache directory and return its path."""
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+    path = os.path.join(PDF_CACHE_DIR, f"{content_hash(pdf_bytes)}.{uuid.uuid4().hex[:8]}.pdf")
+    with open(path, "wb") as pdf_file:
+        pdf_file.write(pdf_bytes)
+    return path
+
+
+def count_pdf_pages(pdf_bytes):
+    """Return the number of pages in a PDF."""
+    return len(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)).pages)
+
+
+def iter_pdf_pages(pdf_bytes, max_pages=MAX_PDF_PAGES, max_bytes=MAX_PDF_TEXT_BYTES, workers=None):
+    """Yield PageResult tuples in page order as soon as each page has been parsed.
+
+    Large documents are split into page ranges and parsed on a process pool.
+    Extraction stops at max_pages pages or once max_bytes of UTF-8 text have been produced.
+    """
+    page_count = min(count_pdf_pages(pdf_bytes), max_pages)
+    workers = PDF_EXTRACTION_WORKERS if workers is None else workers
+    ranges = [(start, min(start + PAGES_PER_TASK, page_count)) for start in range(0, page_count, PAGES_PER_TASK)]
+
+    spool_path = None
+    if workers > 1 and page_count >= PARALLEL_PAGE_THRESHOLD:
+        # Workers read the document from disk instead of each task pickling a copy of it
+        spool_path = _spool_pdf(pdf_bytes)
+        executor = _get_page_executor()
+        futures = [executor.submit(_extract_page_range, spool_path, start, stop) for start, stop in ranges]
+        batches = (future.result() for future in futures)
+    else:
+        futures = []
+        batches = (_extract_page_range(pdf_bytes, start, stop) for start, stop in ranges)
+
+    used_bytes = 0
+    try:
+        for batch in batches:
+            for page in batch:
+                page_bytes = len(page.text.encode("utf-8"))
+                if used_bytes + page_bytes > max_bytes:
+                    # Keep whatever still fits in the budget and stop parsing
+                    remaining = page.text.encode("utf-8")[:max_bytes - used_bytes].decode("utf-8", "ignore")
+                    if remaining:
+                        yield PageResult(page.index, remaining, page.seconds)
+                    return
+                used_bytes += page_bytes
+                yield page
+    finally:
+        for future in futures:
+            future.cancel()
+        if spool_path is not None:
+            try:
+                os.remove(spool_path)
+            except OSError:
+                pass
+
+
+def extract_pdf_text(pdf_bytes, **limits):
+    """Return (text, page_timings) for a PDF, joining the page texts once at the end."""
+    pages = list(iter_pdf_pages(pdf_bytes, **limits))
+    return "".join(page.text for page in pages), [page.seconds for page in pages]
+
+
+@instrumented("pdf.parse")
+def parse_pdf_pages(pdf_bytes):
+    """Parse a PDF with PyPDF2 and return the text of each page."""
+    return [page.text for page in iter_pdf_pages(pdf_bytes)]
+
+
+def _disk_cache_path(pdf_hash):
+    return os.path.join(PDF_CACHE_DIR, f"{pdf_hash}.json")
+
+
+def _load_pages_from_disk(pdf_hash):
+    try:
+        with open(_disk_cache_path(pdf_hash), "r", encoding="utf-8") as cache_file:
+            return json.load(cache_file)["pages"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _save_pages_to_disk(pdf_hash, pages):
+    try:
+        os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+        path = _disk_cache_path(pdf_hash)
+        # Write to a temp file and rename so readers never see a partial entry
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump({"pages": pages}, cache_file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write PDF cache entry: {str(e)}")
+
+
+def get_pdf_pages(pdf_bytes, pdf_hash=None):
+    """Return per-page text for a PDF, parsing it only if no cache has seen its content before."""
+    pdf_hash = pdf_hash or content_hash(pdf_bytes)
+
+    pages = _pdf_pages_cache.get(pdf_hash)
+    if pages is not None:
+        return pages
+
+    pages = _load_pages_from_disk(pdf_hash)
+    if pages is None:
+        pages = parse_pdf_pages(pdf_bytes)
+        _save_pages_to_disk(pdf_hash, pages)
+
+    _pdf_pages_cache.put(pdf_hash, pages)
+    return pages
+
+
+def stream_pdf_pages(pdf_bytes, pdf_hash=None):
+    """Yield PageResult tuples, from the cache when possible, caching the pages once parsing completes."""
+    pdf_hash = pdf_hash or content_hash(pdf_bytes)
+
+    pages = _pdf_pages_cache.get(pdf_hash)
+    if pages is None:
+        pages = _load_pages_from_disk(pdf_hash)
+        if pages is not None:
+            _pdf_pages_cache.put(pdf_hash, pages)
+    if pages is not None:
+        for index, text in enumerate(pages):
+            yield PageResult(index, text, 0.0)
+        return
+
+    pages = []
+    for page in iter_pdf_pages(pdf_bytes):
+        pages.append(page.text)
+        record("pdf.parse_page", page.seconds)
+        yield page
+    _save_pages_to_disk(pdf_hash, pages)
+    _pdf_pages_cache.put(pdf_hash, pages)
+
+
+def get_pdf_text(pdf_bytes, pdf_hash=None):
+    """Return the full text of a PDF, served from the cache when possible."""
+    return "".join(get_pdf_pages(pdf_bytes, pdf_hash))
+
+
+def pdf_cache_stats():
+    """Return hit/miss counters for the in-process PDF text cache."""
+    return _pdf_pages_cache.stats()
@@ -0,0 +1,80 @@
+import io
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+
+from cache_utils import BoundedCache, content_hash
+from instrumentation import instrumented
+
+# Resolution of the preview thumbnails; higher is sharper but slower and bigger
+PREVIEW_DPI = int(os.getenv("PREVIEW_DPI", "72"))
+MAX_CACHED_PREVIEWS = int(os.getenv("MAX_CACHED_PREVIEWS", "64"))
+MAX_PREVIEW_CACHE_BYTES = int(os.getenv("MAX_PREVIEW_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# PNG pages keyed by (pdf hash, dpi), shared across reruns and sessions
+thumbnail_cache = BoundedCache(
+    max_entries=MAX_CACHED_PREVIEWS,
+    max_bytes=MAX_PREVIEW_CACHE_BYTES,
+    sizeof=lambda pages: sum(len(page) for page in pages),
+)
+
+# Rasterization runs on this thread, never on the Streamlit script thread
+_rasterizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-preview")
+_in_progress = {}
+_in_progress_lock = threading.Lock()
+
+
+@instrumented("pdf.rasterize")
+def rasterize_pdf(pdf_bytes, dpi=PREVIEW_DPI):
+    """Render every page of a PDF to PNG bytes."""
+    # pdf2image (and its poppler dependency) is only needed for the PDF preview
+    from pdf2image import convert_from_bytes
+
+    pages = []
+    for image in convert_from_bytes(pdf_bytes, dpi=dpi):
+        png = io.BytesIO()
+        image.save(png, format="PNG", optimize=True)
+        pages.append(png.getvalue())
+    return pages
+
+
+def _rasterize_and_cache(key, pdf_bytes, dpi):
+    try:
+        pages = rasterize_pdf(pdf_bytes, dpi)
+        thumbnail_cache.put(key, pages)
+        return pages
+    finally:
+        with _in_progress_lock:
+            _in_progress.pop(key, None)
+
+
+def request_thumbnails(pdf_bytes, dpi=PREVIEW_DPI, pdf_hash=None):
+    """Start rendering the thumbnails in the background unless they are cached or already rendering.
+
+    Returns a Future whose result is the list of PNG pages.
+    """
+    key = (pdf_hash or content_hash(pdf_bytes), dpi)
+    pages = thumbnail_cache.get(key)
+    if pages is not None:
+        future = Future()
+        future.set_result(pages)
+        return future
+    with _in_progress_lock:
+        if key not in _in_progress:
+            _in_progress[key] = _rasterizer.submit(_rasterize_and_cache, key, pdf_bytes, dpi)
+        return _in_progress[key]
+
+
+def get_thumbnails(pdf_bytes, dpi=PREVIEW_DPI, timeout=None, pdf_hash=None):
+    """Return the PNG page thumbnails, or None if they are not ready within timeout seconds."""
+    try:
+        return request_thumbnails(pdf_bytes, dpi, pdf_hash).result(timeout)
+    except TimeoutError:
+        return None
+
+
+def preview_cache_stats():
+    """Return hit/miss counters for the thumbnail cache and how many renders are running."""
+    with _in_progress_lock:
+        rendering = len(_in_progress)
+    return dict(thumbnail_cache.stats(), rendering=rendering)
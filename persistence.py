@@ -0,0 +1,140 @@
+import atexit
+import copy
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds the writer waits after the first queued write so a burst of saves can be coalesced
+PERSIST_FLUSH_INTERVAL = float(os.getenv("PERSIST_FLUSH_INTERVAL", "0.5"))
+
+
+class BackgroundWriter:
+    """Single background thread that performs queued disk writes off the Streamlit script run.
+
+    Writes submitted with the same key coalesce: only the latest one is kept and it
+    runs after everything queued before it. Writes without a key (appends) always run,
+    in submission order. The queue is drained every flush_interval seconds, on
+    flush(), and at interpreter exit.
+    """
+
+    def __init__(self, flush_interval=PERSIST_FLUSH_INTERVAL, name="persistence-writer"):
+        self.flush_interval = flush_interval
+        self.name = name
+        self._pending = OrderedDict()
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._stats = {"submitted": 0, "coalesced": 0, "completed": 0, "failed": 0}
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        # Registered on first use, after the module-level CSV/metrics writers, so atexit
+        # (last in, first out) drains this queue before those writers do their final flush
+        atexit.register(self.close)
+
+    def submit(self, fn, *args, key=None, **kwargs):
+        """Queue fn(*args, **kwargs); a pending write with the same key is replaced."""
+        with self._condition:
+            if not self._closed:
+                if self._thread is None:
+                    self._start()
+                if key is None:
+                    key = ("append", next(self._sequence))
+                elif key in self._pending:
+                    del self._pending[key]
+                    self._stats["coalesced"] += 1
+                self._pending[key] = (fn, args, kwargs)
+                self._stats["submitted"] += 1
+                self._condition.notify_all()
+                return
+        # After shutdown there is no writer thread; write inline
+        self._execute(fn, args, kwargs)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                # Let a burst of saves coalesce unless someone is waiting on a flush
+                deadline = time.monotonic() + self.flush_interval
+                while not (self._flush_requested or self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = list(self._pending.values())
+                self._pending.clear()
+                self._in_flight = len(batch)
+                self._flush_requested = False
+
+            for fn, args, kwargs in batch:
+                self._execute(fn, args, kwargs)
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+
+    def _execute(self, fn, args, kwargs):
+        try:
+            fn(*args, **kwargs)
+            succeeded = True
+        except Exception as e:
+            print(f"Background write {getattr(fn, '__name__', fn)} failed: {e}")
+            succeeded = False
+        with self._condition:
+            self._stats["completed" if succeeded else "failed"] += 1
+
+    def depth(self):
+        """Return the number of writes queued or currently being performed."""
+        with self._condition:
+            return len(self._pending) + self._in_flight
+
+    def flush(self, timeout=None):
+        """Block until every queued write has been performed; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._in_flight:
+                if self._thread is None or not self._thread.is_alive():
+                    break
+                self._flush_requested = True
+                self._condition.notify_all()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            leftovers = list(self._pending.values())
+            self._pending.clear()
+        # Only reached with leftovers if the writer thread is gone
+        for fn, args, kwargs in leftovers:
+            self._execute(fn, args, kwargs)
+        return True
+
+    def close(self, timeout=10.0):
+        """Drain the queue and stop the writer thread; later submits write inline."""
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        """Return submitted/coalesced/completed/failed counts and the current queue depth."""
+        with self._condition:
+            return dict(self._stats, depth=len(self._pending) + self._in_flight)
+
+
+def snapshot(data):
+    """Deep-copy data taken from session state so later edits can't change a queued write."""
+    return copy.deepcopy(data)
+
+
+# One writer thread per process, shared by every session
+background_writer = BackgroundWriter()
@@ -0,0 +1,231 @@
+"""Headless resume tailoring pipeline.
+
+Usage:
+    python pipeline.py resume.pdf job_description.txt --output tailored_resume.pdf
+
+The same stage functions back the Streamlit pages, so a batch job, the HTTP
+service and the UI all run one implementation.
+"""
+import argparse
+import json
+import time
+
+from analyze_bulletpoints import (
+    append_similarity_entry,
+    clean_job_responsibilities,
+    compute_similarity_entry,
+    optimize_experience_points,
+    sbert_model,
+    similarity_writer,
+)
+from applicant_resume_upload import extract_applicant_data
+from concurrency import llm_executor
+from create_pdf import create_pdf
+from dedup import lookup_applicant, lookup_job
+from instrumentation import span
+from job_description import extract_job_data
+from pdf_extraction import read_pdf_bytes, stream_pdf_pages
+from professional_experience import collect_optimized_points, summarize_profile
+from stage_timing import StageTimer
+
+PIPELINE_STAGES = ["parse", "extract_applicant", "extract_job", "optimize", "summary", "render"]
+
+
+class ResumeTailoringPipeline:
+    """Turn resume bytes and a job description into an optimized resume structure and PDF.
+
+    executor fans out the independent model calls inside each stage. It defaults
+    to the shared LLM thread pool; pass concurrency.SerialExecutor() to run
+    everything in the calling thread.
+    """
+
+    def __init__(self, executor=None, record_similarity=False):
+        self.executor = executor or llm_executor
+        self.record_similarity = record_similarity
+        self.timer = StageTimer(max_samples=1000)  # Most recent stage timings across runs
+
+    def _timed(self, stage, timings, fn, *args):
+        started = time.perf_counter()
+        try:
+            with span(f"pipeline.{stage}"):
+                return fn(*args)
+        finally:
+            timings[stage] = time.perf_counter() - started
+            self.timer.record(stage, timings[stage])
+
+    def stream_resume(self, resume_bytes, pdf_hash=None):
+        """Yield the resume's PageResult tuples as each page is parsed (cached pages come back at once)."""
+        return stream_pdf_pages(read_pdf_bytes(resume_bytes), pdf_hash)
+
+    def parse_resume(self, resume_bytes):
+        """Return the text of the resume PDF."""
+        pdf_text = "".join(page.text for page in self.stream_resume(resume_bytes))
+        if not pdf_text.strip():
+            raise ValueError("Failed to extract text from the resume PDF")
+        return pdf_text
+
+    def find_applicant(self, pdf_text):
+        """Return (text_hash, record) for an earlier extraction of the same resume text, or (text_hash, None)."""
+        return lookup_applicant(pdf_text)
+
+    def extract_applicant(self, pdf_text, reuse=True):
+        """Return the applicant data extracted from the resume text.
+
+        With reuse, an earlier extraction of the same text is returned instead of calling the model.
+        """
+        if reuse:
+            _, record = self.find_applicant(pdf_text)
+            if record is not None:
+                return record["data"]
+        return extract_applicant_data(pdf_text, executor=self.executor)
+
+    def find_job(self, job_description):
+        """Return (text_hash, record) for an earlier extraction of the same job description, or (text_hash, None)."""
+        return lookup_job(job_description)
+
+    def extract_job(self, job_description, reuse=True):
+        """Return the job data extracted from the job description.
+
+        With reuse, an earlier extraction of the same text is returned instead of calling the model.
+        """
+        if reuse:
+            _, record = self.find_job(job_description)
+            if record is not None:
+                return record["data"]
+        return extract_job_data(job_description, executor=self.executor)
+
+    def optimize_experience(self, experience, job_responsibilities, skills):
+        """Return (updated_experience, optimizations) with every point rewritten for the job."""
+        cleaned_job_responsibilities = clean_job_responsibilities(job_responsibilities)
+
+        # Optimize the points of all experiences in one batch so they share the executor
+        all_points = [
+            (index, point)
+            for index, exp in enumerate(experience)
+            for point in exp.get("job_descriptions", [])
+            if point.strip()
+        ]
+        results = optimize_experience_points(
+            [point for _, point in all_points], cleaned_job_responsibilities, skills, executor=self.executor
+        )
+
+        updated_experience = []
+        for index, exp in enumerate(experience):
+            updated_experience.append({
+                "company": exp.get("company", "Not found"),
+                "position": exp.get("position", "Not found"),
+                "duration": exp.get("duration", "Not found"),
+                "original_descriptions": exp.get("job_descriptions", []),
+                "job_descriptions": [
+                    result["optimized_point"]
+                    for (point_index, _), result in zip(all_points, results)
+                    if point_index == index
+                ],
+            })
+
+        if self.record_similarity:
+            for result in results:
+                append_similarity_entry(compute_similarity_entry(
+                    result["original_point"], result["similar_responsibility"], result["optimized_point"], sbert_model
+                ))
+            similarity_writer.flush()
+
+        return updated_experience, results
+
+    def summarize(self, applicant, updated_experience, skills, job_description):
+        """Return the generated professional summary."""
+        return summarize_profile(
+            applicant.get("education", []),
+            applicant.get("special_achievements", []),
+            skills,
+            collect_optimized_points(updated_experience),
+            job_description,
+        )
+
+    def run(self, resume_bytes, job_description, extra_skills=None):
+        """Run every stage and return a dict with the optimized structure, PDF bytes and stage timings.
+
+        extra_skills are added to the applicant's skills, like picking job skills on the Skills Management page.
+        """
+        timings = {}
+
+        pdf_text = self._timed("parse", timings, self.parse_resume, resume_bytes)
+        applicant = self._timed("extract_applicant", timings, self.extract_applicant, pdf_text)
+        job = self._timed("extract_job", timings, self.extract_job, job_description)
+
+        # Combine the applicant's skills with any selected job skills, keeping order and dropping duplicates
+        skills = list(dict.fromkeys(
+            [skill for skill in applicant.get("skills", []) if skill != "Not found"] + list(extra_skills or [])
+        ))
+
+        updated_experience, optimizations = self._timed(
+            "optimize", timings, self.optimize_experience,
+            applicant.get("experience", []), job.get("job_responsibilities", []), skills,
+        )
+        summary = self._timed("summary", timings, self.summarize, applicant, updated_experience, skills, job_description)
+
+        resume = {
+            "name": applicant.get("name", ""),
+            "email": applicant.get("email", ""),
+            "mobile": applicant.get("mobile", ""),
+            "generated_prof_summary": summary,
+            "education": applicant.get("education", []),
+            "experience": updated_experience,
+            "skills": skills,
+            "achievements": applicant.get("special_achievements", []),
+            "position": job.get("position", ""),
+        }
+        pdf = self._timed("render", timings, create_pdf, resume)
+
+        return {
+            "pdf_text": pdf_text,
+            "applicant": applicant,
+            "job": job,
+            "skills": skills,
+            "optimizations": optimizations,
+            "resume": resume,
+            "pdf": pdf,
+            "timings": timings,
+        }
+
+
+_app_pipeline = None
+
+
+def get_pipeline():
+    """Return the pipeline shared by the Streamlit pages (created on first use)."""
+    global _app_pipeline
+    if _app_pipeline is None:
+        _app_pipeline = ResumeTailoringPipeline()
+    return _app_pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tailor a resume PDF to a job description without the Streamlit UI.")
+    parser.add_argument("resume", help="Path to the resume PDF")
+    parser.add_argument("job_description", help="Path to a text file containing the job description")
+    parser.add_argument("--output", default="tailored_resume.pdf", help="Where to write the tailored resume PDF")
+    parser.add_argument("--json", help="Optionally write the optimized resume structure to this JSON file")
+    parser.add_argument("--extra-skill", action="append", default=[], help="Job skill to add to the applicant's skills")
+    args = parser.parse_args()
+
+    with open(args.resume, "rb") as resume_file:
+        resume_bytes = resume_file.read()
+    with open(args.job_description, "r", encoding="utf-8") as job_file:
+        job_description = job_file.read()
+
+    result = ResumeTailoringPipeline().run(resume_bytes, job_description, args.extra_skill)
+
+    with open(args.output, "wb") as pdf_file:
+        pdf_file.write(result["pdf"])
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(result["resume"], json_file, indent=4, ensure_ascii=False)
+
+    print(f"Tailored resume written to {args.output}")
+    for stage in PIPELINE_STAGES:
+        print(f"{stage:<18} {result['timings'][stage]:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,21 @@ import streamlit as st
 from dotenv import load_dotenv
 import json
 import os
+from cache_utils import content_hash
+from repository import get_repository
+from artifact_store import artifact_summary, get_session_id, write_artifact
+from create_pdf import create_pdf
+from pdf_preview import PREVIEW_DPI, get_thumbnails
 
 # Load environment variables
 load_dotenv()
 
+# Directory for saving updated applicant files, namespaced per session
+UPDATED_APPLICANT_DIR = "updated_applicant"
+
+# Seconds a rerun waits for the preview thread before showing a placeholder
+PREVIEW_WAIT_SECONDS = float(os.getenv("PREVIEW_WAIT_SECONDS", "10"))
+
 def show_preview_resume():
     st.title("Preview Resume")
 
@@ -21,63 +32,105 @@ def show_preview_resume():
             "skills": st.session_state.updated_skills,
             "achievements": st.session_state.special_achievements,
         }
-        # Define the directory for saving applicant JSON files
-        UPDATED_APPLICANT_DIR = "updated_applicant"
-
-        # Ensure the directory exists
-        os.makedirs(UPDATED_APPLICANT_DIR, exist_ok=True)
-        # Save applicant details to a text file
-        file_name = f"{UPDATED_APPLICANT_DIR}/{applicant_data['name'].replace(' ', '_')}_resume.json"
-        with open(file_name, "w", encoding="utf-8") as json_file:
-            json.dump(applicant_data, json_file, indent=4, ensure_ascii=False)
+        # Save applicant details under this session's directory; unchanged content is not rewritten
+        file_name, written = write_artifact(
+            UPDATED_APPLICANT_DIR,
+            get_session_id(st.session_state),
+            f"{applicant_data['name'].replace(' ', '_')}_resume.json",
+            applicant_data,
+        )
+
+        # Record the tailored resume once per distinct content
+        if written or "resume_record_id" not in st.session_state:
+            st.session_state.resume_record_id = get_repository().save_tailored_resume(
+                applicant_data,
+                content_hash(json.dumps(applicant_data, sort_keys=True, default=str)),
+                company_name=st.session_state.get("company_name"),
+                position=st.session_state.get("position"),
+                source_file=file_name,
+            )
 
         # Store the filename in the session state
         st.session_state.resume_file_path = file_name
 
-        # Display applicant details
-        st.header("Applicant Details")
-        st.subheader("Name")
-        st.write(applicant_data["name"])
-
-        st.subheader("Telephone")
-        st.write(applicant_data["mobile"])
-
-        st.subheader("Email")
-        st.write(applicant_data["email"])
-
-        st.header("Professional Summary")
-        st.write(applicant_data["generated_prof_summary"])
-
-        st.header("Experience")
-        if applicant_data["experience"]:
-            for idx, exp in enumerate(applicant_data["experience"], start=1):
-                st.subheader(f"Job {idx}")
-                st.write(f"**Company:** {exp.get('company', 'Not found')}")
-                st.write(f"**Position:** {exp.get('position', 'Not found')}")
-                st.write(f"**Duration:** {exp.get('duration', 'Not found')}")
-                st.write("**Responsibilities:**")
-                for desc in exp.get("job_descriptions", ["Not found"]):
-                    st.write(f"- {desc}")
+        # Preview the individual fields or the rendered PDF (as cached page images, which need poppler)
+        preview_mode = st.radio("Preview mode", ["Details", "PDF"], horizontal=True)
+        if preview_mode == "PDF":
+            show_pdf_preview(dict(applicant_data, position=st.session_state.get("position", "")))
         else:
-            st.write("No experience data available.")
+            show_resume_details(applicant_data)
 
-        st.header("Achievements")
-        if applicant_data["achievements"] and applicant_data["achievements"][0] != "Not found":
-            for achievement in applicant_data["achievements"]:
-                st.write(f"- {achievement}")
-        else:
-            st.write("No achievements found.")
+        st.caption(artifact_summary())
 
-        st.header("Education")
-        if applicant_data["education"] and applicant_data["education"][0] != "Not found":
-            for edu in applicant_data["education"]:
-                st.write(f"- {edu}")
-        else:
-            st.write("No education details found.")
-        
         if st.button("Show similarity"):
             st.session_state.page = "similarity"
 
+def show_pdf_preview(applicant_data):
+    """Show the actual create_pdf output as page images, rasterized once per distinct PDF."""
+    dpi = st.select_slider("Preview resolution (DPI)", options=sorted({50, 72, 100, 150, PREVIEW_DPI}), value=PREVIEW_DPI)
+    pdf = create_pdf(applicant_data)
+    pdf_hash = content_hash(pdf)
+
+    try:
+        with st.spinner("Rendering preview..."):
+            pages = get_thumbnails(pdf, dpi, timeout=PREVIEW_WAIT_SECONDS, pdf_hash=pdf_hash)
+    except Exception as e:
+        # pdf2image missing, poppler not installed (PDFInfoNotInstalledError), PDFPageCountError, ...
+        st.warning(f"PDF preview unavailable ({type(e).__name__}: {str(e)}). Showing the resume details instead.")
+        show_resume_details(applicant_data)
+        return
+
+    if pages is None:
+        st.info("The preview is still rendering. It will appear on the next rerun.")
+        if st.button("Refresh preview"):
+            st.rerun()
+        return
+
+    for page_number, page in enumerate(pages, start=1):
+        st.image(page, caption=f"Page {page_number}", width="stretch")
+
+def show_resume_details(applicant_data):
+    """Show each resume field as text."""
+    st.header("Applicant Details")
+    st.subheader("Name")
+    st.write(applicant_data["name"])
+
+    st.subheader("Telephone")
+    st.write(applicant_data["mobile"])
+
+    st.subheader("Email")
+    st.write(applicant_data["email"])
+
+    st.header("Professional Summary")
+    st.write(applicant_data["generated_prof_summary"])
+
+    st.header("Experience")
+    if applicant_data["experience"]:
+        for idx, exp in enumerate(applicant_data["experience"], start=1):
+            st.subheader(f"Job {idx}")
+            st.write(f"**Company:** {exp.get('company', 'Not found')}")
+            st.write(f"**Position:** {exp.get('position', 'Not found')}")
+            st.write(f"**Duration:** {exp.get('duration', 'Not found')}")
+            st.write("**Responsibilities:**")
+            for desc in exp.get("job_descriptions", ["Not found"]):
+                st.write(f"- {desc}")
+    else:
+        st.write("No experience data available.")
+
+    st.header("Achievements")
+    if applicant_data["achievements"] and applicant_data["achievements"][0] != "Not found":
+        for achievement in applicant_data["achievements"]:
+            st.write(f"- {achievement}")
+    else:
+        st.write("No achievements found.")
+
+    st.header("Education")
+    if applicant_data["education"] and applicant_data["education"][0] != "Not found":
+        for edu in applicant_data["education"]:
+            st.write(f"- {edu}")
+    else:
+        st.write("No education details found.")
+
 def initialize_session_optimized_variables():
     """
     Initialize session variables if they don't exist.
@@ -121,11 +174,5 @@ def save_optimized_resume_as_text():
     # Save the text representation in session state
     st.session_state.optimized_data_text = optimized_data_text
 
-    # Ensure the 'updated_applicant' directory exists
-    directory = "updated_applicant"
-    os.makedirs(directory, exist_ok=True)
-
-    # Save the text file in the directory
-    file_path = os.path.join(directory, "optimized_resume.txt")
-    with open(file_path, "w") as file:
-        file.write(optimized_data_text)
+    # Save the text file in this session's directory (atomic, skipped when unchanged)
+    write_artifact(UPDATED_APPLICANT_DIR, get_session_id(st.session_state), "optimized_resume.txt", optimized_data_text)
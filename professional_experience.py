@@ -2,6 +2,7 @@ import streamlit as st
 from dotenv import load_dotenv
 import os
 import google.generativeai as genai
+from instrumentation import instrumented
 
 # Load environment variables
 load_dotenv()
@@ -10,6 +11,7 @@ load_dotenv()
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 model = genai.GenerativeModel("gemini-pro")
 
+@instrumented("llm.generate")
 def get_gemini_response(question, context):
     """Get a response from the Generative AI model."""
     full_question = f"{context}\n\nQuestion: {question}"
@@ -19,48 +21,27 @@ def get_gemini_response(question, context):
     except (ValueError, AttributeError):
         return "Not found"
 
-def generate_professional_summary(applicant_data, job_description):
-    """Generate a professional summary based on applicant data and job description."""
-    try:
-        # Get education
-        qualifications = ", ".join(applicant_data.get("education", []))
-        
-        # Get special achievements
-        achievements = ", ".join(applicant_data.get("special_achievements", []))
-        
-        # Get updated skills
-        skills = st.session_state.get("final_skills", []) or st.session_state.get("updated_skills", [])
-        skills_str = ", ".join(skills)
-        
-        # Get job descriptions from updated experience
-        optimized_points = []
-        if "updated_experience" in st.session_state:
-            for exp in st.session_state.updated_experience:
-                if exp and isinstance(exp, dict):
-                    # Get job descriptions from the experience dictionary
-                    descriptions = exp.get('job_descriptions', [])
-                    if descriptions:
-                        optimized_points.extend(descriptions)
-        
-        # Debug information
-        #st.write("Debug - Experience Data:")
-        #st.write("Updated Experience Structure:")
-        #for exp in st.session_state.get("updated_experience", []):
-        #    if exp:
-        #       st.write(f"Company: {exp.get('company')}")
-        #        st.write(f"Position: {exp.get('position')}")
-        #        st.write(f"Job Descriptions: {exp.get('job_descriptions', [])}")
-        #st.write("Total Optimized Points:", len(optimized_points))
-        
-        # Validate we have necessary data
-        if not optimized_points:
-            st.error("No job descriptions found in updated experience. Please complete the experience optimization step first.")
-            return "Please optimize your experience points before generating the summary."
-        
-        # Filter out empty strings and join points
-        experience_str = " | ".join(filter(None, optimized_points))
+def collect_optimized_points(updated_experience):
+    """Return every optimized job description point from the updated experience list."""
+    optimized_points = []
+    for exp in updated_experience:
+        if exp and isinstance(exp, dict):
+            # Get job descriptions from the experience dictionary
+            descriptions = exp.get('job_descriptions', [])
+            if descriptions:
+                optimized_points.extend(descriptions)
+    return optimized_points
+
+def summarize_profile(education, achievements, skills, optimized_points, job_description):
+    """Ask the model for a professional summary. Returns "Not found" if the model gives no answer."""
+    qualifications = ", ".join(education)
+    achievements = ", ".join(achievements)
+    skills_str = ", ".join(skills)
 
-        context = f"""
+    # Filter out empty strings and join points
+    experience_str = " | ".join(filter(None, optimized_points))
+
+    context = f"""
         Create a professional summary using the following components:
         
         Qualifications: {qualifications}
@@ -81,13 +62,43 @@ def generate_professional_summary(applicant_data, job_description):
         do not use me, i , my , our etc
         """
         
-        question = """
+    question = """
         Generate a professional summary that showcases the candidate's expertise, 
         emphasizing updated skills, experience, education, achivements while aligning with the job requirements.
         write 150 word summary one paragrpah.
         """
+
+    return get_gemini_response(question, context)
+
+def generate_professional_summary(applicant_data, job_description):
+    """Generate a professional summary based on applicant data and job description."""
+    try:
+        # Get updated skills
+        skills = st.session_state.get("final_skills", []) or st.session_state.get("updated_skills", [])
+        
+        # Get job descriptions from updated experience
+        optimized_points = collect_optimized_points(st.session_state.get("updated_experience", []))
+        
+        # Debug information
+        #st.write("Debug - Experience Data:")
+        #st.write("Updated Experience Structure:")
+        #for exp in st.session_state.get("updated_experience", []):
+        #    if exp:
+        #       st.write(f"Company: {exp.get('company')}")
+        #        st.write(f"Position: {exp.get('position')}")
+        #        st.write(f"Job Descriptions: {exp.get('job_descriptions', [])}")
+        #st.write("Total Optimized Points:", len(optimized_points))
         
-        summary = get_gemini_response(question, context)
+        # Validate we have necessary data
+        if not optimized_points:
+            st.error("No job descriptions found in updated experience. Please complete the experience optimization step first.")
+            return "Please optimize your experience points before generating the summary."
+        
+        from pipeline import get_pipeline  # pipeline.py imports this module
+
+        summary = get_pipeline().summarize(
+            applicant_data, st.session_state.get("updated_experience", []), skills, job_description
+        )
         
         if summary == "Not found":
             st.error("Failed to generate summary. Please try again.")
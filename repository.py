@@ -0,0 +1,274 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+# SQLite database holding applicants, job descriptions and tailored resumes
+RESUME_DB_PATH = os.getenv("RESUME_DB_PATH", "resume_data.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS applicants (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT,
+    name TEXT,
+    email TEXT,
+    data TEXT NOT NULL,
+    source_file TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_applicants_hash ON applicants (content_hash);
+CREATE INDEX IF NOT EXISTS idx_applicants_name ON applicants (name);
+CREATE INDEX IF NOT EXISTS idx_applicants_created ON applicants (created_at);
+
+CREATE TABLE IF NOT EXISTS job_descriptions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT,
+    company_name TEXT,
+    position TEXT,
+    location TEXT,
+    job_description TEXT,
+    selected_text TEXT,
+    data TEXT NOT NULL,
+    source_file TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_hash ON job_descriptions (content_hash);
+CREATE INDEX IF NOT EXISTS idx_jobs_company_position ON job_descriptions (company_name, position);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON job_descriptions (created_at);
+
+CREATE TABLE IF NOT EXISTS tailored_resumes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT UNIQUE,
+    applicant_name TEXT,
+    company_name TEXT,
+    position TEXT,
+    data TEXT NOT NULL,
+    source_file TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_resumes_name ON tailored_resumes (applicant_name);
+CREATE INDEX IF NOT EXISTS idx_resumes_company_position ON tailored_resumes (company_name, position);
+CREATE INDEX IF NOT EXISTS idx_resumes_created ON tailored_resumes (created_at);
+"""
+
+# Tables whose records make up the text corpus (e.g. for the LSA model)
+CORPUS_TABLES = ("job_descriptions", "applicants", "tailored_resumes")
+
+# Directories of JSON files written by the app (older ones predate the repository) and the table each belongs in
+ARTIFACT_DIRECTORIES = {
+    "applicants": "applicants",
+    "job_descriptions": "job_descriptions",
+    "updated_applicant": "tailored_resumes",
+}
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class ResumeRepository:
+    """SQLite-backed store for applicants, job descriptions and tailored resumes.
+
+    Each thread gets its own connection. WAL mode lets concurrent sessions read
+    while another one writes.
+    """
+
+    def __init__(self, db_path=RESUME_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=30000")
+            self._local.connection = connection
+        return connection
+
+    def _insert(self, sql, params):
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(sql, params)
+        return cursor.lastrowid
+
+    def _query(self, sql, params=()):
+        rows = self._connection().execute(sql, params).fetchall()
+        return [_row_to_record(row) for row in rows]
+
+    def save_applicant(self, applicant_data, content_hash=None, source_file=None):
+        """Store extracted applicant data and return the new row id."""
+        return self._insert(
+            "INSERT INTO applicants (content_hash, name, email, data, source_file, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                content_hash,
+                applicant_data.get("name"),
+                applicant_data.get("email"),
+                json.dumps(applicant_data, ensure_ascii=False),
+                source_file,
+                _now(),
+            ),
+        )
+
+    def save_job_description(self, job_data, content_hash=None, selected_text=None, source_file=None):
+        """Store extracted job data and return the new row id."""
+        return self._insert(
+            "INSERT INTO job_descriptions (content_hash, company_name, position, location, job_description, "
+            "selected_text, data, source_file, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                content_hash,
+                job_data.get("company_name"),
+                job_data.get("position"),
+                job_data.get("location"),
+                job_data.get("job_description"),
+                selected_text,
+                json.dumps(job_data, ensure_ascii=False),
+                source_file,
+                _now(),
+            ),
+        )
+
+    def save_tailored_resume(self, resume_data, content_hash, company_name=None, position=None, source_file=None):
+        """Store a tailored resume once per distinct content; returns the row id (existing or new)."""
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO tailored_resumes (content_hash, applicant_name, company_name, position, data, "
+                "source_file, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    content_hash,
+                    resume_data.get("name"),
+                    company_name,
+                    position,
+                    json.dumps(resume_data, ensure_ascii=False),
+                    source_file,
+                    _now(),
+                ),
+            )
+            row = connection.execute("SELECT id FROM tailored_resumes WHERE content_hash = ?", (content_hash,)).fetchone()
+        return row["id"]
+
+    def find_applicant_by_hash(self, content_hash):
+        """Return the most recent applicant record with this content hash, or None."""
+        rows = self._query(
+            "SELECT * FROM applicants WHERE content_hash = ? ORDER BY id DESC LIMIT 1", (content_hash,)
+        )
+        return rows[0] if rows else None
+
+    def find_job_by_hash(self, content_hash):
+        """Return the most recent job description record with this content hash, or None."""
+        rows = self._query(
+            "SELECT * FROM job_descriptions WHERE content_hash = ? ORDER BY id DESC LIMIT 1", (content_hash,)
+        )
+        return rows[0] if rows else None
+
+    def search_applicants(self, name, limit=50):
+        """Return applicants whose name starts with the given text, newest first."""
+        return self._query(
+            "SELECT * FROM applicants WHERE name LIKE ? ORDER BY created_at DESC LIMIT ?", (f"{name}%", limit)
+        )
+
+    def search_jobs(self, company_name=None, position=None, limit=50):
+        """Return job descriptions for a company and/or position, newest first."""
+        clauses, params = [], []
+        if company_name:
+            clauses.append("company_name = ?")
+            params.append(company_name)
+        if position:
+            clauses.append("position = ?")
+            params.append(position)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(
+            f"SELECT * FROM job_descriptions {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+        )
+
+    def corpus_records(self):
+        """Yield (table, data) for every stored job description, applicant and tailored resume."""
+        connection = self._connection()
+        for table in CORPUS_TABLES:
+            for row in connection.execute(f"SELECT data FROM {table} ORDER BY id"):
+                yield table, json.loads(row["data"])
+
+    def corpus_size(self):
+        """Return how many documents corpus_records() would yield."""
+        connection = self._connection()
+        return sum(connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in CORPUS_TABLES)
+
+    def source_files(self):
+        """Return the set of source_file paths recorded in any corpus table."""
+        connection = self._connection()
+        return {
+            row[0]
+            for table in CORPUS_TABLES
+            for row in connection.execute(f"SELECT source_file FROM {table} WHERE source_file IS NOT NULL")
+        }
+
+    def import_artifacts(self, directories=ARTIFACT_DIRECTORIES):
+        """Record every JSON artifact under the given directories that is not in the repository yet.
+
+        Safe to run repeatedly: files already recorded (by source_file) are skipped.
+        Returns {table: number of files imported}.
+        """
+        from cache_utils import content_hash
+        from dedup import normalized_hash
+
+        known = self.source_files()
+        imported = {table: 0 for table in directories.values()}
+        for directory, table in directories.items():
+            for root, _, files in os.walk(directory):
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    if not name.lower().endswith(".json") or path in known:
+                        continue
+                    try:
+                        with open(path, "r", encoding="utf-8") as json_file:
+                            data = json.load(json_file)
+                    except (OSError, ValueError) as e:
+                        print(f"Skipping {path}: {str(e)}")
+                        continue
+                    if not isinstance(data, dict):
+                        continue
+                    if table == "applicants":
+                        self.save_applicant(data, source_file=path)
+                    elif table == "job_descriptions":
+                        job_hash = normalized_hash(data["job_description"]) if data.get("job_description") else None
+                        self.save_job_description(data, content_hash=job_hash, source_file=path)
+                    else:
+                        # Same hash as the preview page, so a re-saved resume is not stored twice
+                        resume_hash = content_hash(json.dumps(data, sort_keys=True, default=str))
+                        self.save_tailored_resume(data, resume_hash, source_file=path)
+                    imported[table] += 1
+        return imported
+
+    def tailored_resumes_between(self, start, end, limit=500):
+        """Return tailored resumes created between two "YYYY-MM-DD HH:MM:SS" timestamps."""
+        return self._query(
+            "SELECT * FROM tailored_resumes WHERE created_at BETWEEN ? AND ? ORDER BY created_at DESC LIMIT ?",
+            (start, end, limit),
+        )
+
+
+def _row_to_record(row):
+    record = dict(row)
+    record["data"] = json.loads(record["data"])
+    return record
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_repository():
+    """Return the process-wide repository, creating the database on first use."""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = ResumeRepository()
+        return _repository
@@ -0,0 +1,150 @@
+"""Re-score the stored similarity history with a (possibly different) SBERT model.
+
+Usage:
+    python rescore_history.py similarity.csv --model all-MiniLM-L6-v2 --chunk-size 5000
+
+Reads the original/similar/optimized triples in chunks, embeds each chunk's
+distinct texts in large batches and computes the three similarity columns
+with vectorized row-wise dot products. Every run writes a new numbered score
+set to rescored/ and appends its details to rescored/manifest.jsonl, so
+score sets from different models can be compared side by side.
+
+session_data.csv is not supported: it only stores the per-session scores,
+not the texts they were computed from, so there is nothing to re-embed.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+from sentence_transformers import SentenceTransformer
+
+from cache_utils import BoundedCache
+
+RESCORE_DIR = os.getenv("RESCORE_DIR", "rescored")
+TEXT_COLUMNS = ["Original Point", "Similar Responsibility", "Optimized Point"]
+# Score column -> the two text columns it compares
+SCORE_COLUMNS = {
+    "Similarity: Original vs Similar": ("Original Point", "Similar Responsibility"),
+    "Similarity: Original vs Optimized": ("Original Point", "Optimized Point"),
+    "Similarity: Similar vs Optimized": ("Similar Responsibility", "Optimized Point"),
+}
+
+
+def next_version(output_dir, model_slug):
+    versions = [
+        int(match.group(1))
+        for path in glob.glob(os.path.join(output_dir, f"similarity_{model_slug}_v*.csv"))
+        if (match := re.search(r"_v(\d+)\.csv$", path))
+    ]
+    return max(versions, default=0) + 1
+
+
+class ChunkEmbedder:
+    """Embeds texts in large batches, reusing embeddings of texts seen in earlier chunks."""
+
+    def __init__(self, model, batch_size=256, cache_entries=50000):
+        self.model = model
+        self.batch_size = batch_size
+        self.cache = BoundedCache(max_entries=cache_entries)
+
+    def embed(self, texts):
+        """Return an (n, dim) array of unit-normalized embeddings, one row per text."""
+        vectors = {}
+        missing = []
+        for text in dict.fromkeys(texts):
+            vector = self.cache.get(text)
+            if vector is None:
+                missing.append(text)
+            else:
+                vectors[text] = vector
+        if missing:
+            encoded = self.model.encode(
+                missing, batch_size=self.batch_size, convert_to_numpy=True, normalize_embeddings=True
+            )
+            for text, vector in zip(missing, encoded):
+                self.cache.put(text, vector)
+                vectors[text] = vector
+        return np.stack([vectors[text] for text in texts])
+
+
+def score_chunk(chunk, embedder):
+    """Return the chunk's texts with freshly computed score columns."""
+    texts = chunk[TEXT_COLUMNS].fillna("").astype(str)
+    embeddings = {column: embedder.embed(texts[column].tolist()) for column in TEXT_COLUMNS}
+    scored = texts.copy()
+    for score_column, (left, right) in SCORE_COLUMNS.items():
+        # Embeddings are normalized, so the row-wise dot product is the cosine similarity
+        scored[score_column] = np.einsum("ij,ij->i", embeddings[left], embeddings[right]).round(4)
+    return scored
+
+
+def rescore(input_path, model_name, output_dir=RESCORE_DIR, chunk_size=5000, batch_size=256):
+    """Re-score input_path and return the manifest entry of the new score set."""
+    model_slug = re.sub(r"[^A-Za-z0-9_.-]", "-", model_name)
+    os.makedirs(output_dir, exist_ok=True)
+    version = next_version(output_dir, model_slug)
+    output_path = os.path.join(output_dir, f"similarity_{model_slug}_v{version}.csv")
+
+    embedder = ChunkEmbedder(SentenceTransformer(model_name), batch_size=batch_size)
+    rows = 0
+    started = time.perf_counter()
+
+    with open(output_path, "w", newline="", encoding="utf-8") as output_file:
+        writer = None
+        for chunk in pd.read_csv(input_path, chunksize=chunk_size, usecols=lambda column: column in TEXT_COLUMNS):
+            chunk = chunk.dropna(how="all")
+            if chunk.empty:
+                continue
+            scored = score_chunk(chunk, embedder)
+            scored["Model"] = model_name
+            scored["Score Version"] = version
+            if writer is None:
+                writer = csv.writer(output_file)
+                writer.writerow(scored.columns)
+            writer.writerows(scored.itertuples(index=False, name=None))
+            rows += len(scored)
+            elapsed = time.perf_counter() - started
+            print(f"Scored {rows} rows ({rows / elapsed:.1f} rows/s)")
+
+    elapsed = time.perf_counter() - started
+    entry = {
+        "version": version,
+        "model": model_name,
+        "source": input_path,
+        "output": output_path,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else 0.0,
+        "embedding_cache": embedder.cache.stats(),
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(os.path.join(output_dir, "manifest.jsonl"), "a", encoding="utf-8") as manifest_file:
+        manifest_file.write(json.dumps(entry) + "\n")
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score the similarity history with an SBERT model.")
+    parser.add_argument("input", nargs="?", default="similarity.csv", help="similarity.csv-style file with the text triples")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="SentenceTransformer model name")
+    parser.add_argument("--output-dir", default=RESCORE_DIR, help="Where score sets and the manifest are written")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows read per chunk")
+    parser.add_argument("--batch-size", type=int, default=256, help="Texts per embedding batch")
+    args = parser.parse_args()
+
+    entry = rescore(args.input, args.model, args.output_dir, args.chunk_size, args.batch_size)
+
+    print("\n### Re-scoring Summary ###")
+    print(f"Score set v{entry['version']} ({entry['model']}): {entry['output']}")
+    print(f"Rows: {entry['rows']}, elapsed: {entry['seconds']}s, throughput: {entry['rows_per_second']} rows/s")
+    print(f"Embedding cache hit rate: {entry['embedding_cache']['hit_rate']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
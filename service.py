@@ -0,0 +1,260 @@
+"""Local HTTP service for the resume tailoring pipeline.
+
+Usage:
+    python service.py --port 8080 --workers 2 --queue-size 16
+
+Endpoints:
+    POST /jobs              {"resume_base64": ..., "job_description": ..., "extra_skills": [...]}
+                            -> 202 {"job_id": ...}, or 503 when the queue is full
+    GET  /jobs/<id>         -> job status and stage timings
+    GET  /jobs/<id>/result  -> optimized resume structure (JSON)
+    GET  /jobs/<id>/pdf     -> tailored resume PDF
+    GET  /metrics           -> queue depth, throughput and p50/p95 stage latency
+    GET  /metrics/prometheus -> stage histograms and counters in the Prometheus text format
+"""
+import argparse
+import base64
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from instrumentation import render_prometheus
+from pipeline import ResumeTailoringPipeline
+from stage_timing import StageTimer
+
+MAX_REQUEST_BYTES = 20 * 1024 * 1024
+MAX_RETAINED_JOBS = 500
+THROUGHPUT_WINDOW_SECONDS = 60
+
+
+class TailoringService:
+    """Bounded job queue served by a fixed number of pipeline worker threads."""
+
+    def __init__(self, workers=2, queue_size=16, pipeline=None):
+        self.pipeline = pipeline or ResumeTailoringPipeline()
+        self.jobs = OrderedDict()
+        self.jobs_lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_timer = StageTimer(max_samples=1000)
+        self.started_at = time.time()
+        self.completed_at = deque()
+        self.counters = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0}
+        self.workers = [
+            threading.Thread(target=self._worker, name=f"tailoring-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, resume_bytes, job_description, extra_skills=None):
+        """Queue a job and return its id, or None if the queue is full."""
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "resume_bytes": resume_bytes,
+            "job_description": job_description,
+            "extra_skills": extra_skills or [],
+        }
+        # Register the job before queueing it so a worker can always find it
+        with self.jobs_lock:
+            self.jobs[job_id] = job
+        try:
+            self.queue.put_nowait(job_id)
+        except queue.Full:
+            with self.jobs_lock:
+                del self.jobs[job_id]
+                self.counters["rejected"] += 1
+            return None
+
+        with self.jobs_lock:
+            self.counters["submitted"] += 1
+            self._evict_finished_jobs()
+        return job_id
+
+    def get(self, job_id):
+        with self.jobs_lock:
+            return self.jobs.get(job_id)
+
+    def _evict_finished_jobs(self):
+        # Forget the oldest finished jobs so memory stays bounded
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= MAX_RETAINED_JOBS:
+                break
+            if self.jobs[job_id]["status"] in ("done", "failed"):
+                del self.jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job_id = self.queue.get()
+            job = self.get(job_id)
+            job["status"] = "running"
+            self.queue_timer.record("queue_wait", time.time() - job["submitted_at"])
+            try:
+                job["result"] = self.pipeline.run(job.pop("resume_bytes"), job["job_description"], job["extra_skills"])
+                job["status"] = "done"
+            except Exception as e:
+                job["error"] = str(e)
+                job["status"] = "failed"
+            finally:
+                job["finished_at"] = time.time()
+                with self.jobs_lock:
+                    self.counters["completed" if job["status"] == "done" else "failed"] += 1
+                    self.completed_at.append(job["finished_at"])
+                self.queue.task_done()
+
+    def status(self, job):
+        """Return the JSON-safe status of a job."""
+        status = {"job_id": job["id"], "status": job["status"], "submitted_at": job["submitted_at"]}
+        if "finished_at" in job:
+            status["finished_at"] = job["finished_at"]
+        if "result" in job:
+            status["timings"] = job["result"]["timings"]
+        if "error" in job:
+            status["error"] = job["error"]
+        return status
+
+    def metrics(self):
+        """Return queue depth, throughput and stage latency percentiles."""
+        now = time.time()
+        with self.jobs_lock:
+            while self.completed_at and self.completed_at[0] < now - THROUGHPUT_WINDOW_SECONDS:
+                self.completed_at.popleft()
+            recent = len(self.completed_at)
+            counters = dict(self.counters)
+            running = sum(1 for job in self.jobs.values() if job["status"] == "running")
+
+        stages = self.pipeline.timer.summary()
+        stages.update(self.queue_timer.summary())
+        uptime = now - self.started_at
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "workers": len(self.workers),
+            "running": running,
+            "counters": counters,
+            "uptime_seconds": uptime,
+            "throughput_per_second": {
+                "overall": (counters["completed"] + counters["failed"]) / uptime if uptime else 0.0,
+                f"last_{THROUGHPUT_WINDOW_SECONDS}s": recent / THROUGHPUT_WINDOW_SECONDS,
+            },
+            "stage_latency_seconds": {
+                name: {"p50": stats["p50"], "p95": stats["p95"], "count": stats["count"]}
+                for name, stats in stages.items()
+            },
+        }
+
+
+def make_handler(service):
+    """Build a request handler class bound to the given service."""
+
+    class TailoringRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                self._send_json(404, {"error": "Not found"})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            if length > MAX_REQUEST_BYTES:
+                self._send_json(413, {"error": "Request too large"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(length))
+                resume_bytes = base64.b64decode(payload["resume_base64"])
+                job_description = payload["job_description"]
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {"error": f"Invalid request: {str(e)}"})
+                return
+
+            job_id = service.submit(resume_bytes, job_description, payload.get("extra_skills"))
+            if job_id is None:
+                # Backpressure: tell the caller to retry instead of queueing without bound
+                self._send_json(503, {"error": "Queue is full, retry later"}, {"Retry-After": "5"})
+                return
+            self._send_json(202, {"job_id": job_id, "status_url": f"/jobs/{job_id}"})
+
+        def do_GET(self):
+            parts = [part for part in self.path.split("?")[0].split("/") if part]
+
+            if parts == ["metrics"]:
+                self._send_json(200, service.metrics())
+                return
+            if parts == ["metrics", "prometheus"]:
+                body = render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if len(parts) < 2 or parts[0] != "jobs":
+                self._send_json(404, {"error": "Not found"})
+                return
+
+            job = service.get(parts[1])
+            if job is None:
+                self._send_json(404, {"error": "Unknown job"})
+                return
+
+            if len(parts) == 2:
+                self._send_json(200, service.status(job))
+            elif parts[2] in ("result", "pdf") and job["status"] != "done":
+                self._send_json(409, service.status(job))
+            elif parts[2] == "result":
+                result = job["result"]
+                self._send_json(200, {
+                    "job_id": job["id"],
+                    "resume": result["resume"],
+                    "job": result["job"],
+                    "optimizations": result["optimizations"],
+                    "timings": result["timings"],
+                })
+            elif parts[2] == "pdf":
+                pdf = job["result"]["pdf"]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(len(pdf)))
+                self.end_headers()
+                self.wfile.write(pdf)
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+    return TailoringRequestHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the resume tailoring pipeline over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=2, help="Number of jobs processed concurrently")
+    parser.add_argument("--queue-size", type=int, default=16, help="Maximum number of jobs waiting to run")
+    args = parser.parse_args()
+
+    service = TailoringService(workers=args.workers, queue_size=args.queue_size)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Serving resume tailoring on http://{args.host}:{args.port} ({args.workers} workers, queue {args.queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Similarity scores between the applicant, optimized and job texts.
+
+Every metric the analysis pages show (cosine, Jaccard, SBERT, stemmed word
+overlap and LSA) is computed here in one pass over the three texts, and the
+result is memoized by the texts' hash so reruns and page switches are free.
+"""
+import os
+import re
+import threading
+
+import numpy as np
+from sentence_transformers import SentenceTransformer, util
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from cache_utils import BoundedCache, content_hash
+from tokenization import pairwise_overlaps
+from lsa_model import PER_SESSION_LSA_VERSION, get_lsa_model
+from instrumentation import instrumented, span
+
+SBERT_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Order of the texts in every score matrix
+APPLICANT, OPTIMIZED, JOB = 0, 1, 2
+PAIRS = {
+    "applicant_vs_job": (APPLICANT, JOB),
+    "optimized_vs_job": (OPTIMIZED, JOB),
+    "applicant_vs_optimized": (APPLICANT, OPTIMIZED),
+}
+
+# How SBERT sees long texts: "none" encodes each whole text (MiniLM truncates after
+# 256 tokens), "mean"/"max" split texts into sentence windows and pool the window vectors
+SBERT_POOLING = os.getenv("SBERT_POOLING", "none")
+# Upper bound on words per window, kept well under the model's 256-token limit
+SBERT_WINDOW_WORDS = int(os.getenv("SBERT_WINDOW_WORDS", "150"))
+
+# Scores keyed by the hash of the three texts
+score_cache = BoundedCache(max_entries=256)
+
+# Normalized window embeddings keyed by the window's hash, shared by every session
+chunk_embedding_cache = BoundedCache(max_entries=20000)
+
+_sbert_model = None
+_sbert_lock = threading.Lock()
+
+
+def get_sbert_model():
+    """Return the process-wide SBERT model, loading it on first use."""
+    global _sbert_model
+    with _sbert_lock:
+        if _sbert_model is None:
+            with span("model.sbert_load"):
+                _sbert_model = SentenceTransformer(SBERT_MODEL_NAME)
+        return _sbert_model
+
+
+def split_windows(text, max_words=SBERT_WINDOW_WORDS):
+    """Split text into windows of whole sentences (or " | "-separated points) of at most max_words words."""
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+|\n+|\s\|\s", text) if s.strip()]
+    windows, current = [], []
+    for sentence in sentences:
+        words = sentence.split()
+        # A single over-long sentence is cut into max_words pieces
+        while len(words) > max_words:
+            if current:
+                windows.append(" ".join(current))
+                current = []
+            windows.append(" ".join(words[:max_words]))
+            words = words[max_words:]
+        if current and len(current) + len(words) > max_words:
+            windows.append(" ".join(current))
+            current = []
+        current.extend(words)
+    if current:
+        windows.append(" ".join(current))
+    return windows or [text]
+
+
+@instrumented("similarity.embed")
+def embed_documents(texts, pooling="mean"):
+    """Return one normalized embedding per text, pooled ("mean" or "max") over its sentence windows.
+
+    The windows of all texts that are not cached yet are encoded in a single batch.
+    """
+    windows = [split_windows(text) for text in texts]
+    keys = [[content_hash(window) for window in document] for document in windows]
+
+    # Every vector this call uses is held here, so a concurrent eviction from the cache cannot drop one
+    vectors = {}
+    missing = {}
+    for document, document_keys in zip(windows, keys):
+        for window, key in zip(document, document_keys):
+            if key in vectors or key in missing:
+                continue
+            vector = chunk_embedding_cache.get(key)
+            if vector is None:
+                missing[key] = window
+            else:
+                vectors[key] = vector
+    if missing:
+        encoded = get_sbert_model().encode(list(missing.values()), convert_to_numpy=True, normalize_embeddings=True)
+        for key, vector in zip(missing, encoded):
+            chunk_embedding_cache.put(key, vector)
+            vectors[key] = vector
+
+    pooled = []
+    for document_keys in keys:
+        matrix = np.stack([vectors[key] for key in document_keys])
+        vector = matrix.max(axis=0) if pooling == "max" else matrix.mean(axis=0)
+        pooled.append(vector / (np.linalg.norm(vector) or 1.0))
+    return np.stack(pooled)
+
+
+def build_texts(session_state, include_job_requirements=True):
+    """Build the (applicant, optimized, job) comparison texts from session state.
+
+    The job text always has the responsibilities; the required skills and
+    requirements are added when include_job_requirements is True.
+    """
+    # Get original data
+    original_skills = session_state.get("skills", [])
+    original_points = []
+    for exp in session_state.get("experience", []):
+        if exp and "job_descriptions" in exp:
+            original_points.extend(exp["job_descriptions"])
+    original_summary = session_state.get("Professional Summary", "")
+
+    # Get optimized data
+    updated_skills = session_state.get("updated_skills", [])
+    optimized_points = []
+    for exp in session_state.get("updated_experience", []):
+        if exp and "job_descriptions" in exp:
+            optimized_points.extend(exp["job_descriptions"])
+    generated_summary = session_state.get("generated_prof_summary", "")
+
+    # Create text strings
+    applicant_text = "\n".join([
+        f"Professional Summary: {original_summary}",
+        f"Skills: {' | '.join(original_skills)}",
+        f"Experience Points: {' | '.join(original_points)}",
+    ])
+
+    optimized_text = "\n".join([
+        f"Professional Summary: {generated_summary}",
+        f"Skills: {' | '.join(updated_skills)}",
+        f"Experience Points: {' | '.join(optimized_points)}",
+    ])
+
+    job_lines = [f"Job Responsibilities: {' | '.join(session_state.get('job_responsibilities', []))}"]
+    if include_job_requirements:
+        job_lines.append(f"Required Skills: {' | '.join(session_state.get('special_skills', []))}")
+        job_lines.append(f"Requirements: {' | '.join(session_state.get('requirements', []))}")
+    job_text = "\n".join(job_lines)
+
+    return applicant_text, optimized_text, job_text
+
+
+def jaccard_similarity(text1, text2):
+    """Calculate the Jaccard similarity between two texts."""
+    set1 = set(text1.split())
+    set2 = set(text2.split())
+    union = set1 | set2
+    if not union:  # Avoid division by zero
+        return 0.0
+    return len(set1 & set2) / len(union)
+
+
+@instrumented("similarity.lsa")
+def perform_lsa(texts, n_components=2):
+    """Project the texts into LSA space and return (vectors, lsa_version).
+
+    Uses the corpus-level model (transform only) when one has been fitted, so
+    coordinates are comparable across sessions, and returns its version.
+    Otherwise fits on the given texts alone, as before, and returns version 0:
+    those coordinates live in a per-session space on a different scale and
+    must not be compared with corpus-model coordinates.
+    """
+    model, version = get_lsa_model()
+    if model is not None:
+        return model.transform(texts), version
+    vectors = CountVectorizer().fit_transform(texts)
+    return TruncatedSVD(n_components=n_components).fit_transform(vectors), PER_SESSION_LSA_VERSION
+
+
+@instrumented("similarity.compute_scores")
+def compute_scores(applicant_text, optimized_text, job_text):
+    """Compute every similarity metric for the three texts (no caching).
+
+    Returns a dict keyed like the session state / metrics store fields, e.g.
+    cosine_applicant_vs_job, jaccard_..., sbert_..., count_..., lsa_applicant,
+    lsa_version (see perform_lsa),
+    plus common_words_<pair> (sorted shared words) for display.
+    """
+    texts = [applicant_text, optimized_text, job_text]
+    scores = {}
+
+    # Bag-of-words cosine
+    cosine_matrix = cosine_similarity(CountVectorizer().fit_transform(texts))
+
+    # One SBERT encode for all three texts (or for all their windows when pooling)
+    if SBERT_POOLING in ("mean", "max"):
+        embeddings = embed_documents(texts, SBERT_POOLING)
+        sbert_matrix = embeddings @ embeddings.T
+    else:
+        embeddings = get_sbert_model().encode(texts, convert_to_tensor=True)
+        sbert_matrix = util.cos_sim(embeddings, embeddings).cpu().numpy()
+
+    # One tokenization pass gives shared words and stemmed overlap for every pair
+    overlaps = pairwise_overlaps(texts, PAIRS)
+
+    for pair, (i, j) in PAIRS.items():
+        scores[f"cosine_{pair}"] = float(cosine_matrix[i][j])
+        scores[f"jaccard_{pair}"] = jaccard_similarity(texts[i], texts[j])
+        scores[f"sbert_{pair}"] = float(sbert_matrix[i, j])
+        scores[f"count_{pair}"] = overlaps[pair].stem_count
+        scores[f"common_words_{pair}"] = sorted(overlaps[pair].words)
+
+    lsa_result, scores["lsa_version"] = perform_lsa(texts)
+    scores["lsa_applicant"] = lsa_result[APPLICANT]
+    scores["lsa_optimized"] = lsa_result[OPTIMIZED]
+    scores["lsa_job"] = lsa_result[JOB]
+    return scores
+
+
+def score_texts(applicant_text, optimized_text, job_text):
+    """Return compute_scores() for the three texts, memoized by their hash (and the LSA model version)."""
+    _, lsa_version = get_lsa_model()
+    key = content_hash("\0".join([str(lsa_version), SBERT_POOLING, applicant_text, optimized_text, job_text]))
+    scores = score_cache.get(key)
+    if scores is None:
+        scores = compute_scores(applicant_text, optimized_text, job_text)
+        score_cache.put(key, scores)
+    return scores
+
+
+def score_session(session_state, include_job_requirements=True):
+    """Build the comparison texts from session state and return (texts, scores)."""
+    texts = build_texts(session_state, include_job_requirements)
+    return texts, score_texts(*texts)
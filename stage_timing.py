@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile (0-100) of values using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values):
+    """Return count/mean/p50/p95/max for a list of durations in seconds."""
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": max(values) if values else 0.0,
+    }
+
+
+class StageTimer:
+    """Collect wall-clock durations per named stage (thread-safe).
+
+    max_samples keeps only the most recent durations per stage, for long-running processes.
+    """
+
+    def __init__(self, max_samples=None):
+        self._durations = defaultdict(lambda: deque(maxlen=max_samples))
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the body of a with-block under the given stage name."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._durations[name].append(seconds)
+
+    def merge(self, timings):
+        """Add a {stage: seconds} mapping (e.g. from a worker) to this timer."""
+        for name, seconds in timings.items():
+            self.record(name, seconds)
+
+    def durations(self):
+        with self._lock:
+            return {name: list(values) for name, values in self._durations.items()}
+
+    def summary(self):
+        """Return summarize() for every stage seen so far."""
+        return {name: summarize(values) for name, values in self.durations().items()}
+
+    def report(self):
+        """Return the stage summary as printable lines."""
+        lines = []
+        for name, stats in self.summary().items():
+            lines.append(
+                f"{name:<12} n={stats['count']:<5} mean={stats['mean']:.3f}s "
+                f"p50={stats['p50']:.3f}s p95={stats['p95']:.3f}s max={stats['max']:.3f}s"
+            )
+        return lines
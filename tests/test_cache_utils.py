@@ -0,0 +1,53 @@
+from cache_utils import BoundedCache, content_hash
+
+
+def test_content_hash_matches_for_text_and_bytes():
+    assert content_hash("résumé") == content_hash("résumé".encode("utf-8"))
+    assert content_hash("a") != content_hash("b")
+
+
+def test_evicts_least_recently_used_entry():
+    cache = BoundedCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_evicts_by_total_size():
+    cache = BoundedCache(max_entries=10, max_bytes=10)
+    cache.put("a", b"x" * 4)
+    cache.put("b", b"x" * 4)
+    cache.put("c", b"x" * 4)
+    assert "a" not in cache
+    assert len(cache) == 2
+    assert cache.stats()["bytes"] == 8
+
+
+def test_does_not_store_value_larger_than_budget():
+    cache = BoundedCache(max_entries=10, max_bytes=10)
+    cache.put("small", b"x")
+    cache.put("big", b"x" * 11)
+    assert "big" not in cache
+    assert "small" in cache
+
+
+def test_replacing_a_key_updates_its_size():
+    cache = BoundedCache(max_entries=10, max_bytes=10)
+    cache.put("a", b"x" * 8)
+    cache.put("a", b"x" * 2)
+    cache.put("b", b"x" * 8)
+    assert "a" in cache and "b" in cache
+    assert cache.stats()["bytes"] == 10
+
+
+def test_counts_hits_and_misses():
+    cache = BoundedCache()
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
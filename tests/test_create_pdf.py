@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("reportlab")
+pytest.importorskip("streamlit")
+
+from create_pdf import pdf_page_count, render_cache, render_pdf
+
+RESUME = {
+    "name": "Jane Doe",
+    "position": "Data Engineer",
+    "email": "jane@example.com",
+    "mobile": "555-0100",
+    "generated_prof_summary": "Data engineer with seven years of experience.",
+    "experience": [
+        {"company": "Contoso", "position": "Data Engineer", "duration": "2019 - Current",
+         "job_descriptions": ["Built ETL jobs", "Moved pipelines to Airflow", ""]},
+    ],
+    "education": ["BSc Computer Science", ""],
+    "achievements": ["Cut cloud costs by 30%"],
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_render_cache():
+    render_cache.clear()
+    yield
+    render_cache.clear()
+
+
+def test_identical_data_is_served_from_the_render_cache():
+    pdf, _, cache_hit = render_pdf(RESUME)
+    assert not cache_hit
+    assert pdf.startswith(b"%PDF")
+
+    cached_pdf, seconds, cache_hit = render_pdf(dict(RESUME))
+    assert cache_hit
+    assert seconds == 0.0
+    assert cached_pdf is pdf
+
+
+def test_changed_data_or_layout_is_rendered_again():
+    render_pdf(RESUME)
+    assert not render_pdf(dict(RESUME, name="John Doe"))[2]
+    assert not render_pdf(RESUME, compact=True)[2]
+    assert render_pdf(RESUME, compact=True)[2]
+
+
+def test_compact_layout_is_smaller_and_uses_fewer_pages_for_long_resumes():
+    long_resume = dict(RESUME, experience=RESUME["experience"] * 6)
+    standard = render_pdf(long_resume)[0]
+    compact = render_pdf(long_resume, compact=True)[0]
+    assert len(compact) < len(standard)
+    assert pdf_page_count(compact) < pdf_page_count(standard)
@@ -0,0 +1,42 @@
+import csv
+
+from csv_store import AppendOnlyCSVWriter
+
+
+def read_rows(path):
+    with open(path, "r", encoding="utf-8", newline="") as csv_file:
+        return list(csv.reader(csv_file))
+
+
+def test_new_file_gets_header_and_rows(tmp_path):
+    path = tmp_path / "data.csv"
+    writer = AppendOnlyCSVWriter(str(path), ["a", "b"], batch_size=2)
+    writer.append({"a": 1, "b": 2})
+    assert not path.exists()  # still buffered
+    writer.append({"a": 3, "b": 4})
+    assert read_rows(path) == [["a", "b"], ["1", "2"], ["3", "4"]]
+
+
+def test_appends_follow_the_existing_column_order(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("b,a\r\n2,1\r\n", encoding="utf-8")
+    writer = AppendOnlyCSVWriter(str(path), ["a", "b"], batch_size=1)
+    writer.append({"a": 3, "b": 4})
+    assert read_rows(path) == [["b", "a"], ["2", "1"], ["4", "3"]]
+
+
+def test_missing_columns_are_added_to_the_header_once(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\r\n1,2\r\n", encoding="utf-8")
+    writer = AppendOnlyCSVWriter(str(path), ["a", "b", "c"], batch_size=1)
+    writer.append({"a": 3, "b": 4, "c": 5})
+    writer.append({"a": 6, "b": 7, "c": 8})
+    assert read_rows(path) == [["a", "b", "c"], ["1", "2"], ["3", "4", "5"], ["6", "7", "8"]]
+
+
+def test_file_without_trailing_newline_is_not_joined_to_the_next_row(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\r\n1,2", encoding="utf-8")
+    writer = AppendOnlyCSVWriter(str(path), ["a", "b"], batch_size=1)
+    writer.append({"a": 3, "b": 4})
+    assert read_rows(path) == [["a", "b"], ["1", "2"], ["3", "4"]]
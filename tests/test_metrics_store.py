@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from metrics_store import CSV_COLUMNS, LSA_DIMENSIONS, SESSION_METRICS_DTYPE, UNKNOWN_LSA_VERSION, MetricsStore
+
+pd = pytest.importorskip("pandas")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MetricsStore(str(tmp_path / "session_metrics"), batch_size=100, flush_interval=60.0)
+
+
+def test_import_csv_parses_legacy_rows(store, tmp_path):
+    csv_path = tmp_path / "session_data.csv"
+    pd.DataFrame({
+        CSV_COLUMNS["cosine_applicant_vs_job"]: [0.25, None],
+        CSV_COLUMNS["count_applicant_vs_job"]: [7, 3],
+        CSV_COLUMNS["lsa_applicant"]: ["[0.55 0.54]", "[1.5]"],
+    }).to_csv(csv_path, index=False)
+
+    assert store.import_csv(str(csv_path)) == 2
+    records = store.load()
+    assert records.dtype == SESSION_METRICS_DTYPE
+    assert records["cosine_applicant_vs_job"].tolist() == [0.25, 0.0]  # NaN becomes 0
+    assert records["count_applicant_vs_job"].tolist() == [7, 3]
+    assert records["lsa_applicant"].tolist() == [[0.55, 0.54], [1.5, 0.0]]  # short vectors are zero-padded
+    assert records["lsa_version"].tolist() == [UNKNOWN_LSA_VERSION] * 2  # the legacy CSV has no version
+
+
+def test_to_dataframe_has_one_column_per_lsa_dimension(store):
+    store.append({"sbert_applicant_vs_job": 0.8, "lsa_job": np.array([0.1, 0.2]), "lsa_version": 3})
+    store.flush()
+    df = store.to_dataframe()
+    assert len(df) == 1
+    assert df.loc[0, "lsa_job_1"] == 0.1 and df.loc[0, "lsa_job_2"] == 0.2
+    assert df.loc[0, "sbert_applicant_vs_job"] == 0.8
+    assert df.loc[0, "lsa_version"] == 3
+    assert "lsa_job" not in df.columns
+
+
+def test_empty_store_gives_empty_results(store):
+    assert len(store.load()) == 0
+    assert store.column("lsa_job").shape == (0, LSA_DIMENSIONS)
+    assert store.to_dataframe().empty
+
+
+def test_compact_merges_parts(store):
+    for value in (0.1, 0.2, 0.3):
+        store.append({"cosine_applicant_vs_job": value})
+        store.flush()
+    assert len(store.part_paths()) == 3
+    store.compact()
+    assert len(store.part_paths()) == 1
+    assert store.column("cosine_applicant_vs_job").tolist() == [0.1, 0.2, 0.3]
+
+
+def test_parts_with_an_older_dtype_are_upgraded(store, tmp_path):
+    old_dtype = np.dtype([field for field in SESSION_METRICS_DTYPE.descr if field[0] != "lsa_version"])
+    old = np.zeros(1, dtype=old_dtype)
+    old["cosine_applicant_vs_job"] = 0.5
+    store._write_part(old)
+    store.append({"cosine_applicant_vs_job": 0.7, "lsa_version": 0})
+    store.flush()
+    records = store.load()
+    assert records["cosine_applicant_vs_job"].tolist() == [0.5, 0.7]
+    assert records["lsa_version"].tolist() == [UNKNOWN_LSA_VERSION, 0]
@@ -0,0 +1,59 @@
+import pytest
+
+from persistence import BackgroundWriter
+
+
+@pytest.fixture
+def writer():
+    # A long interval, so everything submitted before flush() is still pending and can coalesce
+    writer = BackgroundWriter(flush_interval=30.0, name="test-writer")
+    yield writer
+    writer.close()
+
+
+def test_writes_with_the_same_key_coalesce_to_the_latest(writer):
+    written = []
+    for version in range(3):
+        writer.submit(written.append, ("profile", version), key="profile.json")
+    assert writer.flush(timeout=10)
+    assert written == [("profile", 2)]
+    assert writer.stats()["coalesced"] == 2
+
+
+def test_writes_without_a_key_all_run_in_order(writer):
+    written = []
+    for row in range(5):
+        writer.submit(written.append, row)
+    assert writer.flush(timeout=10)
+    assert written == [0, 1, 2, 3, 4]
+    assert writer.stats()["coalesced"] == 0
+
+
+def test_coalesced_write_runs_after_everything_queued_before_it(writer):
+    written = []
+    writer.submit(written.append, "a v1", key="a")
+    writer.submit(written.append, "b", key="b")
+    writer.submit(written.append, "a v2", key="a")
+    assert writer.flush(timeout=10)
+    assert written == ["b", "a v2"]
+
+
+def test_failed_write_is_counted_and_does_not_stop_the_writer(writer):
+    written = []
+
+    def fail():
+        raise OSError("disk full")
+
+    writer.submit(fail)
+    writer.submit(written.append, "after")
+    assert writer.flush(timeout=10)
+    assert written == ["after"]
+    stats = writer.stats()
+    assert (stats["failed"], stats["completed"], stats["depth"]) == (1, 1, 0)
+
+
+def test_submit_after_close_writes_inline(writer):
+    written = []
+    writer.close()
+    writer.submit(written.append, "late", key="late")
+    assert written == ["late"]
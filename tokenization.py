@@ -0,0 +1,57 @@
+"""Shared tokenization for word-overlap metrics.
+
+Each text is tokenized once into a Counter of words and a set of stemmed,
+stop-word-free terms. Overlaps between any number of text pairs are then
+set/Counter intersections, linear in the size of the texts.
+"""
+import re
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+import nltk
+from nltk.corpus import stopwords
+from nltk.stem import PorterStemmer
+
+nltk.download('stopwords')
+
+_stemmer = PorterStemmer()
+_stop_words = frozenset(stopwords.words('english'))
+
+TextTokens = namedtuple("TextTokens", ["words", "stems"])
+Overlap = namedtuple("Overlap", ["words", "word_count", "stems", "stem_count"])
+
+
+@lru_cache(maxsize=50000)
+def stem(word):
+    """Return the Porter stem of a word (cached; vocabularies repeat heavily)."""
+    return _stemmer.stem(word)
+
+
+def clean_and_process_text(text):
+    """Clean the text by removing stop words, symbols, and special characters, and return the base words."""
+    text = re.sub(r'[^a-zA-Z\s]', '', text.lower())
+    return {stem(word) for word in text.split() if word not in _stop_words}
+
+
+def tokenize(text):
+    """Return the text's lowercase word counts and its set of stemmed terms."""
+    return TextTokens(Counter(text.lower().split()), clean_and_process_text(text))
+
+
+def overlap(tokens1, tokens2):
+    """Return the words and stemmed terms two tokenized texts share, with their counts."""
+    words = tokens1.words.keys() & tokens2.words.keys()
+    stems = tokens1.stems & tokens2.stems
+    return Overlap(words, len(words), stems, len(stems))
+
+
+def pairwise_overlaps(texts, pairs):
+    """Tokenize each text once and return {pair_name: Overlap} for pairs given as {name: (i, j)}."""
+    tokens = [tokenize(text) for text in texts]
+    return {name: overlap(tokens[i], tokens[j]) for name, (i, j) in pairs.items()}
+
+
+def common_words(texts):
+    """Return the words that appear in every one of the texts."""
+    word_sets = [set(text.lower().split()) for text in texts]
+    return set.intersection(*word_sets) if word_sets else set()
@@ -1,118 +1,22 @@
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import TruncatedSVD
 import streamlit as st
-from sentence_transformers import SentenceTransformer, util
 import pandas as pd
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
-import re
 from final_results import save_session_data_to_csv
-
-nltk.download('stopwords')
-
-def clean_and_process_text(text):
-    """Clean the text by removing stop words, symbols, and special characters, and return the base words."""
-    # Initialize the stemmer
-    stemmer = PorterStemmer()
-    
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove symbols and special characters
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
-    
-    # Split the text into words
-    words = text.split()
-    
-    # Remove stop words
-    stop_words = set(stopwords.words('english'))
-    cleaned_words = [stemmer.stem(word) for word in words if word not in stop_words]
-    
-    return set(cleaned_words)  # Return as a set for easy comparison
-
-def count_similar_words(text1, text2):
-    """Count the number of similar words between two cleaned texts."""
-    # Clean and process both texts
-    words1 = clean_and_process_text(text1)
-    words2 = clean_and_process_text(text2)
-    
-    # Find common words
-    common_words = words1.intersection(words2)
-    
-    # Return the count of common words
-    return len(common_words)
+from lsa_model import PER_SESSION_LSA_VERSION
+from similarity_engine import build_texts, score_session, score_texts
+from tokenization import common_words
 
 def load_data_from_session():
     """Load data from session state."""
     try:
-        # Get original data
-        original_skills = st.session_state.get("skills", [])
-        original_points = []
-        for exp in st.session_state.get("experience", []):
-            if exp and "job_descriptions" in exp:
-                original_points.extend(exp["job_descriptions"])
-        original_summary = st.session_state.get("Professional Summary", "")
-        
-        # Get optimized data
-        updated_skills = st.session_state.get("updated_skills", [])
-        optimized_points = []
-        for exp in st.session_state.get("updated_experience", []):
-            if exp and "job_descriptions" in exp:
-                optimized_points.extend(exp["job_descriptions"])
-        generated_summary = st.session_state.get("generated_prof_summary", "")
-        
-        # Get job data
-        job_responsibilities = st.session_state.get("job_responsibilities", [])
-        
-        # Create text strings
-        applicant_text = f"""
-        Professional Summary: {original_summary}
-        Skills: {' | '.join(original_skills)}
-        Experience Points: {' | '.join(original_points)}
-        """.strip()
-        
-        optimized_text = f"""
-        Professional Summary: {generated_summary}
-        Skills: {' | '.join(updated_skills)}
-        Experience Points: {' | '.join(optimized_points)}
-        """.strip()
-        
-        job_text = f"""
-        Job Responsibilities: {' | '.join(job_responsibilities)}
-        """.strip()
-        
-        return applicant_text.strip(), optimized_text.strip(), job_text.strip()
-        
+        return build_texts(st.session_state, include_job_requirements=False)
+
     except Exception as e:
         st.error(f"Error in load_data_from_session: {str(e)}")
         return None, None, None
 
 def find_common_words(texts):
     """Find common words across all texts."""
-    preprocessed_texts = [text.lower().split() for text in texts]
-    all_words = [word for text in preprocessed_texts for word in text]
-    word_counts = {word: all_words.count(word) for word in set(all_words)}
-    return {word for word, count in word_counts.items() if count == len(texts)}
-
-def calculate_similarity(text1, text2):
-    """Calculate cosine similarity between two texts."""
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    embeddings = model.encode([text1, text2])
-    cosine_similarity = util.cos_sim(embeddings[0], embeddings[1]).item()
-    return cosine_similarity
-
-def perform_lsa(texts, n_components=2):
-    """Perform Latent Semantic Analysis on the given texts."""
-    # Vectorize the texts
-    vectorizer = CountVectorizer()
-    vectors = vectorizer.fit_transform(texts)
-
-    # Apply LSA using TruncatedSVD
-    lsa = TruncatedSVD(n_components=n_components)
-    lsa_result = lsa.fit_transform(vectors)
-
-    return lsa_result
+    return common_words(texts)
 
 def show_similar_words():
     st.title("Text Comparison and LSA Analysis")
@@ -135,10 +39,13 @@ def show_similar_words():
     st.markdown(job_text)
 
     if st.button("Compare Texts"):
+        # Every metric for the three texts, computed once and memoized by text hash
+        scores = score_texts(applicant_text, optimized_text, job_text)
+
         # Find common words for each comparison pair
-        common_words_applicant_job = find_common_words([applicant_text, job_text])
-        common_words_optimized_job = find_common_words([optimized_text, job_text])
-        common_words_applicant_optimized = find_common_words([applicant_text, optimized_text])
+        common_words_applicant_job = scores["common_words_applicant_vs_job"]
+        common_words_optimized_job = scores["common_words_optimized_vs_job"]
+        common_words_applicant_optimized = scores["common_words_applicant_vs_optimized"]
 
         # Display common words without highlighting
         st.write("### **Original vs Job Posting**")
@@ -169,9 +76,9 @@ def show_similar_words():
         st.write("**Similar Words**")
         st.write(", ".join(common_words_applicant_optimized) if common_words_applicant_optimized else "No common words")
 
-        count_applicant_job = count_similar_words(applicant_text, job_text)
-        count_optimized_job = count_similar_words(optimized_text, job_text)
-        count_applicant_optimized = count_similar_words(applicant_text, optimized_text)
+        count_applicant_job = scores["count_applicant_vs_job"]
+        count_optimized_job = scores["count_optimized_vs_job"]
+        count_applicant_optimized = scores["count_applicant_vs_optimized"]
 
         # Display counts
         st.write("### Similar Words Count")
@@ -189,9 +96,9 @@ def show_similar_words():
         data = {
             "Comparison": ["Original vs Job Posting", "Optimized vs Job Posting", "Original vs Optimized"],
             "Similarity Score": [
-                calculate_similarity(applicant_text, job_text),
-                calculate_similarity(optimized_text, job_text),
-                calculate_similarity(applicant_text, optimized_text)
+                scores["sbert_applicant_vs_job"],
+                scores["sbert_optimized_vs_job"],
+                scores["sbert_applicant_vs_optimized"]
             ],
             "Common Words": [
                 ", ".join(common_words_applicant_job) if common_words_applicant_job else "No common words",
@@ -209,10 +116,15 @@ def show_similar_words():
 
         # Perform LSA
         texts = [applicant_text, optimized_text, job_text]
-        lsa_result = perform_lsa(texts)
+        lsa_result = [scores["lsa_applicant"], scores["lsa_optimized"], scores["lsa_job"]]
 
         # Display LSA results
         st.subheader("Latent Semantic Analysis Results")
+        if scores["lsa_version"] == PER_SESSION_LSA_VERSION:
+            st.caption("No corpus LSA model has been fitted yet, so these coordinates come from a fit on this "
+                       "session's three texts and are not comparable with other sessions.")
+        else:
+            st.caption(f"Coordinates from corpus LSA model v{scores['lsa_version']}.")
         for i, text in enumerate(texts):
             st.write(f"**Text {i + 1}:** {text}")
             st.write(f"**LSA Representation:** {lsa_result[i]}")
@@ -242,8 +154,14 @@ def show_similar_words():
         st.session_state.lsa_applicant = lsa_result[0]
         st.session_state.lsa_optimized = lsa_result[1]
         st.session_state.lsa_job = lsa_result[2]
-
-        save_session_data_to_csv()
+        st.session_state.lsa_version = scores["lsa_version"]
+
+        # Cosine, Jaccard and SBERT are saved against the full job text (as on the similarity page),
+        # word counts and LSA against the responsibilities only (as on this page)
+        _, full_scores = score_session(st.session_state, include_job_requirements=True)
+        save_session_data_to_csv(dict(full_scores, **{
+            name: value for name, value in scores.items() if name.startswith(("count_", "lsa_"))
+        }))
 
     if st.button("Create PDF"):
         st.session_state.page = "create resume"  # Change to the Create PDF page